@@ -0,0 +1,44 @@
+from django.db.models import Max
+
+from apps.services.utils import make_etag
+from apps.services.versions import SITE_VERSION_KEY, get_versions
+
+from .models import Profile
+
+
+def profile_validators(request, slug):
+    """
+    ETag страницы профиля одним запросом по полям Profile и User, статистике
+    автора и времени изменения его записей, а также статусу «в сети»;
+    Last-Modified не используется - у профиля нет времени изменения
+    """
+    profile = (
+        Profile.objects.filter(slug=slug)
+        .values(
+            "pk",
+            "avatar",
+            "bio",
+            "birth_date",
+            "user_id",
+            "user__username",
+            "user__first_name",
+            "user__last_name",
+            "user__last_login",
+            "post_count",
+            "comment_count",
+            "rating_received",
+        )
+        .annotate(last_post_update=Max("user__author_posts__update"))
+        .first()
+    )
+    if profile is None:
+        return None, None
+
+    etag = make_etag(
+        sorted(profile.items()),
+        Profile(user_id=profile["user_id"]).is_online(),
+        get_versions([SITE_VERSION_KEY]),
+        request.GET.get("cursor"),
+        request.user.pk,
+    )
+    return etag, None
@@ -1,7 +1,8 @@
 from django import forms
 from django.contrib.auth.forms import AuthenticationForm, UserCreationForm
 from django.contrib.auth.models import User
-from django_recaptcha.fields import ReCaptchaField
+
+from apps.services.captcha import CaptchaField, OptionalCaptchaMixin
 
 from .models import Profile
 
@@ -67,12 +68,12 @@ class ProfileUpdateForm(forms.ModelForm):
         fields = ("slug", "birth_date", "bio", "avatar")
 
 
-class UserRegisterForm(UserCreationForm):
+class UserRegisterForm(OptionalCaptchaMixin, UserCreationForm):
     """
     Переопределенная форма регистрации пользователей
     """
 
-    recaptcha = ReCaptchaField()
+    recaptcha = CaptchaField()
 
     class Meta(UserCreationForm.Meta):
         fields = UserCreationForm.Meta.fields + (
@@ -125,12 +126,12 @@ class UserRegisterForm(UserCreationForm):
         )
 
 
-class UserLoginForm(AuthenticationForm):
+class UserLoginForm(OptionalCaptchaMixin, AuthenticationForm):
     """
     Форма авторизации на сайте
     """
 
-    recaptcha = ReCaptchaField()
+    recaptcha = CaptchaField()
 
     class Meta:
         model = User
@@ -0,0 +1,113 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from apps.services.utils import unique_slugify_batch
+
+from .models import Profile
+
+
+def hash_password(raw_password):
+    """
+    Хеш пароля (в процессе пула); пустой пароль - непригодный для входа
+    """
+    return make_password(raw_password or None)
+
+
+def _batches(rows, size):
+    rows = iter(rows)
+    while batch := list(islice(rows, size)):
+        yield batch
+
+
+def _new_rows(batch, in_flight):
+    """
+    Нормализованные строки пачки без пустых логинов, повторов в пачке,
+    пачке в обработке и уже существующих пользователей
+    """
+    rows = {}
+    for row in batch:
+        username = User.normalize_username((row.get("username") or "").strip())
+        if username and username not in rows and username not in in_flight:
+            rows[username] = {**row, "username": username}
+    existing = User.objects.filter(username__in=rows).values_list("username", flat=True)
+    for username in existing:
+        del rows[username]
+    return list(rows.values())
+
+
+def _make_user(row, password):
+    date_joined = parse_datetime(row.get("date_joined") or "") or timezone.now()
+    if timezone.is_naive(date_joined):
+        date_joined = timezone.make_aware(date_joined)
+    return User(
+        username=row["username"],
+        email=User.objects.normalize_email(row.get("email") or ""),
+        first_name=row.get("first_name") or "",
+        last_name=row.get("last_name") or "",
+        password=password,
+        date_joined=date_joined,
+    )
+
+
+def _save_batch(rows, hashes):
+    """
+    Пользователи пачки и их профили - в одной транзакции, по одному
+    INSERT на модель; пропущенные строки (логин занят, пока пачка
+    хешировалась) возвращаются вторым значением
+    """
+    hashes = iter(hashes)
+    users = [_make_user(row, row.get("password_hash") or next(hashes)) for row in rows]
+    with transaction.atomic():
+        existing = set(
+            User.objects.filter(
+                username__in=[user.username for user in users]
+            ).values_list("username", flat=True)
+        )
+        users = [user for user in users if user.username not in existing]
+        User.objects.bulk_create(users)
+        slugs = unique_slugify_batch(Profile, [user.username for user in users])
+        Profile.objects.bulk_create(
+            Profile(user=user, slug=slug) for user, slug in zip(users, slugs)
+        )
+    return len(users), len(existing)
+
+
+def import_users(rows, batch_size=1000, workers=None):
+    """
+    Импорт пользователей из потока словарей (username, email, first_name,
+    last_name, date_joined и password либо готовый password_hash).
+
+    Пароли хешируются пулом процессов: пока пачка сохраняется, хешируется
+    следующая, поэтому в памяти не больше двух пачек. Пользователи и профили
+    создаются bulk_create - post_save (create_user_profile) не вызывается,
+    профили создаются здесь же в той же транзакции, приветственные письма
+    импортированным пользователям не отправляются.
+
+    Генератор: после каждой пачки - (создано, пропущено)
+    """
+    workers = workers or os.cpu_count() or 1
+    pending = None
+    with ProcessPoolExecutor(workers, initializer=django.setup) as pool:
+        for batch in _batches(rows, batch_size):
+            in_flight = {row["username"] for row in pending[0]} if pending else ()
+            new_rows = _new_rows(batch, in_flight)
+            passwords = [
+                row.get("password") for row in new_rows if not row.get("password_hash")
+            ]
+            chunksize = max(1, len(passwords) // (workers * 4))
+            hashes = pool.map(hash_password, passwords, chunksize=chunksize)
+            if pending:
+                created, skipped = _save_batch(*pending)
+                yield created, skipped + pending_skipped
+            pending, pending_skipped = (new_rows, hashes), len(batch) - len(new_rows)
+        if pending:
+            created, skipped = _save_batch(*pending)
+            yield created, skipped + pending_skipped
@@ -0,0 +1,58 @@
+import csv
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.accounts.imports import import_users
+
+
+class Command(BaseCommand):
+    """
+    Импорт пользователей из CSV с заголовком (username, email, first_name,
+    last_name, date_joined, password или готовый password_hash). Файл
+    читается потоком, пароли хешируются пулом процессов, пользователи и
+    профили создаются пачками через bulk_create
+    """
+
+    help = "Массовый импорт пользователей из CSV файла"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV файл, '-' - стандартный ввод")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Количество пользователей, создаваемых одним запросом",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Процессов хеширования паролей (по умолчанию - по числу ядер)",
+        )
+
+    def handle(self, *args, **options):
+        if options["path"] == "-":
+            self.import_file(sys.stdin, options)
+        else:
+            with open(options["path"], newline="", encoding="utf-8-sig") as file:
+                self.import_file(file, options)
+
+    def import_file(self, file, options):
+        started = time.perf_counter()
+        created = skipped = 0
+        for batch_created, batch_skipped in import_users(
+            csv.DictReader(file), options["batch_size"], options["workers"]
+        ):
+            created += batch_created
+            skipped += batch_skipped
+            if options["verbosity"] > 1:
+                self.stdout.write(f"Создано: {created}, пропущено: {skipped}")
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Создано пользователей: {created}, пропущено: {skipped}"
+                f" за {elapsed:.1f} с ({created / elapsed if elapsed else 0:.0f}/с)"
+            )
+        )
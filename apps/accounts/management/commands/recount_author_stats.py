@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from apps.accounts.stats import refresh_author_stats
+
+
+class Command(BaseCommand):
+    """
+    Полный пересчёт статистики авторов (записи, комментарии, полученный рейтинг)
+    """
+
+    help = "Пересчитывает счётчики статистики в профилях пользователей"
+
+    def handle(self, *args, **options):
+        refresh_author_stats()
+        self.stdout.write(self.style.SUCCESS("Статистика авторов пересчитана"))
@@ -1,11 +1,25 @@
+from django.conf import settings
 from django.contrib.auth.models import User
 from django.core.cache import cache
 from django.utils import timezone
 from django.utils.deprecation import MiddlewareMixin
 
+from .presence import arecord_activity, record_activity
+
+
+def is_file_request(request):
+    """
+    Запросы статики и медиафайлов не трогают сессию: иначе каждый файл
+    стоит запроса к сессиям, а ответ получает Vary: Cookie и не кэшируется
+    общими кэшами
+    """
+    return request.path.startswith((settings.STATIC_URL, settings.MEDIA_URL))
+
 
 class ActiveUserMiddleware(MiddlewareMixin):
     def process_request(self, request):
+        if is_file_request(request):
+            return
         if request.user.is_authenticated and request.session.session_key:
             cache_key = f"last-seen-{request.user.id}"
             last_login = cache.get(cache_key)
@@ -16,3 +30,22 @@ class ActiveUserMiddleware(MiddlewareMixin):
                 )
                 # Устанавливаем кэш на 300 секунд с текущей датой по ключу last-seen-<user_id>
                 cache.set(cache_key, timezone.now(), 300)
+                # Отмечаем пользователя в корзине присутствия текущей минуты
+                record_activity(request.user.id)
+
+    async def __acall__(self, request):
+        """
+        Асинхронный путь под ASGI: без переключения в поток через sync_to_async
+        """
+        if is_file_request(request):
+            return await self.get_response(request)
+        user = await request.auser()
+        if user.is_authenticated and request.session.session_key:
+            cache_key = f"last-seen-{user.id}"
+            last_login = await cache.aget(cache_key)
+
+            if not last_login:
+                await User.objects.filter(id=user.id).aupdate(last_login=timezone.now())
+                await cache.aset(cache_key, timezone.now(), 300)
+                await arecord_activity(user.id)
+        return await self.get_response(request)
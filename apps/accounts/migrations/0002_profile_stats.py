@@ -0,0 +1,70 @@
+# Generated by Django 5.1.1 on 2026-10-19 12:15
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_profile_stats(apps, schema_editor):
+    """
+    Начальное заполнение счётчиков по уже существующим данным
+    """
+    Profile = apps.get_model("accounts", "Profile")
+    Post = apps.get_model("blog", "Post")
+    Comment = apps.get_model("blog", "Comment")
+    Rating = apps.get_model("blog", "Rating")
+
+    def user_total(queryset, field, aggregate):
+        return Coalesce(
+            Subquery(
+                queryset.filter(**{field: OuterRef("user_id")})
+                .order_by()
+                .values(field)
+                .annotate(total=aggregate)
+                .values("total")
+            ),
+            Value(0),
+        )
+
+    Profile.objects.update(
+        post_count=user_total(
+            Post.objects.filter(status="published"), "author", Count("pk")
+        ),
+        comment_count=user_total(
+            Comment.objects.filter(status="published"), "author", Count("pk")
+        ),
+        rating_received=user_total(Rating.objects, "post__author", Sum("value")),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0001_initial"),
+        ("blog", "0009_post_author_create_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="profile",
+            name="comment_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Опубликовано комментариев"
+            ),
+        ),
+        migrations.AddField(
+            model_name="profile",
+            name="post_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Опубликовано записей"
+            ),
+        ),
+        migrations.AddField(
+            model_name="profile",
+            name="rating_received",
+            field=models.IntegerField(
+                default=0, editable=False, verbose_name="Рейтинг записей"
+            ),
+        ),
+        migrations.RunPython(fill_profile_stats, migrations.RunPython.noop),
+    ]
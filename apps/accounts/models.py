@@ -1,12 +1,12 @@
 from django.contrib.auth.models import User
-from django.core.cache import cache
 from django.core.validators import FileExtensionValidator
 from django.db import models
 from django.urls import reverse
-from django.utils import timezone
 
 from apps.services.utils import unique_slugify
 
+from . import presence
+
 
 class Profile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
@@ -20,6 +20,15 @@ class Profile(models.Model):
     )
     bio = models.TextField(verbose_name="Информация о себе", max_length=500, blank=True)
     birth_date = models.DateField(verbose_name="Дата рождения", blank=True, null=True)
+    post_count = models.PositiveIntegerField(
+        verbose_name="Опубликовано записей", default=0, editable=False
+    )
+    comment_count = models.PositiveIntegerField(
+        verbose_name="Опубликовано комментариев", default=0, editable=False
+    )
+    rating_received = models.IntegerField(
+        verbose_name="Рейтинг записей", default=0, editable=False
+    )
 
     class Meta:
         ordering = ("user",)
@@ -38,9 +47,4 @@ class Profile(models.Model):
         return reverse("profile_detail", kwargs={"slug": self.slug})
 
     def is_online(self):
-        last_seen = cache.get(f"last-seen-{self.user.id}")
-        if last_seen is not None and timezone.now() < last_seen + timezone.timedelta(
-            seconds=300
-        ):
-            return True
-        return False
+        return presence.is_online(self.user_id)
@@ -0,0 +1,110 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+
+# Активность хранится в корзинах по минутам без общих изменяемых значений:
+# presence-<минута>-<id> - отметка пользователя (атомарный add),
+# presence-<минута>-count - счётчик занятых слотов (incr), слот
+# presence-<минута>-slot-<n> - id пользователя, отмеченного n-м
+BUCKET_SECONDS = 60
+ONLINE_WINDOW = 300
+BUCKET_TIMEOUT = ONLINE_WINDOW + BUCKET_SECONDS
+
+
+def _user_key(bucket, user_id):
+    return f"presence-{bucket}-{user_id}"
+
+
+def _count_key(bucket):
+    return f"presence-{bucket}-count"
+
+
+def _slot_key(bucket, slot):
+    return f"presence-{bucket}-slot-{slot}"
+
+
+def _current_bucket():
+    return int(time.time() // BUCKET_SECONDS)
+
+
+def _window_buckets():
+    """
+    Корзины, покрывающие окно «в сети» (включая текущую минуту)
+    """
+    current = _current_bucket()
+    return [current - offset for offset in range(ONLINE_WINDOW // BUCKET_SECONDS + 1)]
+
+
+def record_activity(user_id):
+    """
+    Отметка активности пользователя в корзине текущей минуты
+    """
+    bucket = _current_bucket()
+    if cache.add(_user_key(bucket, user_id), True, BUCKET_TIMEOUT):
+        cache.add(_count_key(bucket), 0, BUCKET_TIMEOUT)
+        slot = cache.incr(_count_key(bucket))
+        cache.set(_slot_key(bucket, slot), user_id, BUCKET_TIMEOUT)
+
+
+async def arecord_activity(user_id):
+    bucket = _current_bucket()
+    if await cache.aadd(_user_key(bucket, user_id), True, BUCKET_TIMEOUT):
+        await cache.aadd(_count_key(bucket), 0, BUCKET_TIMEOUT)
+        slot = await cache.aincr(_count_key(bucket))
+        await cache.aset(_slot_key(bucket, slot), user_id, BUCKET_TIMEOUT)
+
+
+def online_user_ids():
+    """
+    Множество id пользователей в сети: счётчики корзин окна и их слоты -
+    два get_many
+    """
+    buckets = {_count_key(bucket): bucket for bucket in _window_buckets()}
+    slot_keys = [
+        _slot_key(buckets[key], slot)
+        for key, count in cache.get_many(buckets).items()
+        for slot in range(1, count + 1)
+    ]
+    return set(cache.get_many(slot_keys).values())
+
+
+def online_status(user_ids):
+    """
+    Статус «в сети» для пачки пользователей за одно обращение к кэшу
+    """
+    buckets = _window_buckets()
+    found = cache.get_many(
+        [_user_key(bucket, user_id) for user_id in user_ids for bucket in buckets]
+    )
+    return {
+        user_id: any(_user_key(bucket, user_id) in found for bucket in buckets)
+        for user_id in user_ids
+    }
+
+
+def online_among(user_ids):
+    """
+    Пользователи в сети из заданного набора
+    """
+    return {user_id for user_id, online in online_status(user_ids).items() if online}
+
+
+def is_online(user_id):
+    return online_status([user_id])[user_id]
+
+
+def online_count():
+    return len(online_user_ids())
+
+
+def online_users(limit=None):
+    """
+    Пользователи в сети вместе с профилями (для виджета «Кто в сети»)
+    """
+    queryset = (
+        User.objects.filter(id__in=online_user_ids())
+        .select_related("profile")
+        .order_by("username")
+    )
+    return queryset[:limit] if limit else queryset
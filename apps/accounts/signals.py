@@ -2,10 +2,19 @@ from django.contrib.auth.models import User
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 
+from apps.jobs.queue import enqueue
+
 from .models import Profile
+from .tasks import send_welcome_email
 
 
 @receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
     if created:
         Profile.objects.create(user=instance)
+        if instance.email:
+            enqueue(
+                send_welcome_email,
+                key=f"welcome-email-{instance.pk}",
+                user_id=instance.pk,
+            )
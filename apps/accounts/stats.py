@@ -0,0 +1,118 @@
+from django.db.models import Case, Count, F, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+
+from apps.blog.models import Comment, Post, RatingRollup
+
+from .models import Profile
+
+
+def _count_subquery(queryset, field):
+    """
+    Подзапрос количества строк пользователя для UPDATE профилей
+    """
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{field: OuterRef("user_id")})
+            .order_by()
+            .values(field)
+            .annotate(total=Count("pk"))
+            .values("total")
+        ),
+        Value(0),
+    )
+
+
+def _add_counts(field, deltas):
+    """
+    Изменение счётчика профилей на разницу {user_id: delta} одним UPDATE
+    """
+    deltas = {user_id: delta for user_id, delta in deltas.items() if delta}
+    if not deltas:
+        return 0
+    return Profile.objects.filter(user_id__in=deltas).update(
+        **{
+            field: F(field)
+            + Case(
+                *[
+                    When(user_id=user_id, then=Value(delta))
+                    for user_id, delta in deltas.items()
+                ],
+                default=Value(0),
+            )
+        }
+    )
+
+
+def add_post_counts(deltas):
+    """
+    Инкрементальное изменение числа опубликованных записей авторов
+    """
+    return _add_counts("post_count", deltas)
+
+
+def add_comment_counts(deltas):
+    """
+    Инкрементальное изменение числа опубликованных комментариев
+    """
+    return _add_counts("comment_count", deltas)
+
+
+def refresh_post_counts(user_ids=None):
+    """
+    Полный пересчёт опубликованных записей авторов одним UPDATE (по индексу
+    автора) - для восстановления счётчиков
+    """
+    profiles = Profile.objects.all()
+    if user_ids is not None:
+        profiles = profiles.filter(user_id__in=set(user_ids))
+    return profiles.update(
+        post_count=_count_subquery(Post.objects.filter(status="published"), "author")
+    )
+
+
+def refresh_comment_counts(user_ids=None):
+    """
+    Полный пересчёт опубликованных комментариев пользователей одним UPDATE
+    """
+    profiles = Profile.objects.all()
+    if user_ids is not None:
+        profiles = profiles.filter(user_id__in=set(user_ids))
+    return profiles.update(
+        comment_count=_count_subquery(
+            Comment.objects.filter(status="published"), "author"
+        )
+    )
+
+
+def add_rating_received(post_id, delta):
+    """
+    Инкрементальное изменение рейтинга автора записи на delta
+    """
+    if delta:
+        Profile.objects.filter(user__author_posts=post_id).update(
+            rating_received=F("rating_received") + delta
+        )
+
+
+def refresh_rating_received(user_ids=None):
+    """
+    Полный пересчёт полученного рейтинга (для восстановления счётчиков)
+    по почасовым сводкам, которые сохраняются и после архивации оценок
+    """
+    profiles = Profile.objects.all()
+    if user_ids is not None:
+        profiles = profiles.filter(user_id__in=set(user_ids))
+    received = (
+        RatingRollup.objects.filter(post__author=OuterRef("user_id"))
+        .order_by()
+        .values("post__author")
+        .annotate(total=Coalesce(Sum(F("likes") - F("dislikes")), Value(0)))
+        .values("total")
+    )
+    return profiles.update(rating_received=Coalesce(Subquery(received), Value(0)))
+
+
+def refresh_author_stats(user_ids=None):
+    refresh_post_counts(user_ids)
+    refresh_comment_counts(user_ids)
+    refresh_rating_received(user_ids)
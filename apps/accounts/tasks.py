@@ -0,0 +1,24 @@
+from django.contrib.auth.models import User
+from django.core.mail import send_mail
+
+from apps.jobs.queue import task
+
+
+@task
+def send_welcome_email(user_id):
+    """
+    Приветственное письмо после регистрации
+    """
+    user = User.objects.filter(pk=user_id).first()
+    if user is None or not user.email:
+        return
+    send_mail(
+        subject="Добро пожаловать на сайт!",
+        message=(
+            f"Здравствуйте, {user.username}!\n\n"
+            "Вы успешно зарегистрировались. Теперь вы можете публиковать записи "
+            "и оставлять комментарии."
+        ),
+        from_email=None,
+        recipient_list=[user.email],
+    )
@@ -1,3 +1,213 @@
-from django.test import TestCase
+import csv
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.contrib.auth.hashers import check_password, make_password
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from apps.blog.models import Category, Comment, Post
+from apps.blog.moderation import set_comments_status, set_posts_status
+
+from . import presence
+from .models import Profile
+
+LOCMEM_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "OPTIONS": {"MAX_ENTRIES": 10_000},
+    }
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class PresenceTest(SimpleTestCase):
+    """
+    Отметки присутствия в корзинах по минутам без общих изменяемых значений
+    """
+
+    def setUp(self):
+        presence.cache.clear()
+
+    def test_online_lookups(self):
+        presence.record_activity(1)
+        presence.record_activity(1)
+        async_to_sync(presence.arecord_activity)(2)
+
+        self.assertEqual(presence.online_user_ids(), {1, 2})
+        self.assertEqual(
+            presence.online_status([1, 2, 3]), {1: True, 2: True, 3: False}
+        )
+        self.assertEqual(presence.online_among({2, 3}), {2})
+        self.assertTrue(presence.is_online(1))
+        self.assertFalse(presence.is_online(3))
+
+    def test_concurrent_activity_is_not_lost(self):
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            list(pool.map(presence.record_activity, range(200)))
+        self.assertEqual(presence.online_user_ids(), set(range(200)))
+
+    def test_activity_expires_after_window(self):
+        presence.record_activity(1)
+        later = time.time() + presence.ONLINE_WINDOW + 2 * presence.BUCKET_SECONDS
+        with mock.patch.object(presence.time, "time", return_value=later):
+            presence.record_activity(2)
+            self.assertEqual(presence.online_user_ids(), {2})
+            self.assertFalse(presence.is_online(1))
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class AuthorStatsTest(TestCase):
+    """
+    Счётчики опубликованных записей и комментариев меняются на разницу при
+    смене статуса или автора; полный пересчёт - только командой
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user("author")
+        cls.other = User.objects.create_user("other")
+        cls.category = Category.objects.create(title="Статистика", slug="stats")
+
+    def create_post(self, status="published"):
+        return Post.objects.create(
+            title="Запись",
+            description="Описание",
+            text="Текст",
+            category=self.category,
+            author=self.author,
+            status=status,
+        )
+
+    def counts(self, user):
+        profile = Profile.objects.get(user=user)
+        return profile.post_count, profile.comment_count
+
+    def test_post_counts_follow_status_and_author(self):
+        post = self.create_post()
+        draft = self.create_post(status="draft")
+        self.assertEqual(self.counts(self.author), (1, 0))
+
+        post = Post.objects.get(pk=post.pk)
+        post.status = "draft"
+        post.save()
+        post.save()
+        self.assertEqual(self.counts(self.author), (0, 0))
+
+        post.status = "published"
+        post.author = self.other
+        post.save()
+        self.assertEqual(self.counts(self.author), (0, 0))
+        self.assertEqual(self.counts(self.other), (1, 0))
+
+        set_posts_status(Post.objects.filter(pk=draft.pk), "published")
+        self.assertEqual(self.counts(self.author), (1, 0))
+        Post.objects.get(pk=post.pk).delete()
+        self.assertEqual(self.counts(self.other), (0, 0))
+
+    def test_comment_counts(self):
+        post = self.create_post()
+        root = Comment.objects.create(post=post, author=self.other, content="Да")
+        Comment.objects.create(
+            post=post, author=self.other, content="Ответ", parent=root
+        )
+        Comment.objects.create(
+            post=post, author=self.other, content="Черновик", status="draft"
+        )
+        self.assertEqual(self.counts(self.other), (0, 2))
+
+        set_comments_status(Comment.objects.filter(author=self.other), "published")
+        self.assertEqual(self.counts(self.other), (0, 3))
+        # Ответы удаляются вместе с корневым комментарием
+        Comment.objects.get(pk=root.pk).delete()
+        self.assertEqual(self.counts(self.other), (0, 1))
+        post.delete()
+        self.assertEqual(self.counts(self.other), (0, 0))
+
+    def test_save_does_not_recount(self):
+        post = Post.objects.get(pk=self.create_post().pk)
+        post.title = "Новое название"
+        with CaptureQueriesContext(connection) as context:
+            post.save()
+        self.assertFalse(
+            [
+                query["sql"]
+                for query in context.captured_queries
+                if "accounts_profile" in query["sql"]
+            ]
+        )
+
+    def test_recount_command(self):
+        self.create_post()
+        Profile.objects.filter(user=self.author).update(post_count=10, comment_count=5)
+        call_command("recount_author_stats", stdout=StringIO())
+        self.assertEqual(self.counts(self.author), (1, 0))
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class ImportUsersTest(TestCase):
+    """
+    Импорт из CSV пачками: повторы и существующие пользователи пропускаются,
+    профили создаются вместе с пользователями
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.existing = User.objects.create_user("author")
+
+    def write_csv(self, rows):
+        fd, path = tempfile.mkstemp(suffix=".csv")
+        self.addCleanup(os.remove, path)
+        with os.fdopen(fd, "w", newline="", encoding="utf-8") as file:
+            writer = csv.DictWriter(
+                file, ("username", "email", "password", "password_hash")
+            )
+            writer.writeheader()
+            writer.writerows(rows)
+        return path
+
+    def import_users(self, path):
+        out = StringIO()
+        call_command("import_users", path, "--batch-size=2", "--workers=1", stdout=out)
+        return out.getvalue()
+
+    def test_import(self):
+        path = self.write_csv(
+            [
+                {"username": "reader", "email": "Reader@EXAMPLE.com", "password": "pw"},
+                {"username": "author", "password": "pw"},
+                # Повтор из предыдущей пачки, которая ещё хешируется
+                {"username": " reader ", "password": "other"},
+                # Тот же SLUG, что у профиля author
+                {"username": "Author", "password": "pw"},
+                {"username": "hashed", "password_hash": make_password("ready")},
+                {"username": "", "password": "pw"},
+                {"username": "nopass"},
+            ]
+        )
+
+        self.assertIn("Создано пользователей: 4, пропущено: 3", self.import_users(path))
+        reader = User.objects.get(username="reader")
+        self.assertEqual(reader.email, "Reader@example.com")
+        self.assertTrue(check_password("pw", reader.password))
+        self.assertTrue(
+            check_password("ready", User.objects.get(username="hashed").password)
+        )
+        self.assertFalse(User.objects.get(username="nopass").has_usable_password())
+        self.assertEqual(Profile.objects.count(), User.objects.count())
+        self.assertNotEqual(
+            Profile.objects.get(user__username="Author").slug,
+            self.existing.profile.slug,
+        )
+
+        # Повторный запуск (например, после прерывания) ничего не создаёт
+        self.assertIn("Создано пользователей: 0, пропущено: 7", self.import_users(path))
+        self.assertEqual(User.objects.count(), 5)
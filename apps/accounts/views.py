@@ -1,26 +1,43 @@
 from django.contrib.auth.views import LoginView, LogoutView
 from django.contrib.messages.views import SuccessMessageMixin
 from django.db import transaction
+from django.http import Http404
 from django.urls import reverse_lazy
 from django.views.generic import CreateView, DetailView, UpdateView
 
-from .forms import (ProfileUpdateForm, UserLoginForm, UserRegisterForm,
-                    UserUpdateForm)
+from apps.blog.models import Post
+from apps.services.mixins import ConditionalGetMixin
+from apps.services.pagination import keyset_paginate
+
+from .conditional import profile_validators
+from .forms import ProfileUpdateForm, UserLoginForm, UserRegisterForm, UserUpdateForm
 from .models import Profile
 
 
-class ProfileDetailView(DetailView):
+class ProfileDetailView(ConditionalGetMixin, DetailView):
     """
     Представление для просмотра профиля
     """
 
-    model = Profile
+    queryset = Profile.objects.select_related("user")
     context_object_name = "profile"
     template_name = "accounts/profile_detail.html"
+    posts_paginate_by = 5
+
+    def get_validators(self):
+        return profile_validators(self.request, self.kwargs[self.slug_url_kwarg])
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["title"] = f"Профиль пользователя: {self.object.user.username}"
+        try:
+            context["author_posts"] = keyset_paginate(
+                Post.custom.for_list().filter(author_id=self.object.user_id),
+                cursor=self.request.GET.get("cursor"),
+                page_size=self.posts_paginate_by,
+            )
+        except ValueError:
+            raise Http404("Неверный курсор страницы записей")
         return context
 
 
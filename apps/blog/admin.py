@@ -1,7 +1,65 @@
 from django.contrib import admin
+from django.db.models import Exists, OuterRef
+from django.template.response import TemplateResponse
+from django.urls import path
 from django_mptt_admin.admin import DjangoMpttAdmin
 
-from apps.blog.models import Category, Comment, Post, Rating
+from apps.blog.models import Category, Comment, Post, Rating, RatingRollup
+from apps.blog.moderation import set_comments_status, set_posts_status
+from apps.blog.rollups import rating_series, top_posts
+from apps.services.pagination import EstimatedCountPaginator
+
+
+class LargeTableAdminMixin:
+    """
+    Настройки списков для больших таблиц: оценка количества строк вместо
+    COUNT(*) и без повторного подсчёта общего числа записей
+    """
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+def status_actions(set_status):
+    """
+    Действия массовой модерации: смена статуса выбранных строк одним UPDATE
+    """
+
+    @admin.action(description="Опубликовать выбранные")
+    def publish(modeladmin, request, queryset):
+        updated = set_status(queryset, "published")
+        modeladmin.message_user(request, f"Опубликовано: {updated}")
+
+    @admin.action(description="Перевести выбранные в черновики")
+    def draft(modeladmin, request, queryset):
+        updated = set_status(queryset, "draft")
+        modeladmin.message_user(request, f"Переведено в черновики: {updated}")
+
+    return [publish, draft]
+
+
+class CommentPostFilter(admin.SimpleListFilter):
+    """
+    Фильтр комментариев по записи: варианты - последние записи с
+    комментариями, любая другая запись - параметром ?post=<id>
+    """
+
+    title = "запись"
+    parameter_name = "post"
+    choices_limit = 20
+
+    def lookups(self, request, model_admin):
+        posts = (
+            Post.objects.filter(Exists(Comment.objects.filter(post=OuterRef("pk"))))
+            .order_by("-pk")
+            .values_list("pk", "title")[: self.choices_limit]
+        )
+        return [(str(pk), title) for pk, title in posts]
+
+    def queryset(self, request, queryset):
+        if self.value() and self.value().isdigit():
+            return queryset.filter(post_id=self.value())
+        return queryset
 
 
 @admin.register(Category)
@@ -11,30 +69,134 @@ class CategoryAdmin(DjangoMpttAdmin):
     """
 
     prepopulated_fields = {"slug": ("title",)}
+    search_fields = ("title",)
 
 
 @admin.register(Post)
-class PostAdmin(admin.ModelAdmin):
+class PostAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     """
     Админ-панель модели записей
     """
 
     prepopulated_fields = {"slug": ("title",)}
+    list_display = ("title", "author", "category", "status", "fixed", "create")
+    list_select_related = ("author", "category")
+    list_filter = ("status", "fixed")
+    search_fields = ("title",)
+    autocomplete_fields = ("author", "updater", "category")
+    date_hierarchy = "create"
+    ordering = ("-create",)
+    actions = status_actions(set_posts_status)
 
 
 @admin.register(Comment)
-class CommentAdminPage(DjangoMpttAdmin):
+class CommentAdminPage(LargeTableAdminMixin, DjangoMpttAdmin):
     """
     Админ-панель модели комментариев
     """
 
-    pass
+    # Дерево загружается по уровням: сначала корневые комментарии,
+    # ответы подгружаются при раскрытии узла
+    tree_load_on_demand = 0
+    tree_auto_open = 0
+    # Каждый комментарий верхнего уровня - отдельный корень: в дереве только
+    # последние ветки, остальные - через фильтр по записи или таблицу
+    tree_roots_limit = 200
+    list_display = ("author", "post", "status", "time_create")
+    list_select_related = ("author", "post")
+    list_filter = ("status", CommentPostFilter)
+    raw_id_fields = ("post", "author", "parent")
+    date_hierarchy = "time_create"
+    actions = status_actions(set_comments_status)
+
+    def filter_tree_queryset(self, queryset, request):
+        # Подпись узла дерева - str(comment) с именем автора
+        queryset = queryset.select_related("author")
+        if request.GET.get("node"):
+            return queryset
+        # Новая ветка получает следующий tree_id - последние ветки по индексу
+        tree_ids = queryset.order_by("-tree_id").values_list("tree_id", flat=True)
+        return queryset.filter(tree_id__in=list(tree_ids[: self.tree_roots_limit]))
 
 
 @admin.register(Rating)
-class RatingAdmin(admin.ModelAdmin):
+class RatingAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     """
     Админ-панель модели рейтинга
     """
 
-    pass
+    list_display = ("post", "user", "value", "ip_address", "time_create")
+    list_select_related = ("post", "user")
+    list_filter = ("value",)
+    raw_id_fields = ("post", "user")
+    date_hierarchy = "time_create"
+
+
+@admin.register(RatingRollup)
+class RatingRollupAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    """
+    Админ-панель почасовых сводок оценок (только просмотр) с аналитикой
+    """
+
+    list_display = ("post", "hour", "likes", "dislikes")
+    list_select_related = ("post",)
+    raw_id_fields = ("post",)
+    date_hierarchy = "hour"
+    change_list_template = "admin/blog/ratingrollup/change_list.html"
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+    def get_urls(self):
+        return [
+            path(
+                "analytics/",
+                self.admin_site.admin_view(self.analytics_view),
+                name="blog_ratingrollup_analytics",
+            ),
+            *super().get_urls(),
+        ]
+
+    def analytics_view(self, request):
+        """
+        Графики оценок по дням (или часам) за период - только по сводкам
+        """
+        try:
+            days = min(max(int(request.GET.get("days", 14)), 1), 365)
+            post_id = int(request.GET["post"]) if request.GET.get("post") else None
+        except ValueError:
+            days, post_id = 14, None
+        by = "hour" if request.GET.get("by") == "hour" and days <= 7 else "day"
+
+        series = rating_series(days=days, by=by, post_id=post_id)
+        peak = max([row["likes"] + row["dislikes"] for row in series] + [1])
+        for row in series:
+            row["likes_width"] = round(100 * row["likes"] / peak, 1)
+            row["dislikes_width"] = round(100 * row["dislikes"] / peak, 1)
+
+        post = (
+            Post.objects.filter(pk=post_id).only("title").first() if post_id else None
+        )
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.opts,
+            "title": f"Аналитика оценок: {post.title}" if post else "Аналитика оценок",
+            "series": series,
+            "top_posts": top_posts(days=days) if post is None else [],
+            "days": days,
+            "by": by,
+            "post": post,
+            "totals": {
+                "likes": sum(row["likes"] for row in series),
+                "dislikes": sum(row["dislikes"] for row in series),
+            },
+        }
+        return TemplateResponse(
+            request, "admin/blog/ratingrollup/analytics.html", context
+        )
@@ -0,0 +1,288 @@
+import json
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.http import Http404, HttpResponse, JsonResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.views import View
+from taggit.models import Tag, TaggedItem
+
+from apps.services.mixins import ReplicaReadMixin
+from apps.services.pagination import keyset_paginate
+from apps.services.utils import make_etag
+
+from .models import Category, Comment, Post, rating_sum_subquery
+
+
+class ApiError(Exception):
+    pass
+
+
+class ApiView(ReplicaReadMixin, View):
+    """
+    Базовое представление JSON API v1: выборка через values() без создания
+    моделей, разреженные наборы полей (?fields=), курсорная пагинация и ETag
+    по содержимому ответа
+    """
+
+    # Публичное имя поля -> путь в values(); None - поле вычисляется отдельно
+    fields = {}
+    default_fields = ()
+    # Пути values(), выбираемые всегда (нужны для вычисляемых полей)
+    required = ()
+    ordering = ("pk",)
+    default_limit = 20
+    max_limit = 100
+
+    def get(self, request, *args, **kwargs):
+        try:
+            payload = self.get_payload()
+        except ApiError as e:
+            return JsonResponse({"error": str(e)}, status=400)
+
+        content = json.dumps(payload, cls=DjangoJSONEncoder, ensure_ascii=False)
+        etag = make_etag(content)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(content, content_type="application/json")
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = "no-cache"
+        return response
+
+    def get_payload(self):
+        raise NotImplementedError
+
+    def get_fields(self):
+        requested = self.request.GET.get("fields")
+        if not requested:
+            return list(self.default_fields)
+        names = [name.strip() for name in requested.split(",") if name.strip()]
+        unknown = set(names) - set(self.fields)
+        if unknown:
+            raise ApiError(f"Неизвестные поля: {', '.join(sorted(unknown))}")
+        return names
+
+    def get_limit(self):
+        try:
+            limit = int(self.request.GET.get("limit", self.default_limit))
+        except ValueError:
+            raise ApiError("limit должен быть числом")
+        return min(max(limit, 1), self.max_limit)
+
+    def select(self, queryset, names):
+        """
+        Строки values() с полями сортировки и запрошенными полями
+        """
+        keys = [name.lstrip("-") for name in self.ordering]
+        paths = [self.fields[name] for name in names if self.fields[name]]
+        return queryset.values(*dict.fromkeys([*keys, *self.required, *paths]))
+
+    def rename(self, row, names):
+        return {name: row[self.fields[name]] for name in names if self.fields[name]}
+
+    def paginate(self, queryset, names):
+        try:
+            page = keyset_paginate(
+                self.select(queryset, names),
+                cursor=self.request.GET.get("cursor"),
+                page_size=self.get_limit(),
+                ordering=self.ordering,
+            )
+        except ValueError as e:
+            raise ApiError(str(e))
+        return page
+
+
+def post_tags(post_ids):
+    """
+    Теги набора записей одним запросом: {post_id: [name, ...]}
+    """
+    tags = {post_id: [] for post_id in post_ids}
+    rows = (
+        TaggedItem.objects.filter(
+            content_type=ContentType.objects.get_for_model(Post),
+            object_id__in=post_ids,
+        )
+        .order_by("tag__name")
+        .values_list("object_id", "tag__name")
+    )
+    for post_id, name in rows:
+        tags[post_id].append(name)
+    return tags
+
+
+def tags_with_post_counts():
+    """
+    Теги с числом записей: коррелированный подзапрос по индексу tag_id
+    вместо соединения с GROUP BY - страница тегов читается по первичному
+    ключу без сортировки всей таблицы
+    """
+    tagged_posts = (
+        TaggedItem.objects.filter(
+            tag=OuterRef("pk"),
+            content_type=ContentType.objects.get_for_model(Post),
+        )
+        .order_by()
+        .values("tag")
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    return Tag.objects.annotate(posts=Coalesce(Subquery(tagged_posts), Value(0)))
+
+
+class PostFieldsMixin:
+    fields = {
+        "id": "pk",
+        "title": "title",
+        "slug": "slug",
+        "url": None,
+        "excerpt": "excerpt",
+        "author": "author__username",
+        "category": "category__slug",
+        "create": "create",
+        "update": "update",
+        "views": "views",
+        "reading_time": "reading_time",
+        "word_count": "word_count",
+        "rating_sum": "rating_sum",
+        "tags": None,
+    }
+    required = ("pk", "slug")
+
+    def serialize_posts(self, rows, names):
+        tags = post_tags([row["pk"] for row in rows]) if "tags" in names else {}
+        items = []
+        for row in rows:
+            item = self.rename(row, names)
+            if "url" in names:
+                item["url"] = reverse("post_detail", args=[row["slug"]])
+            if "tags" in names:
+                item["tags"] = tags[row["pk"]]
+            items.append(item)
+        return items
+
+
+class PostListApiView(PostFieldsMixin, ApiView):
+    """
+    Список опубликованных записей: ?category=, ?tag=, ?fields=, ?cursor=
+    (запрос записей + запрос тегов, если они запрошены)
+    """
+
+    default_fields = ("id", "title", "slug", "url", "excerpt", "author", "create")
+    ordering = ("-create", "-pk")
+
+    def get_payload(self):
+        names = self.get_fields()
+        queryset = Post.custom.annotate(rating_sum=rating_sum_subquery())
+        if self.request.GET.get("category"):
+            queryset = queryset.filter(category__slug=self.request.GET["category"])
+        if self.request.GET.get("tag"):
+            queryset = queryset.filter(tags__slug=self.request.GET["tag"])
+        page = self.paginate(queryset, names)
+        return {
+            "results": self.serialize_posts(page.items, names),
+            "next_cursor": page.next_cursor,
+        }
+
+
+class PostDetailApiView(PostFieldsMixin, ApiView):
+    """
+    Полная запись с очищенным HTML (запрос записи + запрос тегов)
+    """
+
+    fields = {
+        **PostFieldsMixin.fields,
+        "description_html": "description_html",
+        "text_html": "text_html",
+    }
+    default_fields = tuple(fields)
+
+    def get_payload(self):
+        names = self.get_fields()
+        rows = list(
+            self.select(
+                Post.custom.annotate(rating_sum=rating_sum_subquery()).filter(
+                    slug=self.kwargs["slug"]
+                ),
+                names,
+            )[:1]
+        )
+        if not rows:
+            raise Http404("Запись не найдена")
+        return self.serialize_posts(rows, names)[0]
+
+
+class CategoryListApiView(ApiView):
+    """
+    Дерево категорий плоским списком в порядке обхода (один запрос)
+    """
+
+    fields = {
+        "id": "pk",
+        "title": "title",
+        "slug": "slug",
+        "description": "description",
+        "parent": "parent_id",
+        "level": "level",
+    }
+    default_fields = ("id", "title", "slug", "parent", "level")
+    ordering = ("tree_id", "lft")
+
+    def get_payload(self):
+        names = self.get_fields()
+        rows = self.select(Category.objects.all(), names).order_by(*self.ordering)
+        return {"results": [self.rename(row, names) for row in rows]}
+
+
+class TagListApiView(ApiView):
+    """
+    Теги с количеством записей (один запрос), курсорная пагинация по id
+    """
+
+    fields = {"id": "pk", "name": "name", "slug": "slug", "posts": "posts"}
+    default_fields = tuple(fields)
+
+    def get_payload(self):
+        names = self.get_fields()
+        page = self.paginate(tags_with_post_counts(), names)
+        return {
+            "results": [self.rename(row, names) for row in page.items],
+            "next_cursor": page.next_cursor,
+        }
+
+
+class CommentThreadApiView(ApiView):
+    """
+    Опубликованные комментарии записи в порядке дерева (запрос записи +
+    запрос комментариев), курсорная пагинация по позиции в дереве
+    """
+
+    fields = {
+        "id": "pk",
+        "parent": "parent_id",
+        "level": "level",
+        "author": "author__username",
+        "content": "content",
+        "time_create": "time_create",
+    }
+    default_fields = tuple(fields)
+    ordering = ("tree_id", "lft")
+    default_limit = 50
+
+    def get_payload(self):
+        names = self.get_fields()
+        post_id = (
+            Post.custom.filter(slug=self.kwargs["slug"])
+            .values_list("pk", flat=True)
+            .first()
+        )
+        if post_id is None:
+            raise Http404("Запись не найдена")
+        page = self.paginate(Comment.objects.published_for(post_id), names)
+        return {
+            "results": [self.rename(row, names) for row in page.items],
+            "next_cursor": page.next_cursor,
+        }
@@ -0,0 +1,127 @@
+from asgiref.sync import sync_to_async
+from django.core.paginator import InvalidPage
+from django.http import Http404
+from django.views.generic.base import ContextMixin
+from django.views.generic.detail import SingleObjectMixin
+
+from apps.accounts.presence import online_among
+from apps.blog.forms import CommentCreateForm
+from apps.blog.models import Category, Comment, Post
+from apps.blog.views import PostDetailView, PostFromCategory, PostListView
+from apps.services.counters import register_post_view
+
+
+class AsyncListMixin:
+    """
+    Асинхронная версия ListView: подсчёт и выборка страницы через async ORM,
+    шаблон рендерится обработчиком ASGI после возврата ответа
+    """
+
+    async def get(self, request, *args, **kwargs):
+        self.object_list = await self.aget_queryset()
+        context = await self.aget_context_data()
+        return self.render_to_response(context)
+
+    async def aget_queryset(self):
+        return self.get_queryset()
+
+    async def apaginate_queryset(self, queryset, page_size):
+        paginator = self.get_paginator(
+            queryset,
+            page_size,
+            orphans=self.get_paginate_orphans(),
+            allow_empty_first_page=self.get_allow_empty(),
+        )
+        # Paginator.count - cached_property, заполняем его асинхронным запросом
+        paginator.count = await queryset.acount()
+
+        page = self.kwargs.get(self.page_kwarg) or self.request.GET.get(
+            self.page_kwarg, 1
+        )
+        try:
+            page_number = paginator.num_pages if page == "last" else int(page)
+            page = paginator.page(page_number)
+        except (ValueError, InvalidPage) as e:
+            raise Http404(f"Неверный номер страницы ({page}): {e}")
+
+        page.object_list = [obj async for obj in page.object_list]
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    async def aget_context_data(self, **kwargs):
+        paginator, page, object_list, is_paginated = await self.apaginate_queryset(
+            self.object_list, self.get_paginate_by(self.object_list)
+        )
+        context = {
+            "paginator": paginator,
+            "page_obj": page,
+            "is_paginated": is_paginated,
+            "object_list": object_list,
+            self.context_object_name: object_list,
+        }
+        context.update(kwargs)
+        return ContextMixin.get_context_data(self, **context)
+
+
+class AsyncPostListView(AsyncListMixin, PostListView):
+    """
+    Асинхронное представление: главная страница со списком записей
+    """
+
+    async def aget_context_data(self, **kwargs):
+        return await super().aget_context_data(title="Главная страница", **kwargs)
+
+
+class AsyncPostFromCategory(AsyncListMixin, PostFromCategory):
+    """
+    Асинхронное представление: записи из категории и её подкатегорий
+    """
+
+    async def aget_queryset(self):
+        try:
+            self.category = await Category.objects.aget(slug=self.kwargs["slug"])
+        except Category.DoesNotExist:
+            raise Http404("Категория не найдена")
+        queryset = Post.custom.for_list().filter(category__slug=self.category.slug)
+        if not await queryset.aexists():
+            queryset = Post.custom.for_list().filter(category__parent=self.category)
+        return queryset
+
+    async def aget_context_data(self, **kwargs):
+        return await super().aget_context_data(
+            title=f"Записи из категории: {self.category.title}", **kwargs
+        )
+
+
+class AsyncPostDetailView(PostDetailView):
+    """
+    Асинхронное представление: полная запись
+    """
+
+    async def get(self, request, *args, **kwargs):
+        try:
+            self.object = await Post.objects.select_related("author", "category").aget(
+                slug=self.kwargs[self.slug_url_kwarg]
+            )
+        except Post.DoesNotExist:
+            raise Http404("Запись не найдена")
+        await sync_to_async(register_post_view)(request, self.object.pk)
+        context = await self.aget_context_data(object=self.object)
+        return self.render_to_response(context)
+
+    async def aget_context_data(self, **kwargs):
+        comments = [
+            comment async for comment in Comment.objects.published_for(self.object)
+        ]
+        # Форма проверяет доверие пользователю (профиль из базы)
+        form = await sync_to_async(CommentCreateForm)(user=await self.request.auser())
+        online_user_ids = await sync_to_async(online_among)(
+            {comment.author_id for comment in comments}
+        )
+        context = {
+            "title": self.object.title,
+            "form": form,
+            "comments": comments,
+            "online_user_ids": online_user_ids,
+        }
+        context.update(kwargs)
+        return SingleObjectMixin.get_context_data(self, **context)
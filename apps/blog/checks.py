@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+# Бэкенды кэша с атомарными add/incr, общими для всех процессов сайта
+ATOMIC_CACHE_BACKENDS = {
+    "django.core.cache.backends.redis.RedisCache",
+    "django.core.cache.backends.memcached.PyMemcacheCache",
+    "django.core.cache.backends.memcached.PyLibMCCache",
+}
+
+
+@register(Tags.caches, deploy=True)
+def check_post_views_cache(app_configs, **kwargs):
+    """
+    Буфер просмотров записей рассчитан на атомарный incr общего кэша: в
+    FileBasedCache incr - чтение и запись файла, одновременные просмотры
+    теряются, в LocMemCache у каждого процесса свой счётчик
+    """
+    backend = settings.CACHES["default"]["BACKEND"]
+    if backend in ATOMIC_CACHE_BACKENDS:
+        return []
+    return [
+        Warning(
+            f"Кэш {backend} не поддерживает атомарный incr между процессами: "
+            "часть просмотров записей может не учитываться",
+            hint="Задайте DJANGO_CACHE_BACKEND (Redis или Memcached)",
+            id="blog.W001",
+        )
+    ]
@@ -0,0 +1,72 @@
+from datetime import datetime, timezone
+
+from django.db.models import Max
+
+from apps.accounts.presence import online_among
+from apps.services.trust import trust_state
+from apps.services.utils import make_etag
+from apps.services.versions import SITE_VERSION_KEY, get_versions, post_version_key
+
+from .models import Comment, Post
+
+
+def post_validators(request, slug):
+    """
+    ETag и Last-Modified страницы записи для условного запроса двумя
+    запросами: время обновления записи, последние комментарии её авторов
+    (отметки «в сети» в комментариях), версия оценок из кэша и доверие
+    посетителю (капча в форме комментария)
+    """
+    post = Post.objects.filter(slug=slug).values("pk", "update").first()
+    if post is None:
+        return None, None
+    last_comments = dict(
+        Comment.objects.published_for(post["pk"])
+        .order_by()
+        .values("author_id")
+        .annotate(last=Max("time_update"))
+        .values_list("author_id", "last")
+    )
+    return _validators(
+        request,
+        post["pk"],
+        post["update"],
+        max(last_comments.values(), default=None),
+        online_among(set(last_comments)),
+    )
+
+
+def post_page_validators(request, post, comments, online_user_ids):
+    """
+    Те же валидаторы по записи и комментариям, уже выбранным для страницы,
+    без запросов к базе
+    """
+    return _validators(
+        request,
+        post.pk,
+        post.update,
+        max((comment.time_update for comment in comments), default=None),
+        online_user_ids,
+    )
+
+
+def _validators(request, post_id, updated, last_comment, online_user_ids):
+    versions = get_versions([post_version_key(post_id), SITE_VERSION_KEY])
+    changed_at = datetime.fromtimestamp(max(versions.values()), tz=timezone.utc)
+    trusted, trust_changed_at = trust_state(request.user)
+    last_modified = max(
+        updated,
+        last_comment or updated,
+        changed_at,
+        trust_changed_at or changed_at,
+    )
+    etag = make_etag(
+        post_id,
+        updated,
+        last_comment,
+        sorted(versions.items()),
+        sorted(online_user_ids),
+        request.user.pk,
+        trusted,
+    )
+    return etag, last_modified
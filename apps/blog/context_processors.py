@@ -0,0 +1,14 @@
+from django.conf import settings
+
+from apps.services.versions import SITE_VERSION_KEY, get_versions
+
+
+def fragment_cache(request):
+    """
+    Параметры кэширования фрагментов шаблонов: время жизни и версия общих
+    данных сайта (дерево категорий) для ключа фрагмента
+    """
+    return {
+        "fragment_cache_timeout": settings.FRAGMENT_CACHE_TIMEOUT,
+        "site_version": get_versions([SITE_VERSION_KEY])[SITE_VERSION_KEY],
+    }
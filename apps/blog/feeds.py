@@ -1,6 +1,13 @@
+from asgiref.sync import markcoroutinefunction
+from django.conf import settings
 from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.http import HttpResponse
 from django.urls import reverse
 
+from apps.services.routers import use_replica
+from apps.services.versions import POSTS_VERSION_KEY, get_versions
+
 from .models import Post
 
 
@@ -9,14 +16,80 @@ class LatestPostFeed(Feed):
     link = "/feeds/"
     description = "Новые записи на моем сайте."
 
-    def items(self):
-        return Post.objects.order_by("-update")[:5]
+    def __call__(self, request, *args, **kwargs):
+        version = get_versions([POSTS_VERSION_KEY])[POSTS_VERSION_KEY]
+        key = self.cache_key(request, version)
+        cached = cache.get(key)
+        if cached is not None:
+            return self.cached_response(cached)
+        with use_replica():
+            response = super().__call__(request, *args, **kwargs)
+        self.store_response(key, response)
+        return response
+
+    def cache_key(self, request, version):
+        """
+        Ключ готовой ленты: схема и хост (ссылки в ленте абсолютные), путь
+        без строки запроса - произвольные параметры не создают новых записей
+        в кэше - и версия записей
+        """
+        return f"feed-{request.scheme}://{request.get_host()}{request.path}-{version}"
+
+    def cached_response(self, cached):
+        content_type, content = cached
+        return HttpResponse(content, content_type=content_type)
+
+    def store_response(self, key, response):
+        if response.status_code == 200:
+            cache.set(
+                key,
+                (response.headers["Content-Type"], response.content),
+                settings.FEED_CACHE_TIMEOUT,
+            )
+
+    def get_queryset(self):
+        return Post.objects.defer(*Post.LIST_DEFERRED_FIELDS).order_by("-update")[:5]
+
+    def items(self, obj=None):
+        """
+        Записи ленты: заранее загруженные асинхронной версией либо из базы
+        """
+        return obj if obj is not None else self.get_queryset()
 
     def item_title(self, item):
         return item.title
 
     def item_description(self, item):
-        return item.description
+        return item.excerpt
 
     def item_link(self, item):
         return reverse("post_detail", args=[item.slug])
+
+
+class AsyncLatestPostFeed(LatestPostFeed):
+    """
+    Асинхронная RSS лента: записи загружаются через async ORM,
+    генерация XML запросов к базе не делает
+    """
+
+    def __init__(self):
+        super().__init__()
+        markcoroutinefunction(self)
+
+    async def __call__(self, request, *args, **kwargs):
+        versions = await cache.aget_many([POSTS_VERSION_KEY])
+        key = self.cache_key(request, versions.get(POSTS_VERSION_KEY, 0))
+        cached = await cache.aget(key)
+        if cached is not None:
+            return self.cached_response(cached)
+        with use_replica():
+            items = [post async for post in self.get_queryset()]
+        feedgen = self.get_feed(items, request)
+        response = HttpResponse(content_type=feedgen.content_type)
+        feedgen.write(response, "utf-8")
+        await cache.aset(
+            key,
+            (response.headers["Content-Type"], response.content),
+            settings.FEED_CACHE_TIMEOUT,
+        )
+        return response
@@ -1,15 +1,33 @@
 from django import forms
-from django_recaptcha.fields import ReCaptchaField
+from django.urls import reverse_lazy
+from taggit.forms import TagWidget
+
+from apps.services.captcha import CaptchaField, OptionalCaptchaMixin
 
 from .models import Comment, Post
+from .suggest import canonical_tag_name
 
 
-class PostCreateForm(forms.ModelForm):
+class TagSuggestWidget(TagWidget):
+    """
+    Поле тегов через запятую с подсказками существующих тегов (tags.js)
+    """
+
+    class Media:
+        js = ("tags.js",)
+
+    def __init__(self, attrs=None):
+        super().__init__(
+            {"data-suggest-url": reverse_lazy("tag_suggest"), **(attrs or {})}
+        )
+
+
+class PostCreateForm(OptionalCaptchaMixin, forms.ModelForm):
     """
     Форма добавления статей на сайте
     """
 
-    recaptcha = ReCaptchaField()
+    recaptcha = CaptchaField()
 
     class Meta:
         model = Post
@@ -17,12 +35,14 @@ class PostCreateForm(forms.ModelForm):
             "title",
             "slug",
             "category",
+            "tags",
             "description",
             "text",
             "thumbnail",
             "status",
             "recaptcha",
         )
+        widgets = {"tags": TagSuggestWidget}
 
     def __init__(self, *args, **kwargs):
         """
@@ -36,6 +56,14 @@ class PostCreateForm(forms.ModelForm):
                 {"class": "form-control", "autocomplete": "off"}
             )
 
+    def clean_tags(self):
+        """
+        Почти одинаковые теги (регистр, ё/е, пробелы) заменяются уже
+        существующими
+        """
+        names = [canonical_tag_name(name) for name in self.cleaned_data["tags"]]
+        return list(dict.fromkeys(name for name in names if name))
+
 
 class PostUpdateForm(PostCreateForm):
     """
@@ -45,6 +73,7 @@ class PostUpdateForm(PostCreateForm):
     class Meta:
         model = Post
         fields = PostCreateForm.Meta.fields + ("updater", "fixed")
+        widgets = PostCreateForm.Meta.widgets
 
     def __init__(self, *args, **kwargs):
         """
@@ -55,12 +84,12 @@ class PostUpdateForm(PostCreateForm):
         self.fields["fixed"].widget.attrs.update({"class": "form-check-input"})
 
 
-class CommentCreateForm(forms.ModelForm):
+class CommentCreateForm(OptionalCaptchaMixin, forms.ModelForm):
     """
     Форма добавления комментариев к статьям
     """
 
-    recaptcha = ReCaptchaField()
+    recaptcha = CaptchaField()
 
     parent = forms.IntegerField(widget=forms.HiddenInput, required=False)
     content = forms.CharField(
@@ -0,0 +1,70 @@
+import csv
+import gzip
+import os
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from apps.blog.models import ArchivedRating, Rating
+from apps.blog.rollups import archiving_ratings, rollup_hour
+
+
+class Command(BaseCommand):
+    """
+    Перенос старых оценок в сжатый CSV архив с удалением из таблицы Rating.
+    Суммы оценок и аналитика читают почасовые сводки и не меняются; пара
+    (запись, IP) со значением остаётся в ArchivedRating - от повторного голоса
+    """
+
+    help = "Архивирует оценки старше заданного срока в CSV (gzip)"
+
+    fields = ("id", "post_id", "user_id", "value", "ip_address", "time_create")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than", type=int, required=True, help="Возраст оценок в днях"
+        )
+        parser.add_argument("--output", help="Файл архива (.csv.gz)")
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **options):
+        # Граница по началу часа: сводка часа не делится между архивом и таблицей
+        cutoff = rollup_hour(timezone.now() - timedelta(days=options["older_than"]))
+        ratings = Rating.objects.filter(time_create__lt=cutoff).order_by("pk")
+        if options["dry_run"]:
+            self.stdout.write(f"К архивации оценок: {ratings.count()} (до {cutoff})")
+            return
+        if not options["output"]:
+            raise CommandError("Укажите файл архива: --output")
+
+        archived = 0
+        is_new_archive = not os.path.exists(options["output"])
+        with gzip.open(options["output"], "at", newline="") as file:
+            writer = csv.writer(file)
+            if is_new_archive:
+                writer.writerow(self.fields)
+            while True:
+                batch = list(ratings.values_list(*self.fields)[: options["batch_size"]])
+                if not batch:
+                    break
+                writer.writerows(batch)
+                file.flush()
+                with transaction.atomic(), archiving_ratings():
+                    ArchivedRating.objects.bulk_create(
+                        [
+                            ArchivedRating(
+                                post_id=post_id, value=value, ip_address=ip_address
+                            )
+                            for _, post_id, _, value, ip_address, _ in batch
+                        ],
+                        ignore_conflicts=True,
+                    )
+                    Rating.objects.filter(pk__in=[row[0] for row in batch]).delete()
+                archived += len(batch)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Перенесено в архив оценок: {archived} (до {cutoff})")
+        )
@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand
+
+from apps.blog.models import Post
+
+
+class Command(BaseCommand):
+    """
+    Заполнение предрассчитанных полей (превью, количество слов, время чтения,
+    очищенный HTML) для уже существующих записей
+    """
+
+    help = "Пересчитывает производные поля записей блога пакетами"
+
+    DERIVED_FIELDS = (
+        "excerpt",
+        "word_count",
+        "reading_time",
+        "description_html",
+        "text_html",
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Количество записей, обновляемых одним запросом",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        queryset = Post.objects.only("pk", "description", "text").order_by("pk")
+
+        batch, updated = [], 0
+        for post in queryset.iterator(chunk_size=batch_size):
+            post.compute_derived_fields()
+            batch.append(post)
+            if len(batch) >= batch_size:
+                updated += self._flush(batch, batch_size)
+        updated += self._flush(batch, batch_size)
+
+        self.stdout.write(self.style.SUCCESS(f"Обновлено записей: {updated}"))
+
+    def _flush(self, batch, batch_size):
+        if not batch:
+            return 0
+        updated = Post.objects.bulk_update(
+            batch, self.DERIVED_FIELDS, batch_size=batch_size
+        )
+        batch.clear()
+        return updated
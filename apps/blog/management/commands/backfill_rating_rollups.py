@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from apps.accounts.stats import refresh_rating_received
+from apps.blog.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    """
+    Пересчёт почасовых сводок оценок по таблице Rating
+    """
+
+    help = "Заполняет и восстанавливает почасовые сводки оценок записей"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--post", type=int, nargs="+", help="Пересчитать только для этих записей"
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        rebuilt = rebuild_rollups(options["post"], batch_size=options["batch_size"])
+        refresh_rating_received()
+        self.stdout.write(self.style.SUCCESS(f"Пересчитано сводок: {rebuilt}"))
@@ -0,0 +1,115 @@
+import http.client
+import os
+import random
+import shutil
+import threading
+import time
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.services.benchmark import run_server, summarize
+
+BENCH_DIRECTORY = "bench-media"
+
+
+class Command(BaseCommand):
+    """
+    Сравнение пропускной способности раздачи медиафайлов: serve_media
+    (sendfile, Range) против прежней django.views.static.serve
+    """
+
+    help = "Бенчмарк раздачи медиафайлов через serve_media и static.serve"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--modes", nargs="+", default=["debug", "view"])
+        parser.add_argument(
+            "--sizes",
+            nargs="+",
+            type=int,
+            default=[64, 1024, 16384],
+            help="Размеры файлов в КБ",
+        )
+        parser.add_argument("--clients", type=int, default=8)
+        parser.add_argument("--duration", type=float, default=5.0)
+        parser.add_argument(
+            "--range",
+            type=int,
+            default=0,
+            help="Запрашивать случайные участки файла указанного размера в КБ",
+        )
+        parser.add_argument("--workers", type=int, default=1)
+
+    def handle(self, *args, **options):
+        directory = os.path.join(settings.MEDIA_ROOT, BENCH_DIRECTORY)
+        os.makedirs(directory, exist_ok=True)
+        try:
+            files = {}
+            for size in options["sizes"]:
+                name = f"{size}k.bin"
+                with open(os.path.join(directory, name), "wb") as file:
+                    file.write(os.urandom(size * 1024))
+                files[size] = f"{settings.MEDIA_URL}{BENCH_DIRECTORY}/{name}"
+
+            self.stdout.write(
+                f"{'Раздача':<8}{'Файл, КБ':>10}{'Запросов':>10}{'RPS':>10}"
+                f"{'МБ/с':>10}{'Ошибки':>9}{'p50, мс':>10}{'p95, мс':>10}"
+            )
+            for mode in options["modes"]:
+                env = {"DJANGO_MEDIA_SERVING": mode, "DJANGO_PROFILE": "production"}
+                with run_server("wsgi", workers=options["workers"], env=env) as url:
+                    for size, path in files.items():
+                        summary, received = self.run_clients(url, path, size, options)
+                        self.stdout.write(
+                            f"{mode:<8}{size:>10}{summary['requests']:>10}"
+                            f"{summary['rps']:>10.1f}"
+                            f"{received / summary['elapsed'] / 1024 / 1024:>10.1f}"
+                            f"{summary['error_rate']:>9.1%}{summary['p50']:>10.1f}"
+                            f"{summary['p95']:>10.1f}"
+                        )
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    def run_clients(self, base_url, path, size, options):
+        url = urlsplit(base_url)
+        latencies, errors, received = [], 0, 0
+        lock = threading.Lock()
+        deadline = time.monotonic() + options["duration"]
+        range_size = min(options["range"], size) * 1024
+
+        def client():
+            nonlocal errors, received
+            connection = http.client.HTTPConnection(url.hostname, url.port, timeout=30)
+            while time.monotonic() < deadline:
+                headers = {}
+                if range_size:
+                    start = random.randrange(size * 1024 - range_size + 1)
+                    headers["Range"] = f"bytes={start}-{start + range_size - 1}"
+                started = time.perf_counter()
+                try:
+                    connection.request("GET", path, headers=headers)
+                    response = connection.getresponse()
+                    length = len(response.read())
+                    ok = response.status in (200, 206)
+                except (OSError, http.client.HTTPException):
+                    connection.close()
+                    ok, length = False, 0
+                with lock:
+                    if ok:
+                        latencies.append(time.perf_counter() - started)
+                        received += length
+                    else:
+                        errors += 1
+            connection.close()
+
+        started = time.monotonic()
+        threads = [threading.Thread(target=client) for _ in range(options["clients"])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - started
+        summary = summarize(latencies, errors, elapsed)
+        summary["elapsed"] = elapsed
+        return summary, received
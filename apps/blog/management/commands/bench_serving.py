@@ -0,0 +1,72 @@
+import asyncio
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand
+
+from apps.services.benchmark import run_server, slow_request, summarize
+
+
+class Command(BaseCommand):
+    """
+    Сравнение пропускной способности WSGI и ASGI при множестве
+    одновременных медленных клиентов
+    """
+
+    help = "Бенчмарк WSGI против ASGI для конкурентных медленных клиентов"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--servers", nargs="+", default=["wsgi", "asgi"])
+        parser.add_argument("--path", default="/", help="Адрес страницы для замера")
+        parser.add_argument("--clients", type=int, default=50)
+        parser.add_argument("--duration", type=float, default=10.0)
+        parser.add_argument(
+            "--chunk-delay",
+            type=float,
+            default=0.05,
+            help="Пауза клиента между порциями запроса и ответа, с",
+        )
+        parser.add_argument("--chunks", type=int, default=4)
+        parser.add_argument("--workers", type=int, default=1)
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"{'Сервер':<8}{'Запросов':>10}{'RPS':>10}{'Ошибки':>9}"
+            f"{'p50, мс':>10}{'p95, мс':>10}{'p99, мс':>10}"
+        )
+        for kind in options["servers"]:
+            with run_server(kind, workers=options["workers"]) as base_url:
+                summary = asyncio.run(self.run_clients(base_url, options))
+            self.stdout.write(
+                f"{kind:<8}{summary['requests']:>10}{summary['rps']:>10.1f}"
+                f"{summary['error_rate']:>9.1%}{summary['p50']:>10.1f}"
+                f"{summary['p95']:>10.1f}{summary['p99']:>10.1f}"
+            )
+
+    async def run_clients(self, base_url, options):
+        url = urlsplit(base_url)
+        latencies, errors = [], 0
+        deadline = time.monotonic() + options["duration"]
+
+        async def client():
+            nonlocal errors
+            while time.monotonic() < deadline:
+                started = time.perf_counter()
+                try:
+                    status = await slow_request(
+                        url.hostname,
+                        url.port,
+                        options["path"],
+                        chunk_delay=options["chunk_delay"],
+                        chunks=options["chunks"],
+                    )
+                except OSError:
+                    status = 0
+                if 200 <= status < 400:
+                    latencies.append(time.perf_counter() - started)
+                else:
+                    errors += 1
+
+        started = time.monotonic()
+        await asyncio.gather(*(client() for _ in range(options["clients"])))
+        return summarize(latencies, errors, time.monotonic() - started)
@@ -0,0 +1,100 @@
+import json
+import os
+import subprocess
+import sys
+import time
+from statistics import median
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Окружение профилей: production без прогрева показывает, во что обходится
+# первому запросу разбор URLconf и компиляция шаблонов
+PROFILES = {
+    "development": {"DJANGO_PROFILE": "development"},
+    "production-cold": {"DJANGO_PROFILE": "production", "DJANGO_STARTUP_PRELOAD": "0"},
+    "production": {"DJANGO_PROFILE": "production"},
+}
+
+# Выполняется в новом интерпретаторе: загрузка WSGI приложения и два
+# запроса через него (без сети), время в секундах
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+from django_site_blog_cbv.wsgi import application
+loaded = time.perf_counter()
+from wsgiref.util import setup_testing_defaults
+
+def request(path):
+    environ = {"PATH_INFO": path, "HTTP_HOST": "localhost"}
+    setup_testing_defaults(environ)
+    status = []
+    started = time.perf_counter()
+    body = b"".join(application(environ, lambda line, headers: status.append(line)))
+    return time.perf_counter() - started, status[0]
+
+first, status = request(sys.argv[1])
+second, _ = request(sys.argv[1])
+print(json.dumps({
+    "load": loaded - started, "modules": len(sys.modules),
+    "first": first, "second": second, "status": status,
+}))
+"""
+
+
+class Command(BaseCommand):
+    """
+    Холодный старт воркера по профилям настроек: загрузка приложения
+    (импорт, django.setup(), прогрев), число модулей, первый и второй
+    запрос; каждый замер - в новом процессе, кэш - в памяти процесса
+    """
+
+    help = "Бенчмарк времени импорта и холодного старта по профилям настроек"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--profiles", nargs="+", choices=PROFILES, default=list(PROFILES)
+        )
+        parser.add_argument("--path", default="/", help="Адрес страницы для замера")
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"{'Профиль':<18}{'Процесс, мс':>12}{'Загрузка, мс':>14}{'Модулей':>9}"
+            f"{'1-й запрос, мс':>16}{'2-й запрос, мс':>16}"
+        )
+        for profile in options["profiles"]:
+            runs = [
+                self.probe(profile, options["path"]) for _ in range(options["repeat"])
+            ]
+            self.stdout.write(
+                f"{profile:<18}"
+                f"{median(run['process'] for run in runs) * 1000:>12.0f}"
+                f"{median(run['load'] for run in runs) * 1000:>14.0f}"
+                f"{runs[0]['modules']:>9}"
+                f"{median(run['first'] for run in runs) * 1000:>16.1f}"
+                f"{median(run['second'] for run in runs) * 1000:>16.1f}"
+            )
+
+    def probe(self, profile, path):
+        env = {
+            **os.environ,
+            "DJANGO_SETTINGS_MODULE": "django_site_blog_cbv.settings",
+            "DJANGO_CACHE_BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            **PROFILES[profile],
+        }
+        started = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-c", PROBE, path],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        elapsed = time.perf_counter() - started
+        if result.returncode:
+            raise CommandError(f"{profile}: {result.stderr.strip()}")
+        run = json.loads(result.stdout.splitlines()[-1])
+        if not run["status"].startswith("200"):
+            raise CommandError(f"{profile}: ответ {run['status']} на {path}")
+        return {**run, "process": elapsed}
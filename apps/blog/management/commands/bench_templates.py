@@ -0,0 +1,138 @@
+import time
+from statistics import median
+
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.management.base import BaseCommand
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.template import engines
+from django.test import RequestFactory, override_settings
+
+from apps.blog.forms import CommentCreateForm
+from apps.blog.models import Category, Comment, Post
+
+HOT_TEMPLATES = (
+    "blog/post_list.html",
+    "blog/post_detail.html",
+    "blog/comments/comments_list.html",
+    "sidebar.html",
+)
+
+# Без кэша фрагментов: иначе дерево категорий боковой панели не рендерится
+DUMMY_CACHES = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+
+
+class Command(BaseCommand):
+    """
+    Время рендеринга горячих шаблонов движками Django и Jinja2 на
+    синтетических данных (создаются в транзакции и откатываются). Данные
+    выбираются заранее, в замер входит только рендеринг и запросы из
+    самих шаблонов (теги записи, дерево категорий). Запускать с
+    DJANGO_PROFILE=production (без проверки изменений шаблонов на диске)
+    после collectstatic
+    """
+
+    help = "Бенчмарк рендеринга горячих шаблонов: Django против Jinja2"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--categories", type=int, default=30)
+        parser.add_argument("--comments", type=int, default=200)
+        parser.add_argument("--posts", type=int, default=10)
+        parser.add_argument("--iterations", type=int, default=200)
+
+    def handle(self, *args, **options):
+        with transaction.atomic(), override_settings(CACHES=DUMMY_CACHES):
+            contexts = self.create_contexts(options)
+            self.stdout.write(
+                f"{'Шаблон':<36}{'Django, мс':>12}{'Jinja2, мс':>12}{'Ускорение':>11}"
+            )
+            for name in HOT_TEMPLATES:
+                timings = {
+                    engine: self.measure(engine, name, contexts[name], options)
+                    for engine in ("django", "jinja2")
+                }
+                self.stdout.write(
+                    f"{name:<36}{timings['django']:>12.2f}{timings['jinja2']:>12.2f}"
+                    f"{timings['django'] / timings['jinja2']:>10.1f}x"
+                )
+            transaction.set_rollback(True)
+
+    def measure(self, engine, name, context, options):
+        """
+        Медиана времени рендеринга в мс; вложенные шаблоны - тем же движком
+        """
+        jinja2_templates = list(HOT_TEMPLATES) if engine == "jinja2" else []
+        with override_settings(JINJA2_TEMPLATES=jinja2_templates):
+            template = engines[engine].get_template(name)
+            request = context["request"]
+            template.render(context, request)
+            timings = []
+            for _ in range(options["iterations"]):
+                started = time.perf_counter()
+                template.render(context, request)
+                timings.append(time.perf_counter() - started)
+        return median(timings) * 1000
+
+    def create_contexts(self, options):
+        author = User.objects.create_user("bench-templates")
+        categories = []
+        for number in range(options["categories"]):
+            # Дерево глубиной до трёх уровней
+            parent = categories[number // 3] if number >= 3 and number % 2 else None
+            categories.append(
+                Category.objects.create(
+                    title=f"Категория {number}",
+                    slug=f"bench-templates-{number}",
+                    parent=parent,
+                )
+            )
+        posts = [
+            Post.objects.create(
+                title=f"Запись «{number}» & <шаблоны>",
+                description="<p>Описание записи для замера шаблонов</p>" * 3,
+                text="<p>Текст записи для замера шаблонов</p>" * 20,
+                category=categories[number % len(categories)],
+                author=author,
+            )
+            for number in range(options["posts"])
+        ]
+        post = posts[0]
+        post.tags.add("django", "jinja2", "шаблоны")
+
+        parents = [None]
+        for number in range(options["comments"]):
+            comment = Comment.objects.create(
+                post=post,
+                author=author,
+                content=f"Комментарий {number} с <разметкой> & символами",
+                parent=parents[number % len(parents)],
+            )
+            parents.append(comment)
+
+        request = RequestFactory().get("/")
+        request.user = AnonymousUser()
+        page = Paginator(
+            list(Post.custom.for_list().filter(pk__in=[post.pk for post in posts])), 5
+        ).page(1)
+        post = Post.objects.select_related("author", "category").get(pk=post.pk)
+        detail = {
+            "request": request,
+            "title": post.title,
+            "post": post,
+            "form": CommentCreateForm(),
+            "comments": list(Comment.objects.published_for(post)),
+            "online_user_ids": set(),
+        }
+        return {
+            "blog/post_list.html": {
+                "request": request,
+                "title": "Главная страница",
+                "posts": page.object_list,
+                "page_obj": page,
+                "paginator": page.paginator,
+                "is_paginated": True,
+            },
+            "blog/post_detail.html": detail,
+            "blog/comments/comments_list.html": detail,
+            "sidebar.html": {"request": request},
+        }
@@ -0,0 +1,90 @@
+import random
+import time
+import tracemalloc
+from statistics import quantiles
+
+from django.core.management.base import BaseCommand
+from pytils.translit import slugify
+
+from apps.services.prefix_index import WordPrefixIndex
+
+# Словарь для синтетических заголовков: русские и английские слова
+WORDS = (
+    "новый обзор руководство django python машинное обучение ёлка сервер "
+    "база данных запросы кэширование шаблоны тестирование асинхронность "
+    "производительность безопасность релиз версия практика ошибки советы "
+    "linux docker postgres redis nginx kubernetes api frontend backend "
+    "работа проект команда история опыт заметки разработка архитектура "
+    "индексы миграции очереди задачи поиск подсказки профилирование память"
+).split()
+
+
+def synthetic_titles(count, seed=0):
+    """
+    Заголовки из 3-8 слов словаря с номером (slug как у Post - pytils)
+    """
+    generator = random.Random(seed)
+    for number in range(count):
+        words = generator.choices(WORDS, k=generator.randint(3, 8))
+        title = " ".join(words).capitalize() + f" {number}"
+        yield number + 1, title, slugify(title)
+
+
+class Command(BaseCommand):
+    """
+    Память и задержка подсказок заголовков (WordPrefixIndex) на
+    синтетических заголовках: запросы кириллицей, латиницей и из двух слов
+    """
+
+    help = "Бенчмарк индекса подсказок заголовков записей"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--titles", type=int, default=100_000)
+        parser.add_argument("--queries", type=int, default=2000)
+        parser.add_argument("--limit", type=int, default=10)
+
+    def handle(self, *args, **options):
+        items = list(synthetic_titles(options["titles"]))
+        started = time.perf_counter()
+        index = WordPrefixIndex(items)
+        elapsed = time.perf_counter() - started
+        # Память - отдельным построением: tracemalloc замедляет его в разы
+        del index
+        tracemalloc.start()
+        index = WordPrefixIndex(items)
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        # Строки заголовков и slug индекс разделяет с исходными данными
+        strings = sum(
+            title.__sizeof__() + slug.__sizeof__() for _, title, slug in items
+        )
+        self.stdout.write(
+            f"Заголовков: {len(index)}, слов в словаре: {len(index.base.vocabulary)}\n"
+            f"Построение: {elapsed:.2f} с\n"
+            f"Память структур индекса: {size / 2**20:.1f} МБ"
+            f" (+ {strings / 2**20:.1f} МБ строк заголовков и slug)"
+        )
+
+        generator = random.Random(1)
+        self.stdout.write(
+            f"{'Запрос':<24}{'p50, мкс':>10}{'p99, мкс':>10}{'Найдено':>9}"
+        )
+        for name, make_query in (
+            ("1 буква", lambda word: word[:1]),
+            ("2 буквы", lambda word: word[:2]),
+            ("4 буквы", lambda word: word[:4]),
+            ("слово латиницей", lambda word: slugify(word)),
+            ("2 слова", lambda word: f"{word} {generator.choice(WORDS)[:3]}"),
+            ("нет совпадений", lambda word: word + "щщ"),
+        ):
+            latencies, found = [], 0
+            for _ in range(options["queries"]):
+                query = make_query(generator.choice(WORDS))
+                started = time.perf_counter()
+                found += len(index.search(query, options["limit"]))
+                latencies.append((time.perf_counter() - started) * 1e6)
+            cuts = quantiles(latencies, n=100)
+            self.stdout.write(
+                f"{name:<24}{cuts[49]:>10.1f}{cuts[98]:>10.1f}"
+                f"{found / options['queries']:>9.1f}"
+            )
@@ -0,0 +1,141 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import F, Max, Sum
+from django.utils import timezone
+
+from apps.accounts.models import Profile
+from apps.blog.api import tags_with_post_counts
+from apps.blog.feeds import LatestPostFeed
+from apps.blog.models import Comment, Post, Rating, RatingRollup
+from apps.blog.views import PostByTagListView, PostListView
+from apps.jobs.models import Job
+from apps.services.query_plans import plan_problems, suggest_index
+
+# Известные допустимые проблемы: запрос -> причина
+ACCEPTED_PROBLEMS = {
+    "Записи по тегу": (
+        "сортируются записи одного тега после соединения с TaggedItem, "
+        "индекс по полям двух таблиц невозможен"
+    ),
+}
+
+
+def hot_querysets():
+    """
+    Запросы, которые выполняют страницы, API и фоновые задачи при каждом
+    обращении, с параметрами-образцами (план от значений не зависит)
+    """
+    post_list = Post.custom.for_list()
+    return [
+        ("Главная", PostListView.queryset[: PostListView.paginate_by]),
+        (
+            "Записи категории",
+            post_list.filter(category__slug="sample")[:1],
+        ),
+        (
+            "Записи по тегу",
+            Post.objects.filter(tags__slug="sample")
+            .defer(*Post.LIST_DEFERRED_FIELDS)
+            .order_by(*Post._meta.ordering)[: PostByTagListView.paginate_by],
+        ),
+        # get() сбрасывает сортировку
+        ("Запись", Post.objects.filter(slug="sample").order_by()[:21]),
+        (
+            "Валидаторы записи",
+            Post.objects.filter(slug="sample")
+            .values("pk", "update")
+            .annotate(last_comment=Max("comments__time_update"))[:1],
+        ),
+        ("Комментарии записи", Comment.objects.published_for(1)),
+        ("Профиль", Profile.objects.select_related("user").filter(slug="sample")[:2]),
+        (
+            "Записи автора",
+            post_list.filter(author_id=1).order_by("-create", "-pk")[:6],
+        ),
+        ("RSS лента", LatestPostFeed().items()),
+        (
+            "Модерация комментариев",
+            Comment.objects.filter(status="draft")
+            .select_related("author", "post")
+            .order_by("-time_create")[:20],
+        ),
+        (
+            "API: записи",
+            Post.custom.values("pk", "title", "slug", "create").order_by(
+                "-create", "-pk"
+            )[:21],
+        ),
+        ("API: теги", tags_with_post_counts().values("pk", "name", "posts")[:21]),
+        (
+            "Суммы оценок",
+            RatingRollup.objects.filter(post_id__in=[1, 2, 3])
+            .order_by()
+            .values("post_id")
+            .annotate(total=Sum(F("likes") - F("dislikes"))),
+        ),
+        (
+            "Голоса посетителя",
+            Rating.objects.filter(post_id__in=[1, 2, 3], ip_address="127.0.0.1")
+            .order_by()
+            .values_list("post_id", "value"),
+        ),
+        (
+            "Очередь задач",
+            Job.objects.filter(status="queued", run_at__lte=timezone.now()).order_by(
+                "run_at", "pk"
+            )[:10],
+        ),
+    ]
+
+
+class Command(BaseCommand):
+    """
+    Проверка планов «горячих» запросов (EXPLAIN QUERY PLAN / EXPLAIN):
+    полный просмотр таблицы или сортировка во временном B-дереве на
+    таблицах от заданного размера завершают команду с ошибкой (для CI)
+    """
+
+    help = "Проверяет планы запросов страниц на полные просмотры таблиц"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--min-rows",
+            type=int,
+            default=settings.QUERY_PLAN_MIN_ROWS,
+            help="Игнорировать таблицы меньше N строк (0 - проверять все)",
+        )
+        parser.add_argument(
+            "--allow",
+            nargs="*",
+            default=[],
+            help="Названия запросов, проблемы которых допустимы",
+        )
+
+    def handle(self, *args, **options):
+        failed = 0
+        for name, queryset in hot_querysets():
+            sql, plan, problems = plan_problems(queryset, options["min_rows"])
+            if options["verbosity"] > 1:
+                self.stdout.write(f"\n{name}\n{sql}")
+                for row in plan if isinstance(plan, list) else [plan]:
+                    self.stdout.write(f"  {row}")
+            if not problems:
+                self.stdout.write(self.style.SUCCESS(f"OK    {name}"))
+                continue
+            allowed = name in options["allow"] or name in ACCEPTED_PROBLEMS
+            failed += not allowed
+            style = self.style.WARNING if allowed else self.style.ERROR
+            self.stdout.write(style(f"{'WARN' if allowed else 'FAIL':<6}{name}"))
+            for problem in problems:
+                self.stdout.write(
+                    f"      {problem.detail} (таблица {problem.table or '?'},"
+                    f" ~{problem.rows} строк)"
+                )
+            suggestion = suggest_index(queryset)
+            if name in ACCEPTED_PROBLEMS:
+                self.stdout.write(f"      Допустимо: {ACCEPTED_PROBLEMS[name]}")
+            elif suggestion:
+                self.stdout.write(f"      Возможный индекс: {suggestion}")
+
+        if failed:
+            raise CommandError(f"Запросов с проблемными планами: {failed}")
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from apps.services.counters import flush_post_views
+
+
+class Command(BaseCommand):
+    """
+    Сброс накопленных в кэше просмотров записей в базу данных (для cron)
+    """
+
+    help = "Сбрасывает накопленные в кэше просмотры записей в базу данных"
+
+    def handle(self, *args, **options):
+        updated = flush_post_views()
+        self.stdout.write(self.style.SUCCESS(f"Обновлено записей: {updated}"))
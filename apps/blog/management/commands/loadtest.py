@@ -0,0 +1,394 @@
+import http.client
+import json
+import os
+import random
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from importlib import import_module
+from urllib.parse import urlencode, urlsplit
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils.crypto import get_random_string
+
+from apps.blog.models import Category, Post
+from apps.services.benchmark import histogram, run_server, summarize
+
+# Конечные точки, которые только читают данные
+READ_ENDPOINTS = ("home", "post_detail", "category")
+
+
+class LoadClient:
+    """
+    HTTP клиент виртуального пользователя: одно keep-alive соединение,
+    cookie сессии и CSRF, замер каждого запроса
+    """
+
+    def __init__(self, base_url, results, session_key=None):
+        url = urlsplit(base_url)
+        self.host, self.port = url.hostname, url.port
+        self.results = results
+        self.connection = None
+        self.csrf_token = get_random_string(32)
+        self.cookies = {"csrftoken": self.csrf_token}
+        if session_key:
+            self.cookies["sessionid"] = session_key
+
+    def request(self, endpoint, method, path, data=None, headers=None):
+        headers = {
+            "Cookie": "; ".join(
+                f"{name}={value}" for name, value in self.cookies.items()
+            ),
+            **(headers or {}),
+        }
+        body = None
+        if data is not None:
+            body = urlencode(data)
+            headers.update(
+                {
+                    "Content-Type": "application/x-www-form-urlencoded",
+                    "X-CSRFToken": self.csrf_token,
+                }
+            )
+
+        started = time.perf_counter()
+        try:
+            if self.connection is None:
+                self.connection = http.client.HTTPConnection(
+                    self.host, self.port, timeout=30
+                )
+            self.connection.request(method, path, body=body, headers=headers)
+            response = self.connection.getresponse()
+            response.read()
+            status = response.status
+            if response.getheader("Connection", "").lower() == "close":
+                self.close()
+        except (OSError, http.client.HTTPException):
+            self.close()
+            status = 0
+        self.results.append((endpoint, status, time.perf_counter() - started))
+        return status
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+class Command(BaseCommand):
+    """
+    Нагрузочный тест со смешанной нагрузкой чтения и записи: приложение
+    запускается под WSGI или ASGI сервером на копии базы данных, виртуальные
+    пользователи читают страницы, комментируют и ставят оценки
+    """
+
+    help = "Смешанная нагрузка чтения и записи с отчётом по конечным точкам"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--config",
+            action="append",
+            default=[],
+            metavar="NAME:KEY=VALUE,...",
+            help="Конфигурация для сравнения: переменные окружения сервера, "
+            "а также server=wsgi|asgi и workers=N (можно указать несколько раз), "
+            "например wal:SQLITE_JOURNAL_MODE=wal",
+        )
+        parser.add_argument("--server", choices=("wsgi", "asgi"), default="wsgi")
+        parser.add_argument("--workers", type=int, default=1)
+        parser.add_argument("--duration", type=float, default=20.0)
+        parser.add_argument("--clients", type=int, default=20)
+        parser.add_argument(
+            "--mix",
+            default="browse=80,comment=10,rate=10",
+            help="Веса сценариев: чтение анонимом, комментарий, серия оценок",
+        )
+        parser.add_argument(
+            "--burst", type=int, default=5, help="Оценок в одной серии сценария rate"
+        )
+        parser.add_argument("--users", type=int, default=20)
+        parser.add_argument("--seed-posts", type=int, default=20)
+        parser.add_argument(
+            "--json", help="Сохранить результаты в файл для сравнения запусков"
+        )
+        parser.add_argument("--prepare", action="store_true", help="Служебный режим")
+
+    def handle(self, *args, **options):
+        if options["prepare"]:
+            self.stdout.write(json.dumps(self.prepare(options)))
+            return
+
+        mix = self.parse_mix(options["mix"])
+        configs = [self.parse_config(config) for config in options["config"]] or [
+            ("default", {})
+        ]
+        report = {}
+        for name, env in configs:
+            self.stdout.write(self.style.MIGRATE_HEADING(f"Конфигурация: {name}"))
+            results, elapsed = self.run_config(env, mix, options)
+            report[name] = self.report(results, elapsed)
+
+        if len(report) > 1:
+            self.compare(report)
+        if options["json"]:
+            with open(options["json"], "w") as file:
+                json.dump(report, file, ensure_ascii=False, indent=2)
+
+    def parse_mix(self, value):
+        mix = {}
+        for item in value.split(","):
+            scenario, _, weight = item.partition("=")
+            if scenario not in ("browse", "comment", "rate"):
+                raise CommandError(f"Неизвестный сценарий: {scenario}")
+            mix[scenario] = float(weight or 1)
+        return mix
+
+    def parse_config(self, value):
+        name, _, assignments = value.partition(":")
+        env = {}
+        for item in filter(None, assignments.split(",")):
+            key, sep, item_value = item.partition("=")
+            if not sep:
+                raise CommandError(f"Ожидается KEY=VALUE: {item}")
+            env[key] = item_value
+        return name or "default", env
+
+    def prepare(self, options):
+        """
+        Тестовые пользователи с готовыми сессиями и записи для сценариев
+        (выполняется в отдельном процессе на копии базы данных)
+        """
+        session_store = import_module(settings.SESSION_ENGINE).SessionStore
+        sessions = []
+        for index in range(options["users"]):
+            user, _ = User.objects.get_or_create(username=f"loadtest-{index}")
+            session = session_store()
+            session[SESSION_KEY] = str(user.pk)
+            session[BACKEND_SESSION_KEY] = "django.contrib.auth.backends.ModelBackend"
+            session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+            session.create()
+            sessions.append(session.session_key)
+
+        posts = list(Post.custom.values("pk", "slug")[:500])
+        if not posts:
+            category, _ = Category.objects.get_or_create(
+                slug="loadtest", defaults={"title": "Нагрузочный тест"}
+            )
+            author = User.objects.get(username="loadtest-0")
+            for index in range(options["seed_posts"]):
+                Post.objects.create(
+                    title=f"Нагрузочный тест {index}",
+                    description="<p>Описание</p>",
+                    text="<p>" + "Текст записи. " * 200 + "</p>",
+                    category=category,
+                    author=author,
+                )
+            posts = list(Post.custom.values("pk", "slug"))
+        categories = list(Category.objects.values_list("slug", flat=True))
+        return {"sessions": sessions, "posts": posts, "categories": categories}
+
+    def run_config(self, config_env, mix, options):
+        """
+        Копия базы данных и отдельный кэш для каждой конфигурации, чтобы
+        запуски не влияли друг на друга
+        """
+        database = connections["default"]
+        if database.vendor != "sqlite":
+            raise CommandError("Нагрузочный тест поддерживается только для SQLite")
+
+        config_env = dict(config_env)
+        kind = config_env.pop("server", options["server"])
+        workers = int(config_env.pop("workers", options["workers"]))
+
+        workdir = tempfile.mkdtemp(prefix="loadtest-")
+        try:
+            database_copy = os.path.join(workdir, "db.sqlite3")
+            database.ensure_connection()
+            target = sqlite3.connect(database_copy)
+            try:
+                database.connection.backup(target)
+            finally:
+                target.close()
+
+            env = {
+                "DATABASE_NAME": database_copy,
+                "DJANGO_CACHE_LOCATION": os.path.join(workdir, "cache"),
+                # collectstatic для профиля loadtest - не в STATIC_ROOT проекта
+                "DJANGO_STATIC_ROOT": os.path.join(workdir, "static"),
+                "DJANGO_PROFILE": "loadtest",
+                **config_env,
+            }
+            fixtures = self.run_prepare(env, options)
+            with run_server(kind, workers=workers, env=env) as base_url:
+                return self.generate_load(base_url, fixtures, mix, options)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    def run_prepare(self, env, options):
+        process_env = {**os.environ, **env}
+        manage = [sys.executable, "manage.py"]
+        # Профиль loadtest - продакшен: статика только из манифеста collectstatic
+        for command in (["migrate"], ["collectstatic"]):
+            subprocess.run(
+                [*manage, *command, "--noinput", "-v0"],
+                cwd=settings.BASE_DIR,
+                env=process_env,
+                check=True,
+                capture_output=True,
+            )
+        output = subprocess.run(
+            [
+                *manage,
+                "loadtest",
+                "--prepare",
+                f"--users={options['users']}",
+                f"--seed-posts={options['seed_posts']}",
+            ],
+            cwd=settings.BASE_DIR,
+            env=process_env,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        return json.loads(output.strip().splitlines()[-1])
+
+    def generate_load(self, base_url, fixtures, mix, options):
+        results = []
+        deadline = time.monotonic() + options["duration"]
+        scenarios = {
+            "browse": self.browse,
+            "comment": self.comment,
+            "rate": self.rate,
+        }
+        names, weights = list(mix), list(mix.values())
+
+        def virtual_user(index):
+            rng = random.Random(index)
+            session_key = fixtures["sessions"][index % len(fixtures["sessions"])]
+            anonymous = LoadClient(base_url, results)
+            logged_in = LoadClient(base_url, results, session_key)
+            while time.monotonic() < deadline:
+                scenario = rng.choices(names, weights)[0]
+                client = logged_in if scenario == "comment" else anonymous
+                scenarios[scenario](client, rng, fixtures, options)
+            anonymous.close()
+            logged_in.close()
+
+        threads = [
+            threading.Thread(target=virtual_user, args=(index,))
+            for index in range(options["clients"])
+        ]
+        started = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results, time.monotonic() - started
+
+    def browse(self, client, rng, fixtures, options):
+        page = rng.choice(["", "?page=2", "?page=3"])
+        client.request("home", "GET", f"/{page}")
+        post = rng.choice(fixtures["posts"])
+        client.request("post_detail", "GET", f"/post/{post['slug']}/")
+        if fixtures["categories"] and rng.random() < 0.3:
+            slug = rng.choice(fixtures["categories"])
+            client.request("category", "GET", f"/category/{slug}/")
+
+    def comment(self, client, rng, fixtures, options):
+        post = rng.choice(fixtures["posts"])
+        client.request(
+            "comment_create",
+            "POST",
+            f"/post/{post['pk']}/comments/create/",
+            data={"content": f"Комментарий нагрузочного теста {rng.random()}"},
+            headers={"X-Requested-With": "XMLHttpRequest"},
+        )
+
+    def rate(self, client, rng, fixtures, options):
+        # Серия оценок с разных адресов - конкурирующие записи в базу
+        for _ in range(options["burst"]):
+            post = rng.choice(fixtures["posts"])
+            client.request(
+                "rating",
+                "POST",
+                "/rating/",
+                data={"post_id": post["pk"], "value": rng.choice((1, -1))},
+                headers={
+                    "X-Forwarded-For": f"10.{rng.randrange(256)}."
+                    f"{rng.randrange(256)}.{rng.randrange(1, 255)}"
+                },
+            )
+
+    def report(self, results, elapsed):
+        endpoints = {}
+        for endpoint, status, latency in results:
+            endpoints.setdefault(endpoint, ([], [0]))
+            latencies, errors = endpoints[endpoint]
+            if 200 <= status < 400:
+                latencies.append(latency)
+            else:
+                errors[0] += 1
+
+        self.stdout.write(
+            f"{'Конечная точка':<16}{'Запросов':>10}{'RPS':>9}{'Ошибки':>9}"
+            f"{'p50, мс':>10}{'p95, мс':>10}{'p99, мс':>10}"
+        )
+        summaries = {}
+        for endpoint, (latencies, errors) in sorted(endpoints.items()):
+            summary = summarize(latencies, errors[0], elapsed)
+            summary["histogram"] = histogram(latencies)
+            summaries[endpoint] = summary
+            self.stdout.write(
+                f"{endpoint:<16}{summary['requests']:>10}{summary['rps']:>9.1f}"
+                f"{summary['error_rate']:>9.1%}{summary['p50']:>10.1f}"
+                f"{summary['p95']:>10.1f}{summary['p99']:>10.1f}"
+            )
+
+        for endpoint, summary in summaries.items():
+            self.stdout.write(f"\n{endpoint}:")
+            peak = max([count for _, count in summary["histogram"]] + [1])
+            for label, count in summary["histogram"]:
+                bar = "#" * round(40 * count / peak)
+                self.stdout.write(f"  {label:>12} {count:>7} {bar}")
+
+        reads = [
+            latency
+            for endpoint, status, latency in results
+            if endpoint in READ_ENDPOINTS and 200 <= status < 400
+        ]
+        writes = [
+            latency
+            for endpoint, status, latency in results
+            if endpoint not in READ_ENDPOINTS and 200 <= status < 400
+        ]
+        errors = sum(1 for _, status, _ in results if not 200 <= status < 400)
+        total = summarize(reads + writes, errors, elapsed)
+        summaries["total"] = {
+            **total,
+            "read_p95": summarize(reads, 0, elapsed)["p95"],
+            "write_p95": summarize(writes, 0, elapsed)["p95"],
+        }
+        self.stdout.write("")
+        return summaries
+
+    def compare(self, report):
+        self.stdout.write(self.style.MIGRATE_HEADING("Сравнение конфигураций"))
+        self.stdout.write(
+            f"{'Конфигурация':<16}{'RPS':>9}{'Ошибки':>9}{'p95, мс':>10}"
+            f"{'чтение p95':>12}{'запись p95':>12}"
+        )
+        for name, summaries in report.items():
+            total = summaries["total"]
+            self.stdout.write(
+                f"{name:<16}{total['rps']:>9.1f}{total['error_rate']:>9.1%}"
+                f"{total['p95']:>10.1f}{total['read_p95']:>12.1f}"
+                f"{total['write_p95']:>12.1f}"
+            )
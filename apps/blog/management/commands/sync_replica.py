@@ -0,0 +1,52 @@
+import sqlite3
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from apps.services.routers import REPLICA_ALIAS, replica_enabled
+
+
+class Command(BaseCommand):
+    """
+    Копирование основной SQLite базы в файл реплики через backup API SQLite
+    (консистентный снимок без остановки записи в основную базу)
+    """
+
+    help = "Синхронизирует файл реплики с основной базой данных"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=0,
+            help="Повторять синхронизацию каждые N секунд (0 - один раз)",
+        )
+
+    def handle(self, *args, **options):
+        if not replica_enabled():
+            raise CommandError("Реплика не настроена: задайте DATABASE_REPLICA")
+
+        primary, replica = connections["default"], connections[REPLICA_ALIAS]
+        if primary.vendor != "sqlite" or replica.vendor != "sqlite":
+            raise CommandError("Синхронизация поддерживается только для SQLite")
+
+        while True:
+            started = time.perf_counter()
+            self.sync(primary, replica.settings_dict["NAME"])
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Реплика синхронизирована за {time.perf_counter() - started:.3f} с"
+                )
+            )
+            if not options["interval"]:
+                break
+            time.sleep(options["interval"])
+
+    def sync(self, primary, replica_name):
+        primary.ensure_connection()
+        target = sqlite3.connect(replica_name)
+        try:
+            primary.connection.backup(target)
+        finally:
+            target.close()
@@ -0,0 +1,214 @@
+import http.client
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode, urlsplit
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from django.db.models import Count, F, Sum
+from django.test import Client
+from django.urls import reverse
+from taggit.models import Tag
+
+from apps.blog.models import Category, Post
+from apps.services.benchmark import RateLimiter, summarize
+from apps.services.counters import WARMUP_HEADER
+
+
+class Command(BaseCommand):
+    """
+    Прогрев кэша после деплоя или очистки кэша: параллельный запрос самых
+    посещаемых адресов через тестовый клиент или по HTTP с ограничением
+    частоты. Страницы целиком не кэшируются - их рендеринг заполняет
+    фрагмент боковой панели, а по HTTP ещё и кэш шаблонов воркеров;
+    RSS лента и суммы оценок самых оценённых записей кэшируются целиком
+    """
+
+    help = "Прогревает кэш страниц и фрагментов самыми посещаемыми адресами"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--base-url",
+            help="Адрес запущенного сайта (по умолчанию - тестовый клиент в "
+            "этом процессе, прогревается только общий кэш)",
+        )
+        parser.add_argument(
+            "--host",
+            default="localhost",
+            help="Имя хоста для тестового клиента (влияет на ссылки в RSS)",
+        )
+        parser.add_argument("--pages", type=int, default=5)
+        parser.add_argument("--tags", type=int, default=20)
+        parser.add_argument("--posts", type=int, default=20)
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=4,
+            help="Параллельных запросов (1 - последовательно в этом потоке)",
+        )
+        parser.add_argument(
+            "--rate",
+            type=float,
+            default=10,
+            help="Не более N запросов в секунду (0 - без ограничения)",
+        )
+
+    def most_rated_posts(self, limit):
+        """
+        (id, slug) записей с наибольшим числом оценок - по почасовым
+        сводкам, поэтому учитываются и архивированные оценки
+        """
+        return list(
+            Post.custom.annotate(
+                votes=Sum(F("rating_rollups__likes") + F("rating_rollups__dislikes"))
+            )
+            .filter(votes__gt=0)
+            .order_by("-votes", "-pk")
+            .values_list("pk", "slug")[:limit]
+        )
+
+    def hot_urls(self, options):
+        """
+        Первые страницы главной, все категории, популярные теги, самые
+        оценённые записи и их суммы оценок, RSS лента
+        """
+        home = reverse("home")
+        urls = [("Главная", home)]
+        urls += [
+            ("Главная", f"{home}?page={page}")
+            for page in range(2, options["pages"] + 1)
+        ]
+        urls += [
+            ("Категории", category.get_absolute_url())
+            for category in Category.objects.only("slug")
+        ]
+        tags = (
+            Tag.objects.annotate(num_posts=Count("taggit_taggeditem_items"))
+            .order_by("-num_posts")
+            .values_list("slug", flat=True)[: options["tags"]]
+        )
+        urls += [("Теги", reverse("post_by_tags", args=[slug])) for slug in tags]
+        posts = self.most_rated_posts(options["posts"])
+        urls += [("Записи", reverse("post_detail", args=[slug])) for _, slug in posts]
+        size = settings.RATING_SUMS_MAX_IDS
+        urls += [
+            (
+                "Оценки",
+                f"{reverse('rating_sums')}?"
+                + urlencode(
+                    {"ids": ",".join(str(pk) for pk, _ in posts[i : i + size])}
+                ),
+            )
+            for i in range(0, len(posts), size)
+        ]
+        urls.append(("RSS", reverse("latest_post_feed")))
+        return urls
+
+    def handle(self, *args, **options):
+        urls = self.hot_urls(options)
+        fetch = (
+            self.http_fetcher(options["base_url"])
+            if options["base_url"]
+            else self.client_fetcher(options["host"])
+        )
+        limiter = RateLimiter(options["rate"])
+
+        def warm(item):
+            group, url = item
+            limiter.wait()
+            started = time.perf_counter()
+            try:
+                status = fetch(url)
+            except (OSError, http.client.HTTPException):
+                status = 0
+            return group, url, status, time.perf_counter() - started
+
+        started = time.monotonic()
+        if options["concurrency"] > 1:
+            with ThreadPoolExecutor(max_workers=options["concurrency"]) as executor:
+                results = list(executor.map(warm, urls))
+        else:
+            results = list(map(warm, urls))
+        elapsed = time.monotonic() - started
+        self.report(results, elapsed)
+
+    def client_fetcher(self, host):
+        local = threading.local()
+        main_thread = threading.get_ident()
+
+        def fetch(url):
+            if not hasattr(local, "client"):
+                local.client = Client(HTTP_HOST=host, headers={WARMUP_HEADER: "1"})
+            try:
+                return local.client.get(url).status_code
+            finally:
+                # Соединения рабочих потоков закрываются после запроса
+                if threading.get_ident() != main_thread:
+                    close_old_connections()
+
+        return fetch
+
+    def http_fetcher(self, base_url):
+        url = urlsplit(base_url)
+        if url.scheme not in ("http", "https") or not url.hostname:
+            raise CommandError(f"Неверный адрес сайта: {base_url}")
+        connection_class = (
+            http.client.HTTPSConnection
+            if url.scheme == "https"
+            else http.client.HTTPConnection
+        )
+        local = threading.local()
+
+        def fetch(path):
+            # Соединение keep-alive на поток, при разрыве - переподключение
+            for attempt in range(2):
+                if not hasattr(local, "connection"):
+                    local.connection = connection_class(
+                        url.hostname, url.port, timeout=30
+                    )
+                try:
+                    local.connection.request("GET", path, headers={WARMUP_HEADER: "1"})
+                    response = local.connection.getresponse()
+                    response.read()
+                    return response.status
+                except (OSError, http.client.HTTPException):
+                    local.connection.close()
+                    del local.connection
+                    if attempt:
+                        raise
+
+        return fetch
+
+    def report(self, results, elapsed):
+        self.stdout.write(
+            f"{'Группа':<12}{'Адресов':>9}{'Ошибки':>8}{'p50, мс':>10}{'p95, мс':>10}"
+        )
+        groups = {}
+        for group, url, status, latency in results:
+            groups.setdefault(group, []).append((status, latency))
+        for group, items in groups.items():
+            latencies = [latency for status, latency in items if 200 <= status < 400]
+            summary = summarize(latencies, len(items) - len(latencies), elapsed)
+            self.stdout.write(
+                f"{group:<12}{len(items):>9}{len(items) - len(latencies):>8}"
+                f"{summary['p50']:>10.1f}{summary['p95']:>10.1f}"
+            )
+
+        self.stdout.write("Самые медленные адреса:")
+        for group, url, status, latency in sorted(results, key=lambda r: -r[3])[:5]:
+            self.stdout.write(f"  {latency * 1000:8.1f} мс  {status}  {url}")
+
+        failed = [
+            url for group, url, status, latency in results if not 200 <= status < 400
+        ]
+        style = self.style.WARNING if failed else self.style.SUCCESS
+        self.stdout.write(
+            style(
+                f"Прогрето адресов: {len(results) - len(failed)} из {len(results)} "
+                f"за {elapsed:.2f} с"
+            )
+        )
+        for url in failed:
+            self.stdout.write(self.style.WARNING(f"  ошибка: {url}"))
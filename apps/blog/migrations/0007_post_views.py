@@ -0,0 +1,20 @@
+# Generated by Django 5.1.1 on 2026-10-19 12:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0006_rating"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="views",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Просмотры"
+            ),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.1.1 on 2026-10-19 12:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0007_post_views"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="description_html",
+            field=models.TextField(
+                blank=True, editable=False, verbose_name="Очищенное описание"
+            ),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="excerpt",
+            field=models.TextField(blank=True, editable=False, verbose_name="Превью"),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="reading_time",
+            field=models.PositiveSmallIntegerField(
+                default=0, editable=False, verbose_name="Время чтения (мин.)"
+            ),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="text_html",
+            field=models.TextField(
+                blank=True, editable=False, verbose_name="Очищенный текст"
+            ),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="word_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Количество слов"
+            ),
+        ),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 5.1.1 on 2026-10-19 12:27
+
+from datetime import timezone
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q
+from django.db.models.functions import TruncHour
+
+
+def fill_rating_rollups(apps, schema_editor):
+    """
+    Начальное заполнение почасовых сводок по существующим оценкам
+    """
+    Rating = apps.get_model("blog", "Rating")
+    RatingRollup = apps.get_model("blog", "RatingRollup")
+    grouped = (
+        Rating.objects.annotate(hour=TruncHour("time_create", tzinfo=timezone.utc))
+        .order_by()
+        .values("post_id", "hour")
+        .annotate(
+            likes=Count("pk", filter=Q(value=1)),
+            dislikes=Count("pk", filter=Q(value=-1)),
+        )
+    )
+    RatingRollup.objects.bulk_create(
+        [RatingRollup(**row) for row in grouped.iterator()], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0011_comment_post_status_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RatingRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("hour", models.DateTimeField(verbose_name="Час")),
+                ("likes", models.IntegerField(default=0, verbose_name="Лайки")),
+                ("dislikes", models.IntegerField(default=0, verbose_name="Дизлайки")),
+                (
+                    "post",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="rating_rollups",
+                        to="blog.post",
+                        verbose_name="Запись",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Сводка оценок",
+                "verbose_name_plural": "Сводки оценок",
+                "ordering": ("-hour",),
+                "indexes": [
+                    models.Index(fields=["hour"], name="blog_rating_hour_26e08d_idx")
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("post", "hour"), name="blog_ratingrollup_post_hour"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(fill_rating_rollups, migrations.RunPython.noop),
+    ]
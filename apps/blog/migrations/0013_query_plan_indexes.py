@@ -0,0 +1,51 @@
+# Generated by Django 5.1.1 on 2026-10-19 12:38
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0012_ratingrollup"),
+        (
+            "taggit",
+            "0006_rename_taggeditem_content_type_object_id_taggit_tagg_content_8fc721_idx",
+        ),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="comment",
+            name="blog_commen_post_id_651007_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="post",
+            name="blog_post_fixed_0994c8_idx",
+        ),
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                fields=["post", "status", "tree_id", "lft"],
+                name="blog_comment_post_tree_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                fields=["status", "-fixed", "-create"],
+                name="blog_post_status_676151_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                fields=["status", "-create", "-id"], name="blog_post_status_228ea4_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(fields=["-update"], name="blog_post_update_f270bc_idx"),
+        ),
+    ]
@@ -0,0 +1,55 @@
+from django.db import migrations
+
+from apps.services.text import (
+    count_words,
+    make_excerpt,
+    reading_time,
+    sanitize_html,
+    strip_html,
+)
+
+BATCH_SIZE = 500
+
+
+def backfill_derived_fields(apps, schema_editor):
+    """
+    Производные поля записей, созданных до 0008: шаблоны выводят только их
+    (то же, что Post.compute_derived_fields и команда backfill_post_fields)
+    """
+    Post = apps.get_model("blog", "Post")
+    posts = (
+        Post.objects.filter(description_html="", text_html="")
+        .only("pk", "description", "text")
+        .order_by("pk")
+    )
+    batch = []
+    for post in posts.iterator(chunk_size=BATCH_SIZE):
+        post.description_html = sanitize_html(post.description)
+        post.text_html = sanitize_html(post.text)
+        plain_text = strip_html(post.text)
+        post.excerpt = make_excerpt(strip_html(post.description) or plain_text)
+        post.word_count = count_words(plain_text)
+        post.reading_time = reading_time(post.word_count)
+        batch.append(post)
+        if len(batch) >= BATCH_SIZE:
+            _flush(Post, batch)
+    _flush(Post, batch)
+
+
+def _flush(Post, batch):
+    Post.objects.bulk_update(
+        batch,
+        ("description_html", "text_html", "excerpt", "word_count", "reading_time"),
+    )
+    batch.clear()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0013_query_plan_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_derived_fields, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.1.1 on 2026-10-19 13:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0014_backfill_post_derived_fields"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedRating",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "value",
+                    models.IntegerField(
+                        choices=[(1, "Нравится"), (-1, "Не нравится")],
+                        verbose_name="Значение",
+                    ),
+                ),
+                ("ip_address", models.GenericIPAddressField(verbose_name="IP Адрес")),
+                (
+                    "post",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archived_ratings",
+                        to="blog.post",
+                        verbose_name="Запись",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Архивная оценка",
+                "verbose_name_plural": "Архивные оценки",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("post", "ip_address"),
+                        name="blog_archivedrating_post_ip",
+                    )
+                ],
+            },
+        ),
+    ]
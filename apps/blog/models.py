@@ -2,11 +2,21 @@ from ckeditor.fields import RichTextField
 from django.contrib.auth.models import User
 from django.core.validators import FileExtensionValidator
 from django.db import models
+from django.db.models import Exists, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
 from django.urls import reverse
 from mptt.fields import TreeForeignKey
+from mptt.managers import TreeManager
 from mptt.models import MPTTModel
 from taggit.managers import TaggableManager
 
+from apps.services.text import (
+    count_words,
+    make_excerpt,
+    reading_time,
+    sanitize_html,
+    strip_html,
+)
 from apps.services.utils import unique_slugify
 
 
@@ -18,6 +28,22 @@ def post_images_directory_path(instance: "Post", filename: str):
     )
 
 
+def rating_sum_subquery(outer_ref="pk"):
+    """
+    Подзапрос суммы оценок записи по таблице сводок
+    """
+    return Coalesce(
+        Subquery(
+            RatingRollup.objects.filter(post=OuterRef(outer_ref))
+            .order_by()
+            .values("post")
+            .annotate(total=Sum(F("likes") - F("dislikes")))
+            .values("total")
+        ),
+        Value(0),
+    )
+
+
 class PostManager(models.Manager):
     """
     Кастомный менеджер для модели постов
@@ -34,6 +60,17 @@ class PostManager(models.Manager):
             .filter(status="published")
         )
 
+    def for_list(self):
+        """
+        Список постов для карточек без загрузки полного текста записи,
+        с суммой оценок из почасовых сводок (без запроса на каждую карточку)
+        """
+        return (
+            self.get_queryset()
+            .defer(*Post.LIST_DEFERRED_FIELDS)
+            .annotate(rating_sum=rating_sum_subquery())
+        )
+
 
 class Post(models.Model):
     """
@@ -41,6 +78,7 @@ class Post(models.Model):
     """
 
     STATUS_OPTIONS = (("published", "Опубликовано"), ("draft", "Черновик"))
+    LIST_DEFERRED_FIELDS = ("description", "text", "text_html")
 
     title = models.CharField(verbose_name="Название записи", max_length=255)
     slug = models.SlugField(verbose_name="URL", max_length=255, blank=True)
@@ -91,6 +129,22 @@ class Post(models.Model):
         blank=True,
     )
     fixed = models.BooleanField(verbose_name="Прикреплено", default=False)
+    views = models.PositiveIntegerField(
+        verbose_name="Просмотры", default=0, editable=False
+    )
+    excerpt = models.TextField(verbose_name="Превью", blank=True, editable=False)
+    word_count = models.PositiveIntegerField(
+        verbose_name="Количество слов", default=0, editable=False
+    )
+    reading_time = models.PositiveSmallIntegerField(
+        verbose_name="Время чтения (мин.)", default=0, editable=False
+    )
+    description_html = models.TextField(
+        verbose_name="Очищенное описание", blank=True, editable=False
+    )
+    text_html = models.TextField(
+        verbose_name="Очищенный текст", blank=True, editable=False
+    )
 
     objects = models.Manager()
     custom = PostManager()
@@ -103,7 +157,15 @@ class Post(models.Model):
 
         db_table = "blog_post"
         ordering = ["-fixed", "-create"]
-        indexes = [models.Index(fields=["-fixed", "-create", "status"])]
+        indexes = [
+            # Менеджер сначала фильтрует по статусу, затем сортирует
+            models.Index(fields=["status", "-fixed", "-create"]),
+            models.Index(fields=["author", "-create", "-id"]),
+            models.Index(fields=["-create"]),
+            # Лента API и RSS (найдены check_query_plans)
+            models.Index(fields=["status", "-create", "-id"]),
+            models.Index(fields=["-update"]),
+        ]
         verbose_name = "Статья"
         verbose_name_plural = "Статьи"
 
@@ -118,15 +180,53 @@ class Post(models.Model):
         return reverse("post_detail", kwargs={"slug": self.slug})
 
     def get_sum_rating(self):
-        return sum([rating.value for rating in self.ratings.all()])
+        """
+        Сумма оценок из почасовых сводок (сырые оценки могут быть в архиве)
+        """
+        if hasattr(self, "rating_sum"):
+            return self.rating_sum
+        return self.rating_rollups.aggregate(
+            total=Coalesce(Sum(F("likes") - F("dislikes")), Value(0))
+        )["total"]
+
+    def compute_derived_fields(self):
+        """
+        Предрасчёт производных полей из HTML CKEditor: очищенная разметка,
+        превью, количество слов и время чтения
+        """
+        self.description_html = sanitize_html(self.description)
+        self.text_html = sanitize_html(self.text)
+        plain_text = strip_html(self.text)
+        self.excerpt = make_excerpt(strip_html(self.description) or plain_text)
+        self.word_count = count_words(plain_text)
+        self.reading_time = reading_time(self.word_count)
 
     def save(self, *args, **kwargs):
         """
-        При сохранении генерируем слаг и проверяем на уникальность
+        При сохранении генерируем слаг, проверяем на уникальность и
+        пересчитываем производные поля
         """
         self.slug = unique_slugify(self, self.title)
+        self.compute_derived_fields()
         super().save(*args, **kwargs)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Запоминаем загруженное имя изображения, чтобы обрабатывать в фоне
+        только новые загрузки, источники ссылок на файлы (без копирования
+        строк) для пересчёта ссылок при сохранении, а также статус и автора
+        для изменения счётчиков профилей на разницу
+        """
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_status = instance.__dict__.get("status")
+        instance._loaded_author_id = instance.__dict__.get("author_id")
+        instance._loaded_thumbnail = instance.__dict__.get("thumbnail")
+        instance._loaded_files_sources = tuple(
+            instance.__dict__.get(name) for name in ("thumbnail", "description", "text")
+        )
+        return instance
+
 
 class Category(MPTTModel):
     """
@@ -172,6 +272,29 @@ class Category(MPTTModel):
         return reverse("post_by_category", kwargs={"slug": self.slug})
 
 
+class CommentManager(TreeManager):
+    """
+    Менеджер комментариев с выборкой опубликованной части дерева
+    """
+
+    def published_for(self, post):
+        """
+        Опубликованные комментарии записи (по индексу post, status) без ответов
+        на черновики: в дереве не должно оставаться узлов без родителя
+        """
+        hidden_ancestor = self.model._default_manager.filter(
+            tree_id=OuterRef("tree_id"),
+            lft__lt=OuterRef("lft"),
+            rght__gt=OuterRef("rght"),
+            status="draft",
+        )
+        return (
+            self.filter(post=post, status="published")
+            .exclude(Exists(hidden_ancestor))
+            .select_related("author__profile")
+        )
+
+
 class Comment(MPTTModel):
     """
     Модель древовидных комментариев
@@ -208,17 +331,39 @@ class Comment(MPTTModel):
         on_delete=models.CASCADE,
     )
 
+    objects = CommentManager()
+
     class MTTMeta:
         order_insertion_by = ("-time_create",)
 
     class Meta:
         ordering = ["-time_create"]
+        indexes = [
+            models.Index(fields=["-time_create"]),
+            # Опубликованные комментарии записи сразу в порядке дерева; имя
+            # задано явно - поля MPTT добавляются после создания класса
+            models.Index(
+                fields=["post", "status", "tree_id", "lft"],
+                name="blog_comment_post_tree_idx",
+            ),
+        ]
         verbose_name = "Комментарий"
         verbose_name_plural = "Комментарии"
 
     def __str__(self):
         return f"{self.author}:{self.content}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Запоминаем загруженные статус и автора, чтобы при сохранении
+        изменить счётчик комментариев профиля на разницу
+        """
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_status = instance.__dict__.get("status")
+        instance._loaded_author_id = instance.__dict__.get("author_id")
+        return instance
+
 
 class Rating(models.Model):
     """
@@ -252,3 +397,73 @@ class Rating(models.Model):
 
     def __str__(self):
         return self.post.title
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Запоминаем загруженное значение оценки, чтобы при сохранении
+        изменить счётчики на разницу без дополнительного запроса
+        """
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_value = instance.__dict__.get("value")
+        return instance
+
+
+class ArchivedRating(models.Model):
+    """
+    Оценка, перенесённая командой archive_ratings в архив: только запись,
+    IP и значение - повторно проголосовать с того же IP нельзя, а голос
+    посетителя по-прежнему отмечается в карточке записи
+    """
+
+    post = models.ForeignKey(
+        Post,
+        verbose_name="Запись",
+        on_delete=models.CASCADE,
+        related_name="archived_ratings",
+    )
+    value = models.IntegerField(verbose_name="Значение", choices=Rating.VALUE_OPTIONS)
+    ip_address = models.GenericIPAddressField(verbose_name="IP Адрес")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["post", "ip_address"], name="blog_archivedrating_post_ip"
+            )
+        ]
+        verbose_name = "Архивная оценка"
+        verbose_name_plural = "Архивные оценки"
+
+    def __str__(self):
+        return f"{self.post_id}: {self.ip_address}"
+
+
+class RatingRollup(models.Model):
+    """
+    Почасовая сводка оценок записи: количество лайков и дизлайков,
+    поставленных в течение часа (для аналитики без чтения Rating)
+    """
+
+    post = models.ForeignKey(
+        Post,
+        verbose_name="Запись",
+        on_delete=models.CASCADE,
+        related_name="rating_rollups",
+    )
+    hour = models.DateTimeField(verbose_name="Час")
+    likes = models.IntegerField(verbose_name="Лайки", default=0)
+    dislikes = models.IntegerField(verbose_name="Дизлайки", default=0)
+
+    class Meta:
+        ordering = ("-hour",)
+        constraints = [
+            models.UniqueConstraint(
+                fields=["post", "hour"], name="blog_ratingrollup_post_hour"
+            )
+        ]
+        indexes = [models.Index(fields=["hour"])]
+        verbose_name = "Сводка оценок"
+        verbose_name_plural = "Сводки оценок"
+
+    def __str__(self):
+        return f"{self.post_id}: {self.hour:%Y-%m-%d %H:00}"
@@ -0,0 +1,72 @@
+from collections import Counter
+
+from django.db import transaction
+from django.utils import timezone
+
+from apps.accounts.stats import add_comment_counts, add_post_counts
+from apps.services.versions import bump_post_versions, bump_posts_version
+
+from .models import Comment, Post
+
+MODERATION_STATUSES = ("published", "draft")
+
+
+def _check_status(status):
+    if status not in MODERATION_STATUSES:
+        raise ValueError(f"Неизвестный статус: {status}")
+
+
+def _status_deltas(author_ids, status):
+    """
+    Изменение счётчиков опубликованных у авторов: каждая строка переходит
+    между двумя статусами модерации
+    """
+    sign = 1 if status == "published" else -1
+    return {author_id: sign * count for author_id, count in author_ids.items()}
+
+
+@transaction.atomic
+def set_comments_status(queryset, status):
+    """
+    Смена статуса комментариев одним UPDATE без save() для каждой строки
+    (без пересчёта дерева MPTT и сигналов); кэш записей инвалидируется
+    одной отметкой версии на каждую затронутую запись
+    """
+    _check_status(status)
+    queryset = Comment.objects.filter(pk__in=queryset.order_by().values("pk")).exclude(
+        status=status
+    )
+    affected = list(queryset.select_for_update().values_list("post_id", "author_id"))
+    if not affected:
+        return 0
+
+    # time_update обновляется вручную: update() не учитывает auto_now,
+    # а от него зависит Last-Modified страницы записи
+    updated = queryset.update(status=status, time_update=timezone.now())
+    post_ids = {post_id for post_id, _ in affected}
+    author_ids = Counter(author_id for _, author_id in affected)
+    transaction.on_commit(lambda: bump_post_versions(post_ids))
+    add_comment_counts(_status_deltas(author_ids, status))
+    return updated
+
+
+@transaction.atomic
+def set_posts_status(queryset, status):
+    """
+    Смена статуса записей одним UPDATE с изменением счётчиков авторов
+    """
+    _check_status(status)
+    queryset = Post.objects.filter(pk__in=queryset.order_by().values("pk")).exclude(
+        status=status
+    )
+    affected = list(queryset.select_for_update().values_list("pk", "author_id"))
+    if not affected:
+        return 0
+
+    updated = queryset.update(status=status, update=timezone.now())
+    post_ids = {post_id for post_id, _ in affected}
+    author_ids = Counter(author_id for _, author_id in affected)
+    transaction.on_commit(lambda: bump_post_versions(post_ids))
+    transaction.on_commit(bump_posts_version)
+    add_post_counts(_status_deltas(author_ids, status))
+    return updated
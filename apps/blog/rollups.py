@@ -0,0 +1,168 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import timedelta
+from datetime import timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDay, TruncHour
+from django.utils import timezone
+
+from apps.services.versions import get_versions, post_version_key
+
+from .models import Rating, RatingRollup
+
+# Удаление оценок при переносе в архив не меняет сводки и рейтинг автора
+_archiving = ContextVar("archiving_ratings", default=False)
+
+
+@contextmanager
+def archiving_ratings():
+    """
+    Блок, в котором удаляемые оценки переносятся в архив: они остаются
+    учтёнными в сводках
+    """
+    token = _archiving.set(True)
+    try:
+        yield
+    finally:
+        _archiving.reset(token)
+
+
+def is_archiving_ratings():
+    return _archiving.get()
+
+
+def rollup_hour(moment):
+    """
+    Начало часа (UTC), к которому относится оценка
+    """
+    return moment.astimezone(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def _value_counts(value):
+    return (1 if value == 1 else 0, 1 if value == -1 else 0)
+
+
+def apply_vote_change(rating, previous, current):
+    """
+    Изменение почасовой сводки при создании (previous=None), изменении или
+    удалении (current=None) оценки. Оценка учитывается в часе её создания.
+    """
+    old_likes, old_dislikes = _value_counts(previous)
+    new_likes, new_dislikes = _value_counts(current)
+    likes, dislikes = new_likes - old_likes, new_dislikes - old_dislikes
+    if not likes and not dislikes:
+        return
+
+    lookup = {"post_id": rating.post_id, "hour": rollup_hour(rating.time_create)}
+    changes = {"likes": F("likes") + likes, "dislikes": F("dislikes") + dislikes}
+    if RatingRollup.objects.filter(**lookup).update(**changes) or current is None:
+        # При удалении строку не создаём: её нет, только если запись удаляется
+        # вместе со сводками
+        return
+    try:
+        with transaction.atomic():
+            RatingRollup.objects.create(**lookup, likes=likes, dislikes=dislikes)
+    except IntegrityError:
+        # Строку за этот час успели создать параллельно
+        RatingRollup.objects.filter(**lookup).update(**changes)
+
+
+def rating_sums(post_ids):
+    """
+    Суммы оценок набора записей: кэш с ключами по версиям записей (оценка
+    меняет версию, поэтому устаревшее значение не читается) и один
+    группирующий запрос по сводкам для промахов
+    """
+    versions = get_versions([post_version_key(post_id) for post_id in post_ids])
+    keys = {
+        post_id: f"rating-sum-{post_id}-{versions[post_version_key(post_id)]}"
+        for post_id in post_ids
+    }
+    cached = cache.get_many(keys.values())
+    sums = {post_id: cached[key] for post_id, key in keys.items() if key in cached}
+
+    missing = [post_id for post_id in post_ids if post_id not in sums]
+    if missing:
+        computed = dict.fromkeys(missing, 0)
+        computed.update(
+            RatingRollup.objects.filter(post_id__in=missing)
+            .order_by()
+            .values("post_id")
+            .annotate(total=Sum(F("likes") - F("dislikes")))
+            .values_list("post_id", "total")
+        )
+        cache.set_many(
+            {keys[post_id]: total for post_id, total in computed.items()},
+            settings.RATING_SUMS_CACHE_TIMEOUT,
+        )
+        sums.update(computed)
+    return sums
+
+
+def rebuild_rollups(post_ids=None, batch_size=1000):
+    """
+    Пересчёт сводок по таблице Rating (заполнение и восстановление).
+    Сводки часов, оценки которых уже перенесены в архив, сохраняются.
+    """
+    ratings = Rating.objects.all()
+    if post_ids is not None:
+        ratings = ratings.filter(post_id__in=post_ids)
+    grouped = (
+        ratings.annotate(hour=TruncHour("time_create", tzinfo=dt_timezone.utc))
+        .order_by()
+        .values("post_id", "hour")
+        .annotate(
+            likes=Count("pk", filter=Q(value=1)),
+            dislikes=Count("pk", filter=Q(value=-1)),
+        )
+    )
+    rollups = [RatingRollup(**row) for row in grouped.iterator()]
+    with transaction.atomic():
+        existing = RatingRollup.objects.all()
+        if post_ids is not None:
+            existing = existing.filter(post_id__in=post_ids)
+        earliest = ratings.order_by("time_create").values_list("time_create", flat=True)
+        first_rating = earliest.first()
+        if first_rating is not None:
+            existing.filter(hour__gte=rollup_hour(first_rating)).delete()
+        RatingRollup.objects.bulk_create(
+            rollups,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=["post", "hour"],
+            update_fields=["likes", "dislikes"],
+        )
+    return len(rollups)
+
+
+def rating_series(days=14, by="day", post_id=None):
+    """
+    Лайки и дизлайки по часам или дням за последние days дней
+    (только из таблицы сводок)
+    """
+    since = timezone.now() - timedelta(days=days)
+    rollups = RatingRollup.objects.filter(hour__gte=rollup_hour(since))
+    if post_id is not None:
+        rollups = rollups.filter(post_id=post_id)
+    period = TruncDay("hour") if by == "day" else F("hour")
+    return list(
+        rollups.annotate(period=period)
+        .order_by("period")
+        .values("period")
+        .annotate(likes=Sum("likes"), dislikes=Sum("dislikes"))
+    )
+
+
+def top_posts(days=14, limit=10):
+    since = timezone.now() - timedelta(days=days)
+    return list(
+        RatingRollup.objects.filter(hour__gte=rollup_hour(since))
+        .order_by()
+        .values("post_id", "post__title")
+        .annotate(likes=Sum("likes"), dislikes=Sum("dislikes"))
+        .order_by("-likes", "dislikes")[:limit]
+    )
@@ -0,0 +1,168 @@
+from collections import Counter
+
+from django.contrib.contenttypes.models import ContentType
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from taggit.models import Tag, TaggedItem
+
+from apps.accounts.stats import add_comment_counts, add_post_counts, add_rating_received
+from apps.jobs.queue import enqueue
+from apps.services.versions import (
+    bump_post_versions,
+    bump_posts_version,
+    bump_site_version,
+)
+
+from .models import Category, Comment, Post, Rating
+from .rollups import apply_vote_change, is_archiving_ratings
+from .suggest import (
+    change_tag_usage,
+    record_post_deletion,
+    remove_post_title,
+    remove_tag,
+    set_post_title,
+    set_tag,
+)
+from .tasks import process_post_thumbnail
+
+
+@receiver(post_save, sender=Rating)
+@receiver(post_delete, sender=Rating)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def bump_post_version(sender, instance, **kwargs):
+    bump_post_versions([instance.post_id])
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def bump_categories_version(sender, instance, **kwargs):
+    bump_site_version()
+
+
+def published_deltas(instance, created=False, deleted=False):
+    """
+    Изменение числа опубликованных записей (комментариев) авторов по
+    загруженным статусу и автору: {author_id: delta}
+    """
+    deltas = Counter()
+    if not created:
+        status = getattr(instance, "_loaded_status", None) or instance.status
+        if status == "published":
+            author_id = getattr(instance, "_loaded_author_id", None)
+            deltas[author_id or instance.author_id] -= 1
+    if not deleted:
+        if instance.status == "published":
+            deltas[instance.author_id] += 1
+        instance._loaded_status = instance.status
+        instance._loaded_author_id = instance.author_id
+    return deltas
+
+
+@receiver(post_save, sender=Post)
+def update_author_post_count_on_save(sender, instance, created, **kwargs):
+    add_post_counts(published_deltas(instance, created=created))
+
+
+@receiver(post_delete, sender=Post)
+def update_author_post_count_on_delete(sender, instance, **kwargs):
+    add_post_counts(published_deltas(instance, deleted=True))
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def bump_posts_list_version(sender, instance, **kwargs):
+    bump_posts_version()
+
+
+@receiver(post_save, sender=Post)
+def update_title_index_on_save(sender, instance, **kwargs):
+    set_post_title(instance)
+
+
+@receiver(post_delete, sender=Post)
+def update_title_index_on_delete(sender, instance, **kwargs):
+    remove_post_title(instance.pk)
+
+
+@receiver(pre_delete, sender=Post)
+def record_title_index_deletion(sender, instance, **kwargs):
+    # До отметки новой версии списка записей в post_delete: процессы,
+    # увидевшие новую версию, найдут и отметку удаления
+    record_post_deletion(instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+def update_author_comment_count_on_save(sender, instance, created, **kwargs):
+    add_comment_counts(published_deltas(instance, created=created))
+
+
+@receiver(post_delete, sender=Comment)
+def update_author_comment_count_on_delete(sender, instance, **kwargs):
+    add_comment_counts(published_deltas(instance, deleted=True))
+
+
+@receiver(post_save, sender=Rating)
+def update_rating_aggregates_on_save(sender, instance, created, **kwargs):
+    """
+    Рейтинг автора и почасовая сводка меняются на разницу с загруженным
+    значением оценки
+    """
+    previous = None if created else getattr(instance, "_loaded_value", instance.value)
+    if previous != instance.value:
+        add_rating_received(instance.post_id, instance.value - (previous or 0))
+        apply_vote_change(instance, previous, instance.value)
+    instance._loaded_value = instance.value
+
+
+@receiver(post_delete, sender=Rating)
+def update_rating_aggregates_on_delete(sender, instance, **kwargs):
+    if is_archiving_ratings():
+        return
+    add_rating_received(instance.post_id, -instance.value)
+    apply_vote_change(instance, instance.value, None)
+
+
+@receiver(post_save, sender=Post)
+def enqueue_thumbnail_processing(sender, instance, **kwargs):
+    name = instance.thumbnail.name
+    if (
+        name
+        and name != "default.jpg"
+        and name != getattr(instance, "_loaded_thumbnail", None)
+    ):
+        enqueue(
+            process_post_thumbnail,
+            key=f"post-thumbnail-{instance.pk}",
+            post_id=instance.pk,
+        )
+    instance._loaded_thumbnail = name
+
+
+@receiver(post_save, sender=Tag)
+def update_tag_index_on_save(sender, instance, **kwargs):
+    set_tag(instance)
+
+
+@receiver(post_delete, sender=Tag)
+def update_tag_index_on_delete(sender, instance, **kwargs):
+    remove_tag(instance.pk)
+
+
+def is_post_tag(tagged_item):
+    return tagged_item.content_type_id == ContentType.objects.get_for_model(Post).pk
+
+
+@receiver(post_save, sender=TaggedItem)
+def update_tag_usage_on_save(sender, instance, created, **kwargs):
+    """
+    Вес тега в подсказках - число записей с ним
+    """
+    if created and is_post_tag(instance):
+        change_tag_usage(instance.tag_id, 1)
+
+
+@receiver(post_delete, sender=TaggedItem)
+def update_tag_usage_on_delete(sender, instance, **kwargs):
+    if is_post_tag(instance):
+        change_tag_usage(instance.tag_id, -1)
@@ -0,0 +1,169 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+
+from apps.services.prefix_index import PrefixIndex, VersionedIndex, WordPrefixIndex
+from apps.services.versions import POSTS_VERSION_KEY, TAGS_VERSION_KEY
+
+from .api import tags_with_post_counts
+from .models import Post
+
+
+def load_tag_index():
+    """
+    Индекс тегов одним запросом: имя, slug и число записей как вес
+    """
+    rows = tags_with_post_counts().values_list("pk", "name", "slug", "posts")
+    return PrefixIndex(
+        (
+            (pk, name, posts, {"name": name, "slug": slug, "posts": posts})
+            for pk, name, slug, posts in rows.iterator()
+        ),
+        words=True,
+    )
+
+
+tag_index = VersionedIndex(TAGS_VERSION_KEY, load_tag_index)
+
+
+def suggest_tags(prefix, limit=10):
+    return tag_index.get().search(prefix, limit)
+
+
+def canonical_tag_name(name):
+    """
+    Имя существующего тега, совпадающего с name без учёта регистра, ё/е
+    и пробелов - чтобы не создавать почти одинаковые теги
+    """
+    existing = tag_index.get().exact(name)
+    return existing["name"] if existing else name.strip()
+
+
+def set_tag(tag):
+    def change(index):
+        weight, payload = index.get(tag.pk) or (0, {"posts": 0})
+        index.set(
+            tag.pk,
+            tag.name,
+            weight,
+            {"name": tag.name, "slug": tag.slug, "posts": payload["posts"]},
+        )
+
+    tag_index.apply(change)
+
+
+def remove_tag(tag_id):
+    tag_index.apply(lambda index: index.remove(tag_id))
+
+
+def change_tag_usage(tag_id, delta):
+    def change(index):
+        current = index.get(tag_id)
+        if current is not None:
+            weight, payload = current
+            index.set(
+                tag_id,
+                payload["name"],
+                weight + delta,
+                {**payload, "posts": payload["posts"] + delta},
+            )
+
+    tag_index.apply(change)
+
+
+def load_title_index():
+    """
+    Индекс заголовков опубликованных записей, новые первыми
+    """
+    rows = Post.custom.order_by("-create", "-pk").values_list("pk", "title", "slug")
+    return WordPrefixIndex(rows.iterator(chunk_size=5000))
+
+
+# Удалённые записи отмечаются в кэше по корзинам времени: count - число
+# отметок корзины (add + incr), каждая отметка - в своём ключе
+DELETED_BUCKET_SECONDS = 10
+# Запас на расхождение часов и незавершённые транзакции, с
+SYNC_MARGIN_SECONDS = 5
+
+
+def _deleted_key(bucket, suffix):
+    return f"posts-deleted-{bucket}-{suffix}"
+
+
+def record_post_deletion(post_id):
+    """
+    Отметка удалённой записи для индексов других процессов: строк в базе
+    уже нет, и sync_title_index находит их только по этим отметкам.
+    Отметки нужны не дольше SUGGEST_INDEX_MAX_AGE - затем индекс
+    перестраивается целиком
+    """
+    bucket = int(time.time() // DELETED_BUCKET_SECONDS)
+    timeout = settings.SUGGEST_INDEX_MAX_AGE + DELETED_BUCKET_SECONDS
+    count_key = _deleted_key(bucket, "count")
+    cache.add(count_key, 0, timeout)
+    try:
+        slot = cache.incr(count_key)
+    except ValueError:
+        # Ключ вытеснен между add и incr
+        cache.set(count_key, 1, timeout)
+        slot = 1
+    cache.set(_deleted_key(bucket, slot), post_id, timeout)
+
+
+def deleted_post_ids(since):
+    """
+    Записи, удалённые с момента since (timestamp), по отметкам в кэше
+    """
+    now = time.time()
+    since = max(since, now - settings.SUGGEST_INDEX_MAX_AGE) - SYNC_MARGIN_SECONDS
+    buckets = range(
+        int(since // DELETED_BUCKET_SECONDS), int(now // DELETED_BUCKET_SECONDS) + 1
+    )
+    counts = cache.get_many([_deleted_key(bucket, "count") for bucket in buckets])
+    slots = [
+        _deleted_key(bucket, slot)
+        for bucket in buckets
+        for slot in range(1, counts.get(_deleted_key(bucket, "count"), 0) + 1)
+    ]
+    return set(cache.get_many(slots).values())
+
+
+def sync_title_index(index, since):
+    """
+    Догрузка записей, изменённых или удалённых другими процессами с прошлой
+    синхронизации (с запасом на расхождение часов и незавершённые транзакции)
+    """
+    rows = Post.objects.filter(
+        update__gte=since - timedelta(seconds=SYNC_MARGIN_SECONDS)
+    ).values_list("pk", "title", "slug", "status")
+    for pk, title, slug, status in rows.order_by("create", "pk"):
+        if status == "published":
+            index.put(pk, title, slug)
+        else:
+            index.discard(pk)
+    for pk in deleted_post_ids(since.timestamp()):
+        index.discard(pk)
+
+
+# Версию списка записей меняют сигналы Post и массовые действия над записями
+title_index = VersionedIndex(POSTS_VERSION_KEY, load_title_index, sync_title_index)
+
+
+def suggest_titles(query, limit=10):
+    return title_index.get().search(query, limit)
+
+
+def set_post_title(post):
+    def change(index):
+        if post.status == "published":
+            index.put(post.pk, post.title, post.slug)
+        else:
+            index.discard(post.pk)
+
+    title_index.apply(change, bump=False)
+
+
+def remove_post_title(post_id):
+    title_index.apply(lambda index: index.discard(post_id), bump=False)
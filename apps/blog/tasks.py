@@ -0,0 +1,51 @@
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+from apps.jobs.queue import task
+from apps.services import counters
+
+from .models import Post
+
+
+@task
+def process_post_thumbnail(post_id):
+    """
+    Уменьшение загруженного изображения записи до POST_THUMBNAIL_MAX_SIZE
+    с учётом EXIF-ориентации; уже обработанные изображения не меняются
+    """
+    post = Post.objects.filter(pk=post_id).only("thumbnail").first()
+    if post is None or not post.thumbnail or post.thumbnail.name == "default.jpg":
+        return
+
+    storage, name = post.thumbnail.storage, post.thumbnail.name
+    with storage.open(name) as file:
+        image = Image.open(file)
+        image.load()
+    image_format = image.format
+    max_width, max_height = settings.POST_THUMBNAIL_MAX_SIZE
+    if image.width <= max_width and image.height <= max_height:
+        return
+
+    image = ImageOps.exif_transpose(image)
+    image.thumbnail(settings.POST_THUMBNAIL_MAX_SIZE)
+    if image_format == "JPEG" and image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+    buffer = BytesIO()
+    image.save(buffer, format=image_format, optimize=True)
+
+    storage.delete(name)
+    saved_name = storage.save(name, ContentFile(buffer.getvalue()))
+    if saved_name != name:
+        # update() без сигналов, чтобы не поставить задачу повторно
+        Post.objects.filter(pk=post_id).update(thumbnail=saved_name)
+
+
+@task
+def flush_post_views():
+    """
+    Сброс накопленных в кэше просмотров записей в базу данных
+    """
+    counters.flush_post_views()
@@ -0,0 +1,16 @@
+from django import template
+
+from apps.services.jinja2 import render_fragment, template_engine
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def hot_include(context, template_name):
+    """
+    {% hot_include "sidebar.html" %}: как {% include %}, но шаблон из
+    JINJA2_TEMPLATES рендерится Jinja2 с контекстом текущей страницы
+    """
+    if template_engine(template_name) == "django":
+        return context.template.engine.get_template(template_name).render(context)
+    return render_fragment(template_name, context.flatten())
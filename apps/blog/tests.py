@@ -1,3 +1,1348 @@
-from django.test import TestCase
+import gzip
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import timedelta
+from importlib import import_module
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.models import Permission, User
+from django.contrib.sessions.backends.cache import SessionStore
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import (
+    RequestFactory,
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import include, path, reverse
+from django.utils import timezone
+from taggit.models import Tag
+
+from apps.accounts.models import Profile
+from apps.accounts.presence import record_activity
+from apps.blog.admin import CommentAdminPage
+from apps.blog.async_views import (
+    AsyncPostDetailView,
+    AsyncPostFromCategory,
+    AsyncPostListView,
+)
+from apps.blog.checks import check_post_views_cache
+from apps.blog.conditional import post_validators
+from apps.blog.feeds import AsyncLatestPostFeed
+from apps.blog.forms import CommentCreateForm
+from apps.blog.models import (
+    ArchivedRating,
+    Category,
+    Comment,
+    Post,
+    Rating,
+    RatingRollup,
+)
+from apps.blog.rollups import rating_sums, rollup_hour
+from apps.blog.suggest import load_title_index, sync_title_index
+from apps.blog.tasks import flush_post_views as flush_post_views_job
+from apps.jobs.models import Job
+from apps.jobs.queue import claim_jobs, execute_job
+from apps.services import captcha, counters, routers, trust
+from apps.services.pagination import EstimatedCountPaginator
+from apps.services.prefix_index import VersionedIndex, WordPrefixIndex
+from apps.services.storage import CompressedManifestStaticFilesStorage, minify_js
+from apps.services.versions import POSTS_VERSION_KEY, SITE_VERSION_KEY, get_versions
+from django_site_blog_cbv.settings.base import check_captcha_settings
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+HOT_TEMPLATES = (
+    "blog/post_list.html",
+    "blog/post_detail.html",
+    "blog/comments/comments_list.html",
+    "sidebar.html",
+)
+
+CSRF_TOKEN_RE = re.compile(r'name="csrfmiddlewaretoken" value="[^"]+"')
+# Каждый запрос записи засчитывается как просмотр
+VIEWS_RE = re.compile(r"Просмотров: \d+")
+
+
+def normalize_html(content):
+    """
+    Разметка без различий в пробелах между тегами и внутри текста, без
+    значений, меняющихся от запроса к запросу
+    """
+    content = CSRF_TOKEN_RE.sub('name="csrfmiddlewaretoken" value=""', content)
+    content = VIEWS_RE.sub("Просмотров: ", content)
+    return re.sub(r">\s+<", "><", re.sub(r"\s+", " ", content)).strip()
+
+
+@override_settings(CACHES=LOCMEM_CACHES, RECAPTCHA_DISABLED=True)
+class JinjaTemplatesParityTest(TestCase):
+    """
+    Копии горячих шаблонов в templates/jinja2 выводят то же, что и шаблоны
+    Django, в любом сочетании движков страницы и вложенных шаблонов
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("author", password="password")
+        python = Category.objects.create(title="Python", slug="python")
+        django = Category.objects.create(title="Django", slug="django", parent=python)
+        Category.objects.create(title="Разное & прочее", slug="misc")
+        cls.posts = [
+            Post.objects.create(
+                title=title,
+                description="<p>Описание <b>записи</b></p>",
+                text="<p>Текст записи с символами &lt; &amp; &gt;</p>",
+                category=django,
+                author=cls.user,
+            )
+            for title in (
+                'Шаблоны "Django" & Jinja2',
+                "Кэш фрагментов",
+                "Дерево 'комментариев'",
+            )
+        ]
+        cls.post = cls.posts[0]
+        cls.post.tags.add("django", "шаблоны")
+
+        def comment(content, parent=None, status="published"):
+            return Comment.objects.create(
+                post=cls.post,
+                author=cls.user,
+                content=content,
+                parent=parent,
+                status=status,
+            )
+
+        root = comment("Первый <комментарий>")
+        reply = comment("Ответ", root)
+        comment("Ответ на ответ", reply)
+        comment("Черновик", reply, status="draft")
+        comment("Второй")
+
+    def get_pages(self):
+        return [
+            reverse("home"),
+            reverse("home") + "?page=2",
+            reverse("post_by_category", args=["django"]),
+            reverse("post_by_tags", args=["django"]),
+            self.post.get_absolute_url(),
+        ]
+
+    def render(self, path, jinja2_templates):
+        cache.clear()
+        with self.settings(JINJA2_TEMPLATES=list(jinja2_templates)):
+            response = self.client.get(path)
+        self.assertEqual(response.status_code, 200, path)
+        return normalize_html(response.content.decode())
+
+    def assert_parity(self):
+        combinations = [
+            HOT_TEMPLATES,
+            HOT_TEMPLATES[:2],
+            HOT_TEMPLATES[2:],
+            *[(name,) for name in HOT_TEMPLATES],
+        ]
+        for path in self.get_pages():
+            expected = self.render(path, ())
+            for jinja2_templates in combinations:
+                with self.subTest(path=path, jinja2_templates=jinja2_templates):
+                    self.assertEqual(self.render(path, jinja2_templates), expected)
+
+    def test_anonymous_pages(self):
+        self.assert_parity()
+
+    def test_authenticated_pages(self):
+        self.client.force_login(self.user)
+        self.assert_parity()
+
+    def test_jinja2_engine_is_used(self):
+        with self.settings(JINJA2_TEMPLATES=["blog/post_detail.html"]):
+            response = self.client.get(self.post.get_absolute_url())
+        self.assertEqual(
+            [template.origin.template_name for template in response.templates][:1],
+            ["blog/post_detail.html"],
+        )
+        self.assertEqual(response.templates[0].backend.name, "jinja2")
+
+
+@override_settings(
+    CACHES=LOCMEM_CACHES,
+    RECAPTCHA_VERIFIER="apps.services.captcha.stub_verify",
+    RECAPTCHA_VERIFY_TIMEOUT=0.2,
+    CAPTCHA_SUBMISSION_LIMIT=2,
+)
+class CaptchaTrustTest(TestCase):
+    """
+    Капча не показывается доверенным пользователям, проверка ответа
+    ограничена по времени (локальная проверка stub_verify)
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.newcomer = User.objects.create_user("newcomer")
+        cls.veteran = User.objects.create_user(
+            "veteran", date_joined=timezone.now() - timedelta(days=365)
+        )
+        Profile.objects.filter(user=cls.veteran).update(post_count=3, comment_count=10)
+
+    def setUp(self):
+        cache.clear()
+
+    def get_user(self, user):
+        # Оценка доверия запоминается на объекте пользователя
+        return User.objects.select_related("profile").get(pk=user.pk)
+
+    def submit(self, user, recaptcha="passed"):
+        form = CommentCreateForm(
+            {"content": "Комментарий", "g-recaptcha-response": recaptcha},
+            user=self.get_user(user),
+        )
+        return form.is_valid(), form
+
+    def test_captcha_depends_on_trust(self):
+        self.assertIn("recaptcha", CommentCreateForm().fields)
+        self.assertIn("recaptcha", CommentCreateForm(user=self.newcomer).fields)
+        self.assertNotIn(
+            "recaptcha", CommentCreateForm(user=self.get_user(self.veteran)).fields
+        )
+
+    def test_stub_verifier(self):
+        self.assertTrue(self.submit(self.newcomer)[0])
+        valid, form = self.submit(self.newcomer, "invalid")
+        self.assertFalse(valid)
+        self.assertEqual(form.errors.as_data()["recaptcha"][0].code, "captcha_invalid")
+
+    def test_timeout_fallback(self):
+        with self.settings(RECAPTCHA_STUB_DELAY=1):
+            valid, form = self.submit(self.newcomer)
+            self.assertFalse(valid)
+            self.assertEqual(
+                form.errors.as_data()["recaptcha"][0].code, "captcha_timeout"
+            )
+            with self.settings(RECAPTCHA_TIMEOUT_FALLBACK="accept"):
+                self.assertTrue(self.submit(self.newcomer)[0])
+
+    def test_full_verifier_pool_does_not_queue(self):
+        started, release = threading.Event(), threading.Event()
+
+        def hang():
+            started.set()
+            release.wait()
+
+        pool = captcha.VerifierPool()
+        with self.settings(RECAPTCHA_VERIFY_WORKERS=1):
+            future = pool.submit(hang)
+            started.wait()
+            self.assertIsNone(pool.submit(hang))
+            with mock.patch.object(captcha, "_verify_pool", pool):
+                valid, form = self.submit(self.newcomer)
+        self.assertFalse(valid)
+        self.assertEqual(form.errors.as_data()["recaptcha"][0].code, "captcha_timeout")
+
+        release.set()
+        future.result()
+        self.assertIsNotNone(pool.submit(hang))
+
+    def test_throttle_hits_revoke_trust(self):
+        for _ in range(3):
+            valid, form = self.submit(self.veteran)
+            self.assertTrue(valid)
+            self.assertNotIn("recaptcha", form.fields)
+        # Третья отправка превысила лимит - капча возвращается
+        self.assertIn(
+            "recaptcha", CommentCreateForm(user=self.get_user(self.veteran)).fields
+        )
+
+
+class DebugOnlySettingsTest(SimpleTestCase):
+    """
+    Профили настроек загружаются; заглушка проверки и отключение капчи
+    запрещены без DEBUG в любом профиле
+    """
+
+    def load_settings(self, code="import django_site_blog_cbv.settings", **env):
+        environ = {
+            name: value
+            for name, value in os.environ.items()
+            if not name.startswith("DJANGO_")
+        }
+        return subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=settings.BASE_DIR,
+            env={**environ, **env},
+            capture_output=True,
+            text=True,
+        )
+
+    def test_profiles(self):
+        code = (
+            "import json; from django_site_blog_cbv import settings as s; "
+            "print(json.dumps([s.DEBUG, s.RECAPTCHA_DISABLED, "
+            "'debug_toolbar' in s.INSTALLED_APPS, s.ALLOWED_HOSTS]))"
+        )
+        profiles = {
+            "development": [True, False, True],
+            "production": [False, False, False],
+            "loadtest": [False, True, False],
+        }
+        for profile, expected in profiles.items():
+            with self.subTest(profile=profile):
+                result = self.load_settings(code, DJANGO_PROFILE=profile)
+                self.assertEqual(result.returncode, 0, result.stderr)
+                self.assertEqual(json.loads(result.stdout)[:3], expected)
+        self.assertEqual(
+            json.loads(self.load_settings(code, DJANGO_PROFILE="loadtest").stdout)[3],
+            ["127.0.0.1", "localhost"],
+        )
+        result = self.load_settings(DJANGO_PROFILE="staging")
+        self.assertIn("ImportError", result.stderr)
+
+    def test_captcha_guard_checks_final_values(self):
+        stub = settings.RECAPTCHA_STUB_VERIFIER
+        verifier = "django_recaptcha.client.submit"
+        check_captcha_settings(True, True, stub)
+        # Сайт только на локальных адресах (профиль loadtest) - без DEBUG
+        check_captcha_settings(False, True, verifier, local_only=True)
+        for arguments in (
+            (False, True, verifier),
+            (False, False, stub),
+            (False, True, stub, True),
+        ):
+            with self.subTest(arguments=arguments):
+                with self.assertRaises(ImproperlyConfigured):
+                    check_captcha_settings(*arguments)
+
+    def test_stub_verifier_requires_debug(self):
+        stub = {"DJANGO_RECAPTCHA_VERIFIER": "apps.services.captcha.stub_verify"}
+        self.assertEqual(self.load_settings(**stub, DJANGO_DEBUG="1").returncode, 0)
+        for env in ({"DJANGO_DEBUG": "0"}, {"DJANGO_PROFILE": "production"}):
+            with self.subTest(**env):
+                result = self.load_settings(**stub, **env)
+                self.assertNotEqual(result.returncode, 0)
+                self.assertIn("ImproperlyConfigured", result.stderr)
+
+    def test_disabled_captcha_requires_debug(self):
+        disabled = {"DJANGO_RECAPTCHA_DISABLED": "1"}
+        self.assertEqual(self.load_settings(**disabled, DJANGO_DEBUG="1").returncode, 0)
+        for env in ({"DJANGO_DEBUG": "0"}, {"DJANGO_PROFILE": "production"}):
+            with self.subTest(**env):
+                result = self.load_settings(**disabled, **env)
+                self.assertIn("ImproperlyConfigured", result.stderr)
+        # Нагрузочный тест отключает капчу своим профилем
+        self.assertEqual(self.load_settings(DJANGO_PROFILE="loadtest").returncode, 0)
+
+
+class MinifyJsTest(SimpleTestCase):
+    """
+    Удаляются только комментарии, занимающие строки целиком
+    """
+
+    def test_code_between_comments_is_kept(self):
+        self.assertEqual(
+            minify_js("/* a */ foo();\nbar(); /* b */\nbaz();\n"),
+            "/* a */ foo();\nbar(); /* b */\nbaz();\n",
+        )
+
+    def test_full_line_comments_are_removed(self):
+        source = (
+            "/**\n * Описание\n */\n"
+            "function foo() {\n"
+            "    // комментарий\n"
+            "    /* a */\n"
+            "    return bar(); // после кода\n"
+            "}\n"
+            "/* b */ baz(); /* c */\n"
+            'url = "http://example.com";\n'
+        )
+        self.assertEqual(
+            minify_js(source),
+            "function foo() {\n"
+            "return bar(); // после кода\n"
+            "}\n"
+            "/* b */ baz(); /* c */\n"
+            'url = "http://example.com";\n',
+        )
+
+
+class ManifestStorageTest(SimpleTestCase):
+    """
+    Хранилище продакшена не подменяет хэшированные имена исходными
+    """
+
+    def test_missing_manifest_entry_raises(self):
+        storage = CompressedManifestStaticFilesStorage()
+        storage.hashed_files = {"js/ratings.js": "js/ratings.0123456789ab.js"}
+        self.assertEqual(
+            storage.url("js/ratings.js"), "/static/js/ratings.0123456789ab.js"
+        )
+        with self.assertRaises(ValueError):
+            storage.url("js/missing.js")
+        storage.hashed_files = {}
+        with self.assertRaises(ValueError):
+            storage.url("js/ratings.js")
+
+
+class PostDerivedFieldsTest(TestCase):
+    """
+    Очищенный HTML, превью, количество слов и время чтения считаются при
+    сохранении, для старых записей - миграцией
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.post = Post.objects.create(
+            title="Производные поля",
+            description='<p onclick="alert(1)">Описание <b>записи</b></p>',
+            text="<p>слово</p>" * 450 + "<script>alert(1)</script>",
+            category=Category.objects.create(title="Тексты", slug="texts"),
+            author=User.objects.create_user("author"),
+        )
+
+    def assert_derived_fields(self, post):
+        self.assertEqual(post.description_html, "<p>Описание <b>записи</b></p>")
+        self.assertEqual(post.text_html, "<p>слово</p>" * 450)
+        self.assertEqual(post.excerpt, "Описание записи")
+        self.assertEqual(post.word_count, 450)
+        self.assertEqual(post.reading_time, 2)
+
+    def test_fields_are_computed_on_save(self):
+        self.assert_derived_fields(Post.objects.get(pk=self.post.pk))
+
+    def test_migration_backfills_existing_posts(self):
+        Post.objects.filter(pk=self.post.pk).update(
+            description_html="", text_html="", excerpt="", word_count=0, reading_time=0
+        )
+        migration = import_module(
+            "apps.blog.migrations.0014_backfill_post_derived_fields"
+        )
+        migration.backfill_derived_fields(apps, None)
+        self.assert_derived_fields(Post.objects.get(pk=self.post.pk))
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class CategoryViewTest(TestCase):
+    """
+    Записи категории, а если их нет - записи её подкатегорий
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.parent = Category.objects.create(title="Python", slug="python")
+        child = Category.objects.create(
+            title="Django", slug="django", parent=cls.parent
+        )
+        cls.post = Post.objects.create(
+            title="Запись подкатегории",
+            description="Описание",
+            text="Текст",
+            category=child,
+            author=User.objects.create_user("author"),
+        )
+
+    def test_posts_from_subcategories(self):
+        response = self.client.get(reverse("post_by_category", args=["python"]))
+        self.assertEqual(list(response.context["posts"]), [self.post])
+
+    def test_unknown_category(self):
+        response = self.client.get(reverse("post_by_category", args=["missing"]))
+        self.assertEqual(response.status_code, 404)
+
+
+# Асинхронные представления подключаются только под ASGI (DJANGO_ASYNC_VIEWS):
+# для AsyncViewsTest - их маршруты перед основным URLconf
+urlpatterns = [
+    path("", AsyncPostListView.as_view(), name="home"),
+    path(
+        "category/<str:slug>/",
+        AsyncPostFromCategory.as_view(),
+        name="post_by_category",
+    ),
+    path("post/<str:slug>/", AsyncPostDetailView.as_view(), name="post_detail"),
+    path("feeds/latest/", AsyncLatestPostFeed(), name="latest_post_feed"),
+    path("", include("django_site_blog_cbv.urls")),
+]
+
+
+@override_settings(CACHES=LOCMEM_CACHES, ROOT_URLCONF=__name__)
+class AsyncViewsTest(TestCase):
+    """
+    Асинхронные версии главной, категории и полной записи не обращаются к
+    базе синхронно из цикла событий
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("author")
+        cls.category = Category.objects.create(title="Асинхронность", slug="async")
+        cls.post = Post.objects.create(
+            title="Асинхронная запись",
+            description="Описание",
+            text="Текст",
+            category=cls.category,
+            author=cls.user,
+        )
+        root = Comment.objects.create(post=cls.post, author=cls.user, content="Да")
+        Comment.objects.create(
+            post=cls.post, author=cls.user, content="Ответ", parent=root
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    async def assert_pages(self):
+        for path in (
+            reverse("home"),
+            reverse("post_by_category", args=["async"]),
+            self.post.get_absolute_url(),
+            reverse("latest_post_feed"),
+        ):
+            with self.subTest(path=path):
+                response = await self.async_client.get(path)
+                self.assertEqual(response.status_code, 200)
+        return response
+
+    async def test_anonymous_pages(self):
+        await self.assert_pages()
+        response = await self.async_client.get(self.post.get_absolute_url())
+        self.assertContains(response, "Ответ")
+        self.assertIs(response.resolver_match.func.view_class, AsyncPostDetailView)
+
+    async def test_authenticated_pages(self):
+        await sync_to_async(record_activity)(self.user.pk)
+        await self.async_client.aforce_login(self.user)
+        await self.assert_pages()
+        response = await self.async_client.get(self.post.get_absolute_url())
+        self.assertContains(response, "в сети")
+        self.assertContains(response, "Форма добавления комментария")
+
+    async def test_missing_objects(self):
+        for path in (
+            reverse("post_by_category", args=["missing"]),
+            reverse("post_detail", args=["missing"]),
+        ):
+            with self.subTest(path=path):
+                response = await self.async_client.get(path)
+                self.assertEqual(response.status_code, 404)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class PostValidatorsTest(TestCase):
+    """
+    ETag страницы записи зависит только от статуса «в сети» авторов её
+    комментариев
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.commenter = User.objects.create_user("commenter")
+        cls.visitor = User.objects.create_user("visitor")
+        cls.post = Post.objects.create(
+            title="Присутствие",
+            description="Описание",
+            text="Текст",
+            category=Category.objects.create(title="Разное", slug="misc"),
+            author=cls.commenter,
+        )
+        Comment.objects.create(post=cls.post, author=cls.commenter, content="Да")
+
+    def setUp(self):
+        cache.clear()
+        self.request = RequestFactory().get(self.post.get_absolute_url())
+        self.request.user = self.visitor
+
+    def etag(self):
+        return post_validators(self.request, self.post.slug)[0]
+
+    def test_etag_follows_commenters_presence(self):
+        etag = self.etag()
+        record_activity(self.visitor.pk)
+        self.assertEqual(self.etag(), etag)
+        record_activity(self.commenter.pk)
+        self.assertNotEqual(self.etag(), etag)
+
+    def test_validators_follow_visitor_trust(self):
+        now = time.time()
+        with mock.patch.object(trust.time, "time", return_value=now):
+            etag, last_modified = post_validators(self.request, self.post.slug)
+        with (
+            mock.patch.object(trust, "is_trusted", return_value=True),
+            mock.patch.object(trust.time, "time", return_value=now + 60),
+        ):
+            trusted_etag, trusted_modified = post_validators(
+                self.request, self.post.slug
+            )
+        # Капча скрыта: и ETag, и Last-Modified сменились
+        self.assertNotEqual(trusted_etag, etag)
+        self.assertGreater(trusted_modified, last_modified)
+
+    def test_validators_without_preconditions_come_from_page(self):
+        self.client.force_login(self.visitor)
+        url = self.post.get_absolute_url()
+        with mock.patch("apps.blog.views.post_validators") as validators:
+            response = self.client.get(url)
+        # Без If-None-Match валидаторы - по выбранным для страницы данным
+        validators.assert_not_called()
+        self.assertEqual(response["ETag"], self.etag())
+
+        response = self.client.get(url, headers={"If-None-Match": response["ETag"]})
+        self.assertEqual(response.status_code, 304)
+
+    def test_detail_page_loads_comments_once(self):
+        record_activity(self.commenter.pk)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.post.get_absolute_url())
+        self.assertContains(response, "в сети")
+        self.assertEqual(
+            len(
+                [
+                    query
+                    for query in context.captured_queries
+                    if '"blog_comment"."content"' in query["sql"]
+                ]
+            ),
+            1,
+        )
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class PostViewsBufferTest(TestCase):
+    """
+    Просмотры копятся в кэше и сбрасываются в базу одним UPDATE
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(title="Просмотры", slug="views")
+        author = User.objects.create_user("author")
+        cls.posts = [
+            Post.objects.create(
+                title=f"Запись {number}",
+                description="Описание",
+                text="Текст",
+                category=category,
+                author=author,
+            )
+            for number in range(2)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        # Сброс при первом просмотре не запускается
+        cache.set(counters.FLUSH_LOCK_KEY, True)
+        self.now = time.time()
+
+    def view(self, post, ip):
+        request = RequestFactory().get("/", REMOTE_ADDR=ip)
+        request.session = SessionStore()
+        with mock.patch.object(counters.time, "time", return_value=self.now):
+            return counters.register_post_view(request, post.pk)
+
+    def flush(self):
+        # Сбрасываются только закрытые корзины
+        self.now += 3 * counters.PENDING_BUCKET_SECONDS
+        with mock.patch.object(counters.time, "time", return_value=self.now):
+            return counters.flush_post_views()
+
+    def views(self):
+        return [Post.objects.get(pk=post.pk).views for post in self.posts]
+
+    def test_flush(self):
+        first, second = self.posts
+        self.assertTrue(self.view(first, "10.0.0.1"))
+        self.assertFalse(self.view(first, "10.0.0.1"))
+        self.assertTrue(self.view(first, "10.0.0.2"))
+        self.assertTrue(self.view(second, "10.0.0.1"))
+
+        self.assertEqual(self.flush(), 2)
+        self.assertEqual(self.views(), [2, 1])
+        self.assertEqual(self.flush(), 0)
+
+        self.assertTrue(self.view(second, "10.0.0.3"))
+        self.assertEqual(self.flush(), 1)
+        self.assertEqual(self.views(), [2, 2])
+
+    def test_views_in_open_bucket_wait_for_next_flush(self):
+        self.view(self.posts[0], "10.0.0.1")
+        with mock.patch.object(counters.time, "time", return_value=self.now):
+            self.assertEqual(counters.flush_post_views(), 0)
+        self.assertEqual(self.views(), [0, 0])
+        self.assertEqual(self.flush(), 1)
+        self.assertEqual(self.views(), [1, 0])
+
+    def test_flush_runs_in_job_queue(self):
+        cache.delete(counters.FLUSH_LOCK_KEY)
+        self.view(self.posts[0], "10.0.0.1")
+        self.view(self.posts[1], "10.0.0.1")
+        # Запрос страницы только ставит одну задачу сброса
+        self.assertEqual(self.views(), [0, 0])
+        job = Job.objects.get(task=flush_post_views_job.task_name)
+
+        self.now += 3 * counters.PENDING_BUCKET_SECONDS
+        self.assertEqual(claim_jobs(10), [job.pk])
+        with mock.patch.object(counters.time, "time", return_value=self.now):
+            self.assertEqual(execute_job(job.pk), "done")
+        self.assertEqual(self.views(), [1, 1])
+
+    def test_atomic_cache_check(self):
+        self.assertEqual(check_post_views_cache(None)[0].id, "blog.W001")
+        redis = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache"}}
+        with self.settings(CACHES=redis):
+            self.assertEqual(check_post_views_cache(None), [])
+
+
+@override_settings(
+    CACHES=LOCMEM_CACHES,
+    DATABASE_ROUTERS=["apps.services.routers.PrimaryReplicaRouter"],
+)
+class ReplicaRouterTest(TestCase):
+    """
+    Чтение моделей блога из реплики внутри use_replica(), запись - в основную
+    базу; после записи сессия закрепляется за основной базой
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.post = Post.objects.create(
+            title="Реплика",
+            description="Описание",
+            text="Текст",
+            category=Category.objects.create(title="Разное", slug="misc"),
+            author=User.objects.create_user("author"),
+        )
+
+    def setUp(self):
+        cache.clear()
+        # Реплика в тестах не настроена: маршрутизация проверяется по
+        # выбранному псевдониму базы, без запросов к ней
+        patcher = mock.patch.object(routers, "replica_enabled", return_value=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_reads_go_to_replica(self):
+        self.assertEqual(Post.objects.all().db, "default")
+        with routers.use_replica():
+            self.assertEqual(Post.objects.all().db, routers.REPLICA_ALIAS)
+            self.assertEqual(Tag.objects.all().db, routers.REPLICA_ALIAS)
+            # Остальные приложения читают из основной базы
+            self.assertEqual(User.objects.all().db, "default")
+        with routers.use_replica(False):
+            self.assertEqual(Post.objects.all().db, "default")
+
+    def test_writes_go_to_primary(self):
+        with routers.use_replica():
+            self.assertEqual(Post.objects.db_manager().db, routers.REPLICA_ALIAS)
+            rating = Rating.objects.create(
+                post=self.post, value=1, ip_address="10.0.0.1"
+            )
+            self.assertEqual(rating._state.db, "default")
+            self.assertEqual(
+                routers.PrimaryReplicaRouter().db_for_write(Post), "default"
+            )
+
+    def test_session_sticks_to_primary_after_write(self):
+        url = self.post.get_absolute_url()
+        with mock.patch(
+            "apps.services.mixins.use_replica", return_value=nullcontext()
+        ) as use_replica:
+            self.client.get(url)
+            response = self.client.post(
+                reverse("rating"), {"post_id": self.post.pk, "value": 1}
+            )
+            self.assertTrue(routers.is_pinned_to_primary(response.wsgi_request))
+            self.client.get(url)
+
+            later = time.time() + settings.REPLICA_STICKY_SECONDS + 1
+            with mock.patch.object(routers.time, "time", return_value=later):
+                self.client.get(url)
+        self.assertEqual(
+            [call.args for call in use_replica.call_args_list],
+            [(True,), (False,), (True,)],
+        )
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class CommentAdminTest(TestCase):
+    """
+    Дерево комментариев в админ-панели загружает ограниченное число веток,
+    оценка количества строк не ведёт на страницы за концом таблицы
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser("admin")
+        category = Category.objects.create(title="Админка", slug="admin")
+        cls.posts = [
+            Post.objects.create(
+                title=f"Запись {number}",
+                description="Описание",
+                text="Текст",
+                category=category,
+                author=cls.admin,
+            )
+            for number in range(2)
+        ]
+        cls.roots = [
+            Comment.objects.create(post=post, author=cls.admin, content=str(number))
+            for number, post in enumerate([*cls.posts, cls.posts[0]])
+        ]
+        Comment.objects.create(
+            post=cls.posts[0], author=cls.admin, content="Ответ", parent=cls.roots[0]
+        )
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def tree_ids(self, **params):
+        response = self.client.get(reverse("admin:blog_comment_tree_json"), params)
+        self.assertEqual(response.status_code, 200)
+        return [int(node["id"]) for node in response.json()]
+
+    def test_tree_roots_are_limited(self):
+        self.assertEqual(self.tree_ids(), [root.pk for root in self.roots])
+        with mock.patch.object(CommentAdminPage, "tree_roots_limit", 2):
+            self.assertEqual(self.tree_ids(), [root.pk for root in self.roots[1:]])
+            # Ответы раскрываемой ветки не ограничиваются
+            self.assertEqual(len(self.tree_ids(node=self.roots[0].pk)), 1)
+
+    def test_tree_filtered_by_post(self):
+        self.assertEqual(
+            self.tree_ids(post=self.posts[0].pk),
+            [self.roots[0].pk, self.roots[2].pk],
+        )
+
+    def test_estimate_is_clamped_after_deletes(self):
+        self.roots[1].delete()
+        # Оценка по максимальному первичному ключу - четыре строки из трёх
+        paginator = EstimatedCountPaginator(Comment.objects.order_by("pk"), 1)
+        self.assertEqual((paginator.count, paginator.is_estimate), (4, True))
+
+        page = paginator.page(4)
+        self.assertEqual((page.number, paginator.count), (3, 3))
+        self.assertFalse(paginator.is_estimate)
+
+        grid_url = reverse("admin:blog_comment_grid")
+        with mock.patch.object(CommentAdminPage, "list_per_page", 1):
+            self.assertContains(self.client.get(grid_url), "≈ 4")
+            response = self.client.get(grid_url, {"p": 4})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, "≈")
+        self.assertEqual(len(response.context["cl"].result_list), 1)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ModerationQueueTest(TestCase):
+    """
+    Массовая смена статуса комментариев в очереди модерации
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.moderator = User.objects.create_user("moderator")
+        cls.moderator.user_permissions.add(
+            Permission.objects.get(codename="change_comment")
+        )
+        post = Post.objects.create(
+            title="Модерация",
+            description="Описание",
+            text="Текст",
+            category=Category.objects.create(title="Модерация", slug="moderation"),
+            author=cls.moderator,
+        )
+        cls.comments = [
+            Comment.objects.create(
+                post=post, author=cls.moderator, content=str(number), status="draft"
+            )
+            for number in range(3)
+        ]
+
+    def setUp(self):
+        self.client.force_login(self.moderator)
+        self.url = reverse("moderation_queue")
+
+    def statuses(self):
+        return [Comment.objects.get(pk=comment.pk).status for comment in self.comments]
+
+    def test_publish_selected(self):
+        response = self.client.post(
+            self.url,
+            {"action": "published", "ids": [self.comments[0].pk, self.comments[2].pk]},
+        )
+        self.assertRedirects(response, self.url, fetch_redirect_response=False)
+        self.assertEqual(self.statuses(), ["published", "draft", "published"])
+
+    def test_invalid_ids_are_rejected(self):
+        response = self.client.post(
+            self.url,
+            {"action": "published", "ids": [self.comments[0].pk, "1 OR 1"]},
+            follow=True,
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Неверный список комментариев")
+        self.assertEqual(self.statuses(), ["draft"] * 3)
+
+    def test_requires_permission(self):
+        self.client.force_login(User.objects.create_user("reader"))
+        response = self.client.post(
+            self.url, {"action": "published", "ids": [self.comments[0].pk]}
+        )
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(self.statuses(), ["draft"] * 3)
+
+
+@override_settings(CACHES=LOCMEM_CACHES, SUGGEST_INDEX_CHECK_INTERVAL=0)
+class TitleIndexTest(TestCase):
+    """
+    Подсказки заголовков: чтение во время изменений индекса и удаления
+    записей в других процессах
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(title="Подсказки", slug="suggest")
+        author = User.objects.create_user("author")
+        cls.posts = [
+            Post.objects.create(
+                title=f"Подсказка номер {number}",
+                description="Описание",
+                text="Текст",
+                category=category,
+                author=author,
+            )
+            for number in range(3)
+        ]
+
+    def setUp(self):
+        cache.clear()
+
+    def test_search_during_changes(self):
+        index = WordPrefixIndex((n, f"Запись {n}", f"zapis-{n}") for n in range(100))
+        for number in range(500):
+            index.put(1000 + number, "Черновик", f"chernovik-{number}")
+        stop = threading.Event()
+
+        def change():
+            number = 0
+            while not stop.is_set():
+                number += 1
+                index.put(1000 + number % 500, "Черновик", f"chernovik-{number}")
+                index.discard(number % 100)
+
+        # Частое переключение потоков - чтение прерывается изменениями
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        self.addCleanup(sys.setswitchinterval, interval)
+        writer = threading.Thread(target=change)
+        writer.start()
+        try:
+            deadline = time.monotonic() + 0.3
+            while time.monotonic() < deadline:
+                self.assertLessEqual(len(index.search("zapis", limit=200)), 100)
+                keys = [key for key, _, _ in index.items()]
+                self.assertEqual(len(keys), len(set(keys)))
+        finally:
+            stop.set()
+            writer.join()
+        self.assertEqual(len(index), len(list(index.items())))
+
+    def test_changes_and_compaction(self):
+        index = WordPrefixIndex((n, f"Запись {n}", f"zapis-{n}") for n in range(3))
+        index.max_delta = 4
+        index.put(10, "Новая запись", "novaia-zapis")
+        index.put(1, "Изменённая запись", "izmenionnaia-zapis")
+        index.discard(2)
+        index.discard(20)
+        self.assertEqual(len(index), 3)
+        self.assertEqual([item["id"] for item in index.search("zapis")], [1, 10, 0])
+        # Сжатие в новую основу сохраняет порядок: изменённые - первыми
+        index.put(11, "Ещё запись", "eshche-zapis")
+        self.assertEqual((len(index.delta), len(index.removed)), (0, 0))
+        self.assertEqual([item["id"] for item in index.search("zapis")], [11, 1, 10, 0])
+
+    def test_deletion_in_other_process(self):
+        # Индекс «другого процесса»: сигналы этого процесса его не меняют
+        other = VersionedIndex(POSTS_VERSION_KEY, load_title_index, sync_title_index)
+        self.assertEqual(len(other.get().search("podskazka")), 3)
+
+        self.posts[0].delete()
+        self.assertEqual(
+            {item["id"] for item in other.get().search("podskazka")},
+            {post.pk for post in self.posts[1:]},
+        )
+
+    def test_tag_named_suggest(self):
+        self.posts[0].tags.add("suggest")
+        response = self.client.get(reverse("post_by_tags", args=["suggest"]))
+        self.assertContains(response, self.posts[0].title)
+
+        response = self.client.get(reverse("tag_suggest"), {"q": "sug"})
+        self.assertEqual(response.json()["results"][0]["name"], "suggest")
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class RatingSumsTest(TestCase):
+    """
+    Суммы оценок для карточек перепроверяются по ETag при каждом запросе
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user("author")
+        category = Category.objects.create(title="Оценки", slug="ratings")
+        cls.posts = [
+            Post.objects.create(
+                title=f"Запись {number}",
+                description="Описание",
+                text="Текст",
+                category=category,
+                author=author,
+            )
+            for number in range(2)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse("rating_sums")
+        self.ids = ",".join(str(post.pk) for post in self.posts)
+
+    def get(self, **headers):
+        return self.client.get(self.url, {"ids": self.ids}, headers=headers)
+
+    def test_sums_and_votes(self):
+        first, second = self.posts
+        Rating.objects.create(post=first, value=1, ip_address="10.0.0.1")
+        Rating.objects.create(post=first, value=1, ip_address="127.0.0.1")
+        Rating.objects.create(post=second, value=-1, ip_address="10.0.0.1")
+        self.assertEqual(
+            self.get().json()["ratings"],
+            {
+                str(first.pk): {"rating_sum": 2, "vote": 1},
+                str(second.pk): {"rating_sum": -1, "vote": None},
+            },
+        )
+
+    def test_revalidation(self):
+        response = self.get()
+        self.assertEqual(response["Cache-Control"], "private, no-cache")
+        etag = response["ETag"]
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get(if_none_match=etag).status_code, 304)
+
+        # Голос меняет версию записи - ответ больше не совпадает
+        Rating.objects.create(post=self.posts[1], value=1, ip_address="127.0.0.1")
+        response = self.get(if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(response.json()["ratings"][str(self.posts[1].pk)]["vote"], 1)
+
+    def test_invalid_ids(self):
+        response = self.client.get(self.url, {"ids": "1,abc"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_archived_votes(self):
+        first, second = self.posts
+        Rating.objects.create(post=first, value=1, ip_address="127.0.0.1")
+        Rating.objects.create(post=first, value=1, ip_address="10.0.0.1")
+        Rating.objects.create(post=second, value=-1, ip_address="127.0.0.1")
+        Rating.objects.update(time_create=timezone.now() - timedelta(days=40))
+        RatingRollup.objects.update(hour=timezone.now() - timedelta(days=40))
+        expected = {
+            str(first.pk): {"rating_sum": 2, "vote": 1},
+            str(second.pk): {"rating_sum": -1, "vote": -1},
+        }
+        self.assertEqual(self.get().json()["ratings"], expected)
+
+        output = os.path.join(tempfile.mkdtemp(), "ratings.csv.gz")
+        self.addCleanup(shutil.rmtree, os.path.dirname(output))
+        call_command(
+            "archive_ratings",
+            "--older-than=30",
+            f"--output={output}",
+            stdout=StringIO(),
+        )
+        self.assertFalse(Rating.objects.exists())
+        self.assertEqual(ArchivedRating.objects.count(), 3)
+        with gzip.open(output, "rt") as file:
+            self.assertEqual(len(file.readlines()), 4)
+        # Сводки не изменились, голос посетителя по-прежнему отмечен
+        self.assertEqual(self.get().json()["ratings"], expected)
+
+        # Повторный голос с того же IP не принимается
+        response = self.client.post(
+            reverse("rating"), {"post_id": first.pk, "value": 1}
+        )
+        self.assertEqual(
+            response.json(), {"status": "archived", "vote": 1, "rating_sum": 2}
+        )
+        self.client.post(reverse("rating"), {"post_id": second.pk, "value": 1})
+        self.assertFalse(Rating.objects.exists())
+        self.assertEqual(self.get().json()["ratings"], expected)
+
+
+@override_settings(CACHES=LOCMEM_CACHES, ALLOWED_HOSTS=["testserver", "localhost"])
+class WarmCacheTest(TestCase):
+    """
+    warm_cache запрашивает самые посещаемые адреса: заполняются фрагмент
+    боковой панели, лента и суммы оценок самых оценённых записей
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user("author")
+        category = Category.objects.create(title="Прогрев", slug="warm")
+        cls.posts = [
+            Post.objects.create(
+                title=f"Запись {number}",
+                description="Описание",
+                text="Текст",
+                category=category,
+                author=author,
+            )
+            for number in range(3)
+        ]
+        hour = rollup_hour(timezone.now())
+        # Сводки без строк оценок: оценки уже архивированы
+        RatingRollup.objects.create(post=cls.posts[1], hour=hour, likes=5, dislikes=2)
+        RatingRollup.objects.create(post=cls.posts[2], hour=hour, likes=1)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_warm_cache(self):
+        out = StringIO()
+        call_command(
+            "warm_cache",
+            "--pages=2",
+            "--posts=1",
+            "--concurrency=1",
+            "--rate=0",
+            stdout=out,
+        )
+        self.assertIn("Прогрето адресов: 6 из 6", out.getvalue())
+
+        site_version = get_versions([SITE_VERSION_KEY])[SITE_VERSION_KEY]
+        self.assertIsNotNone(
+            cache.get(make_template_fragment_key("sidebar-categories", [site_version]))
+        )
+        with self.assertNumQueries(0):
+            self.client.get(reverse("latest_post_feed"), HTTP_HOST="localhost")
+            # Строка запроса не меняет ключ ленты
+            self.client.get(
+                reverse("latest_post_feed"), {"x": 1}, HTTP_HOST="localhost"
+            )
+            self.assertEqual(rating_sums([self.posts[1].pk]), {self.posts[1].pk: 3})
+        # Прогреваются только самые оценённые записи
+        with self.assertNumQueries(1):
+            rating_sums([self.posts[2].pk])
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class JsonApiTest(TestCase):
+    """
+    JSON API v1: только опубликованное, наборы полей, курсорная пагинация
+    и ответ 304 по ETag
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user("author")
+        cls.category = Category.objects.create(title="Новости", slug="news")
+        cls.child = Category.objects.create(
+            title="Релизы", slug="releases", parent=cls.category
+        )
+        cls.posts = [
+            Post.objects.create(
+                title=f"Запись {number}",
+                description="Описание",
+                text="Текст",
+                category=cls.category,
+                author=cls.author,
+            )
+            for number in range(3)
+        ]
+        cls.posts[0].tags.add("django", "python")
+        cls.posts[1].tags.add("python")
+        cls.draft = Post.objects.create(
+            title="Черновик",
+            description="Описание",
+            text="Текст",
+            category=cls.child,
+            author=cls.author,
+            status="draft",
+        )
+
+    def get(self, url, **params):
+        return self.client.get(url, params)
+
+    def test_post_list_pages(self):
+        url = reverse("api_post_list")
+        first = self.get(url, limit=2, fields="id,tags").json()
+        second = self.get(url, limit=2, fields="id,tags", cursor=first["next_cursor"])
+        second = second.json()
+
+        self.assertEqual(
+            first["results"] + second["results"],
+            [
+                {"id": self.posts[2].pk, "tags": []},
+                {"id": self.posts[1].pk, "tags": ["python"]},
+                {"id": self.posts[0].pk, "tags": ["django", "python"]},
+            ],
+        )
+        self.assertIsNone(second["next_cursor"])
+        self.assertEqual(
+            [post["id"] for post in self.get(url, tag="django").json()["results"]],
+            [self.posts[0].pk],
+        )
+        self.assertEqual(self.get(url, category="releases").json()["results"], [])
+
+    def test_bad_parameters(self):
+        url = reverse("api_post_list")
+        self.assertEqual(self.get(url, fields="id,password").status_code, 400)
+        self.assertEqual(self.get(url, limit="many").status_code, 400)
+        self.assertEqual(self.get(url, cursor="broken").status_code, 400)
+
+    def test_post_detail(self):
+        post = self.posts[0]
+        response = self.get(
+            reverse("api_post_detail", args=[post.slug]), fields="title,url,tags"
+        )
+        self.assertEqual(
+            response.json(),
+            {
+                "title": post.title,
+                "url": post.get_absolute_url(),
+                "tags": ["django", "python"],
+            },
+        )
+        draft_url = reverse("api_post_detail", args=[self.draft.slug])
+        self.assertEqual(self.get(draft_url).status_code, 404)
+
+    def test_not_modified(self):
+        url = reverse("api_post_detail", args=[self.posts[0].slug])
+        etag = self.get(url).headers["ETag"]
+        response = self.client.get(url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+
+        Post.objects.filter(pk=self.posts[0].pk).update(title="Новое название")
+        response = self.client.get(url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+
+    def test_comment_thread(self):
+        post = self.posts[0]
+        root = Comment.objects.create(post=post, author=self.author, content="Да")
+        reply = Comment.objects.create(
+            post=post, author=self.author, content="Ответ", parent=root
+        )
+        draft = Comment.objects.create(
+            post=post, author=self.author, content="Черновик", status="draft"
+        )
+        Comment.objects.create(
+            post=post, author=self.author, content="Скрыт", parent=draft
+        )
+        url = reverse("api_post_comments", args=[post.slug])
+
+        response = self.get(url, fields="id,parent")
+        self.assertEqual(
+            response.json()["results"],
+            [{"id": root.pk, "parent": None}, {"id": reply.pk, "parent": root.pk}],
+        )
+        draft_url = reverse("api_post_comments", args=[self.draft.slug])
+        self.assertEqual(self.get(draft_url).status_code, 404)
+
+    def test_categories_and_tags(self):
+        self.assertEqual(
+            self.get(reverse("api_category_list"), fields="slug,level").json(),
+            {
+                "results": [
+                    {"slug": "news", "level": 0},
+                    {"slug": "releases", "level": 1},
+                ]
+            },
+        )
+        tags = self.get(reverse("api_tag_list"), fields="slug,posts").json()
+        self.assertEqual(
+            tags["results"],
+            [{"slug": "django", "posts": 1}, {"slug": "python", "posts": 2}],
+        )
+
+
+class LoadtestCommandTest(TestCase):
+    """
+    Нагрузочный тест: подготовка данных и запуск сервера на копиях базы,
+    кэша и статики во временном каталоге
+    """
+
+    def test_prepare(self):
+        out = StringIO()
+        call_command("loadtest", "--prepare", "--users=2", "--seed-posts=3", stdout=out)
+        fixtures = json.loads(out.getvalue())
+        self.assertEqual(len(fixtures["posts"]), 3)
+        self.assertEqual(fixtures["categories"], ["loadtest"])
+        self.assertEqual(len(fixtures["sessions"]), 2)
+        session = import_module(settings.SESSION_ENGINE).SessionStore(
+            fixtures["sessions"][0]
+        )
+        self.assertEqual(
+            session["_auth_user_id"], str(User.objects.get(username="loadtest-0").pk)
+        )
+
+    def test_invalid_arguments(self):
+        for arguments in (["--mix=browse=1,upload=1"], ["--config=wal:JOURNAL"]):
+            with self.subTest(arguments=arguments):
+                with self.assertRaises(CommandError):
+                    call_command("loadtest", *arguments, stdout=StringIO())
+
+
+class LoadtestRunTest(TransactionTestCase):
+    """
+    Сервер нагрузочного теста работает на копиях базы, кэша и статики во
+    временном каталоге (копия базы снимается вне транзакции теста)
+    """
+
+    def test_run_uses_temporary_copies(self):
+        environments = []
+
+        @contextmanager
+        def run_server(kind, workers=1, env=None):
+            environments.append((kind, env))
+            self.assertTrue(os.path.exists(env["DATABASE_NAME"]))
+            yield "http://127.0.0.1:1"
+
+        command = "apps.blog.management.commands.loadtest"
+        with (
+            mock.patch(f"{command}.run_server", run_server),
+            mock.patch(f"{command}.Command.run_prepare", return_value={}),
+            mock.patch(f"{command}.Command.generate_load", return_value=([], 1.0)),
+        ):
+            call_command(
+                "loadtest", "--config=asgi:server=asgi,DEBUG_SQL=1", stdout=StringIO()
+            )
+
+        kind, env = environments[0]
+        self.assertEqual(kind, "asgi")
+        self.assertEqual(env["DJANGO_PROFILE"], "loadtest")
+        self.assertEqual(env["DEBUG_SQL"], "1")
+        workdir = os.path.dirname(env["DATABASE_NAME"])
+        for name in ("DJANGO_CACHE_LOCATION", "DJANGO_STATIC_ROOT"):
+            self.assertEqual(os.path.dirname(env[name]), workdir)
+        self.assertNotEqual(workdir, str(settings.BASE_DIR))
+        self.assertFalse(os.path.exists(workdir))
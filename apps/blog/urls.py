@@ -1,20 +1,79 @@
+from django.conf import settings
 from django.urls import path
 
-from .views import (CommentCreateView, PostByTagListView, PostCreateView,
-                    PostDetailView, PostFromCategory, PostListView,
-                    PostUpdateView, RatingCreateView)
+from .api import (
+    CategoryListApiView,
+    CommentThreadApiView,
+    PostDetailApiView,
+    PostListApiView,
+    TagListApiView,
+)
+from .async_views import AsyncPostDetailView, AsyncPostFromCategory, AsyncPostListView
+from .views import (
+    CommentCreateView,
+    ModerationQueueView,
+    PostByTagListView,
+    PostCreateView,
+    PostDetailView,
+    PostFromCategory,
+    PostListView,
+    PostUpdateView,
+    RatingCreateView,
+    RatingSumsView,
+    TagSuggestView,
+    TitleSuggestView,
+)
+
+# Под ASGI главная, категории и полная запись обслуживаются асинхронными версиями
+if settings.ASYNC_VIEWS:
+    list_view, detail_view, category_view = (
+        AsyncPostListView,
+        AsyncPostDetailView,
+        AsyncPostFromCategory,
+    )
+else:
+    list_view, detail_view, category_view = (
+        PostListView,
+        PostDetailView,
+        PostFromCategory,
+    )
 
 urlpatterns = [
-    path("", PostListView.as_view(), name="home"),
+    path("", list_view.as_view(), name="home"),
     path("post/create/", PostCreateView.as_view(), name="post_create"),
     path("post/<str:slug>/update/", PostUpdateView.as_view(), name="post_update"),
-    path("post/<str:slug>/", PostDetailView.as_view(), name="post_detail"),
+    path("post/<str:slug>/", detail_view.as_view(), name="post_detail"),
     path(
         "post/<int:pk>/comments/create/",
         CommentCreateView.as_view(),
         name="comment_create_view",
     ),
+    path("post/titles/suggest/", TitleSuggestView.as_view(), name="title_suggest"),
+    path("tags/suggest/", TagSuggestView.as_view(), name="tag_suggest"),
     path("post/tags/<str:tag>/", PostByTagListView.as_view(), name="post_by_tags"),
-    path("category/<str:slug>/", PostFromCategory.as_view(), name="post_by_category"),
+    path("category/<str:slug>/", category_view.as_view(), name="post_by_category"),
     path("rating/", RatingCreateView.as_view(), name="rating"),
+    path("rating/sums/", RatingSumsView.as_view(), name="rating_sums"),
+    path(
+        "moderation/comments/",
+        ModerationQueueView.as_view(),
+        name="moderation_queue",
+    ),
+    path("api/v1/posts/", PostListApiView.as_view(), name="api_post_list"),
+    path(
+        "api/v1/posts/<str:slug>/",
+        PostDetailApiView.as_view(),
+        name="api_post_detail",
+    ),
+    path(
+        "api/v1/posts/<str:slug>/comments/",
+        CommentThreadApiView.as_view(),
+        name="api_post_comments",
+    ),
+    path(
+        "api/v1/categories/",
+        CategoryListApiView.as_view(),
+        name="api_category_list",
+    ),
+    path("api/v1/tags/", TagListApiView.as_view(), name="api_tag_list"),
 ]
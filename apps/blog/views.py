@@ -1,18 +1,44 @@
-from django.contrib.auth.mixins import LoginRequiredMixin
+from django.conf import settings
+from django.contrib import messages
+from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMixin
 from django.contrib.messages.views import SuccessMessageMixin
 from django.http import JsonResponse
-from django.shortcuts import redirect, render
+from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse
+from django.utils.cache import patch_cache_control
 from django.views import View
 from django.views.generic import CreateView, DetailView, ListView, UpdateView
 from taggit.models import Tag
 
+from apps.accounts.presence import online_among
+from apps.blog.conditional import post_page_validators, post_validators
 from apps.blog.forms import CommentCreateForm, PostCreateForm, PostUpdateForm
-from apps.blog.models import Category, Comment, Post, Rating
-from apps.services.mixins import AuthorRequiredMixin
-
-
-class PostListView(ListView):
-    queryset = Post.custom.all()
+from apps.blog.models import (
+    ArchivedRating,
+    Category,
+    Comment,
+    Post,
+    Rating,
+    rating_sum_subquery,
+)
+from apps.blog.moderation import MODERATION_STATUSES, set_comments_status
+from apps.blog.rollups import rating_sums
+from apps.blog.suggest import suggest_tags, suggest_titles
+from apps.services.counters import register_post_view
+from apps.services.mixins import (
+    AuthorRequiredMixin,
+    ConditionalGetMixin,
+    FormUserMixin,
+    ReplicaReadMixin,
+    TemplateEngineMixin,
+)
+from apps.services.routers import pin_to_primary
+from apps.services.utils import get_client_ip, make_etag
+from apps.services.versions import get_versions, post_version_key
+
+
+class PostListView(ReplicaReadMixin, TemplateEngineMixin, ListView):
+    queryset = Post.custom.for_list()
     template_name = "blog/post_list.html"
     context_object_name = "posts"
     paginate_by = 2
@@ -23,19 +49,43 @@ class PostListView(ListView):
         return context
 
 
-class PostDetailView(DetailView):
+class PostDetailView(
+    ReplicaReadMixin, TemplateEngineMixin, ConditionalGetMixin, DetailView
+):
     model = Post
     template_name = "blog/post_detail.html"
     context_object_name = "post"
 
+    def get_validators(self):
+        return post_validators(self.request, self.kwargs[self.slug_url_kwarg])
+
+    def get_response_validators(self, response):
+        return post_page_validators(
+            self.request,
+            self.object,
+            response.context_data["comments"],
+            response.context_data["online_user_ids"],
+        )
+
+    def get(self, request, *args, **kwargs):
+        response = super().get(request, *args, **kwargs)
+        register_post_view(request, self.object.pk)
+        return response
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["title"] = self.object.title
-        context["form"] = CommentCreateForm
+        context["form"] = CommentCreateForm(user=self.request.user)
+        # Дерево выбирается один раз: отметки «в сети» - по тем же комментариям,
+        # что выводит шаблон
+        context["comments"] = list(Comment.objects.published_for(self.object))
+        context["online_user_ids"] = online_among(
+            {comment.author_id for comment in context["comments"]}
+        )
         return context
 
 
-class PostCreateView(LoginRequiredMixin, CreateView):
+class PostCreateView(LoginRequiredMixin, FormUserMixin, CreateView):
     """
     Представление: создание материалов на сайте
     """
@@ -56,7 +106,9 @@ class PostCreateView(LoginRequiredMixin, CreateView):
         return super().form_valid(form)
 
 
-class PostUpdateView(AuthorRequiredMixin, SuccessMessageMixin, UpdateView):
+class PostUpdateView(
+    AuthorRequiredMixin, FormUserMixin, SuccessMessageMixin, UpdateView
+):
     """
     Представление: обновления материала на сайте
     """
@@ -79,18 +131,18 @@ class PostUpdateView(AuthorRequiredMixin, SuccessMessageMixin, UpdateView):
         return super().form_valid(form)
 
 
-class PostFromCategory(ListView):
+class PostFromCategory(ReplicaReadMixin, TemplateEngineMixin, ListView):
     template_name = "blog/post_list.html"
     context_object_name = "posts"
     category = None
     paginate_by = 1
 
     def get_queryset(self):
-        self.category = Category.objects.get(slug=self.kwargs["slug"])
-        queryset = Post.custom.filter(category__slug=self.category.slug)
+        self.category = get_object_or_404(Category, slug=self.kwargs["slug"])
+        queryset = Post.custom.for_list().filter(category__slug=self.category.slug)
         if not queryset:
             sub_cat = Category.objects.filter(parent=self.category)
-            queryset = Post.custom.filter(category__in=sub_cat)
+            queryset = Post.custom.for_list().filter(category__in=sub_cat)
         return queryset
 
     def get_context_data(self, **kwargs):
@@ -99,7 +151,7 @@ class PostFromCategory(ListView):
         return context
 
 
-class CommentCreateView(LoginRequiredMixin, CreateView):
+class CommentCreateView(LoginRequiredMixin, FormUserMixin, CreateView):
     model = Comment
     form_class = CommentCreateForm
 
@@ -117,6 +169,7 @@ class CommentCreateView(LoginRequiredMixin, CreateView):
         comment.author = self.request.user
         comment.parent_id = form.cleaned_data.get("parent")
         comment.save()
+        pin_to_primary(self.request)
 
         if self.is_ajax():
             return JsonResponse(
@@ -142,7 +195,7 @@ class CommentCreateView(LoginRequiredMixin, CreateView):
         )
 
 
-class PostByTagListView(ListView):
+class PostByTagListView(ReplicaReadMixin, TemplateEngineMixin, ListView):
     model = Post
     template_name = "blog/post_list.html"
     context_object_name = "posts"
@@ -151,7 +204,11 @@ class PostByTagListView(ListView):
 
     def get_queryset(self):
         self.tag = Tag.objects.get(slug=self.kwargs["tag"])
-        queryset = Post.objects.filter(tags__slug=self.tag.slug)
+        queryset = (
+            Post.objects.filter(tags__slug=self.tag.slug)
+            .defer(*Post.LIST_DEFERRED_FIELDS)
+            .annotate(rating_sum=rating_sum_subquery())
+        )
         return queryset
 
     def get_context_data(self, **kwargs):
@@ -166,20 +223,31 @@ class RatingCreateView(View):
     def post(self, request, *args, **kwargs):
         post_id = request.POST.get("post_id")
         value = int(request.POST.get("value"))
-        x_forwarded_for = request.META.get("HTTP_X_FORWARDED_FOR")
-        ip = (
-            x_forwarded_for.split(",")[0]
-            if x_forwarded_for
-            else request.META.get("REMOTE_ADDR")
-        )
-        ip_address = ip
+        ip_address = get_client_ip(request)
         user = request.user if request.user.is_authenticated else None
 
+        # Голос, перенесённый в архив, учтён в сводках и не меняется
+        archived_vote = (
+            ArchivedRating.objects.filter(post_id=post_id, ip_address=ip_address)
+            .values_list("value", flat=True)
+            .first()
+        )
+        if archived_vote is not None:
+            post = get_object_or_404(Post, pk=post_id)
+            return JsonResponse(
+                {
+                    "status": "archived",
+                    "vote": archived_vote,
+                    "rating_sum": post.get_sum_rating(),
+                }
+            )
+
         rating, created = self.model.objects.get_or_create(
             post_id=post_id,
             ip_address=ip_address,
             defaults={"value": value, "user": user},
         )
+        pin_to_primary(request)
 
         if not created:
             if rating.value == value:
@@ -199,6 +267,95 @@ class RatingCreateView(View):
         )
 
 
+class RatingSumsView(ReplicaReadMixin, ConditionalGetMixin, View):
+    """
+    Суммы оценок и голос текущего посетителя для набора записей
+    (?ids=1,2,3) - пакетное обновление карточек из ratings.js. Ответ
+    перепроверяется браузером при каждом запросе: ETag - версии оценок
+    записей и IP посетителя, без изменений - 304 без запросов к базе
+    """
+
+    def get_post_ids(self):
+        post_ids = dict.fromkeys(
+            int(post_id)
+            for post_id in self.request.GET.get("ids", "").split(",")
+            if post_id
+        )
+        return list(post_ids)[: settings.RATING_SUMS_MAX_IDS]
+
+    def get_validators(self):
+        try:
+            post_ids = self.get_post_ids()
+        except ValueError:
+            return None, None
+        versions = get_versions([post_version_key(post_id) for post_id in post_ids])
+        return make_etag(sorted(versions.items()), get_client_ip(self.request)), None
+
+    def get(self, request, *args, **kwargs):
+        try:
+            post_ids = self.get_post_ids()
+        except ValueError:
+            return JsonResponse({"error": "ids должны быть числами"}, status=400)
+
+        sums = rating_sums(post_ids)
+        ip_address = get_client_ip(request)
+        votes = dict(
+            ArchivedRating.objects.filter(post_id__in=post_ids, ip_address=ip_address)
+            .order_by()
+            .values_list("post_id", "value")
+        )
+        votes.update(
+            Rating.objects.filter(post_id__in=post_ids, ip_address=ip_address)
+            .order_by()
+            .values_list("post_id", "value")
+        )
+        return JsonResponse(
+            {
+                "ratings": {
+                    post_id: {"rating_sum": sums[post_id], "vote": votes.get(post_id)}
+                    for post_id in post_ids
+                }
+            }
+        )
+
+
+class TagSuggestView(View):
+    """
+    Подсказки тегов по началу имени или слова (?q=) из индекса в памяти
+    процесса, самые используемые первыми - без запроса к базе на каждое
+    нажатие клавиши
+    """
+
+    def get(self, request, *args, **kwargs):
+        try:
+            limit = min(int(request.GET.get("limit", 10)), settings.SUGGEST_LIMIT)
+        except ValueError:
+            limit = settings.SUGGEST_LIMIT
+        results = suggest_tags(request.GET.get("q", "")[:100], max(limit, 1))
+        response = JsonResponse({"results": results})
+        patch_cache_control(response, public=True, max_age=60)
+        return response
+
+
+class TitleSuggestView(View):
+    """
+    Подсказки заголовков опубликованных записей по началу слов (?q=),
+    кириллицей или латиницей, из компактного индекса в памяти процесса
+    """
+
+    def get(self, request, *args, **kwargs):
+        try:
+            limit = min(int(request.GET.get("limit", 10)), settings.SUGGEST_LIMIT)
+        except ValueError:
+            limit = settings.SUGGEST_LIMIT
+        results = suggest_titles(request.GET.get("q", "")[:100], max(limit, 1))
+        for result in results:
+            result["url"] = reverse("post_detail", args=[result["slug"]])
+        response = JsonResponse({"results": results})
+        patch_cache_control(response, public=True, max_age=60)
+        return response
+
+
 def tr_handler404(request, exception):
     """
     Обработчик ошибки 404
@@ -242,3 +399,45 @@ def tr_handler403(request, exception):
             "error_message": "Доступ к этой странице ограничен",
         },
     )
+
+
+class ModerationQueueView(PermissionRequiredMixin, ListView):
+    """
+    Представление: очередь модерации комментариев с массовой сменой статуса
+    """
+
+    template_name = "blog/moderation_queue.html"
+    context_object_name = "comments"
+    permission_required = "blog.change_comment"
+    paginate_by = 50
+
+    def get_status(self):
+        status = self.request.GET.get("status", "draft")
+        return status if status in MODERATION_STATUSES else "draft"
+
+    def get_queryset(self):
+        return (
+            Comment.objects.filter(status=self.get_status())
+            .select_related("author", "post")
+            .order_by("-time_create")
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["title"] = "Модерация комментариев"
+        context["status"] = self.get_status()
+        context["statuses"] = Comment.STATUS_OPTIONS
+        return context
+
+    def post(self, request, *args, **kwargs):
+        status = request.POST.get("action")
+        try:
+            ids = [int(comment_id) for comment_id in request.POST.getlist("ids")]
+        except ValueError:
+            messages.error(request, "Неверный список комментариев")
+            return redirect(request.get_full_path())
+        if status in MODERATION_STATUSES and ids:
+            updated = set_comments_status(Comment.objects.filter(pk__in=ids), status)
+            pin_to_primary(request)
+            messages.success(request, f"Изменён статус комментариев: {updated}")
+        return redirect(request.get_full_path())
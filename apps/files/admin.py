@@ -0,0 +1,18 @@
+from django.contrib import admin
+
+from .models import StoredFile
+
+
+@admin.register(StoredFile)
+class StoredFileAdmin(admin.ModelAdmin):
+    """
+    Админ-панель загруженных файлов (только просмотр)
+    """
+
+    list_display = ("name", "size", "refcount", "uploaded")
+    list_filter = ("refcount",)
+    search_fields = ("name", "sha256")
+    readonly_fields = ("sha256", "name", "size", "refcount", "uploaded")
+
+    def has_add_permission(self, request):
+        return False
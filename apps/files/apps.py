@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class FilesConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "apps.files"
+    verbose_name = "Загруженные файлы"
+
+    def ready(self):
+        import apps.files.signals
@@ -0,0 +1,102 @@
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.files.models import StoredFile
+from apps.files.references import (
+    count_references,
+    rebuild_references,
+    recount_all_references,
+)
+from apps.files.storage import ContentAddressedStorage, is_content_addressed
+
+
+class Command(BaseCommand):
+    """
+    Сборка мусора в хранилище по хэшу: пересчёт ссылок по таблице ссылок
+    записей (с --rebuild - заново по тексту и изображениям записей) и
+    удаление файлов без ссылок. Недавние загрузки не удаляются - их ещё
+    может сохранить открытый редактор.
+    """
+
+    help = "Удаляет загруженные файлы, на которые не ссылается ни одна запись"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--grace",
+            type=int,
+            default=settings.FILES_GC_GRACE_HOURS,
+            help="Не удалять файлы, загруженные за последние N часов",
+        )
+        parser.add_argument(
+            "--orphans",
+            action="store_true",
+            help="Удалять и файлы на диске без записи в таблице файлов",
+        )
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Заполнить таблицу ссылок заново по текстам всех записей",
+        )
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **options):
+        if not isinstance(default_storage, ContentAddressedStorage):
+            raise CommandError("Хранилище по умолчанию не адресуется по хэшу")
+        dry_run = options["dry_run"]
+        cutoff = timezone.now() - timedelta(hours=options["grace"])
+
+        if options["rebuild"]:
+            rebuild_references()
+        changed = recount_all_references()
+        self.stdout.write(f"Изменено счётчиков ссылок: {changed}")
+
+        removed = freed = 0
+        candidates = StoredFile.objects.filter(refcount=0, uploaded__lt=cutoff)
+        for stored in candidates.iterator():
+            # Повторная проверка: запись могла сослаться на файл после пересчёта
+            if count_references(stored.name):
+                continue
+            if not dry_run:
+                if not StoredFile.objects.filter(
+                    pk=stored.pk, refcount=0, uploaded__lt=cutoff
+                ).delete()[0]:
+                    continue
+                default_storage.purge(stored.name)
+            removed += 1
+            freed += stored.size
+
+        if options["orphans"]:
+            known = set(StoredFile.objects.values_list("name", flat=True))
+            for name, size in self.orphans(known, cutoff):
+                if not dry_run:
+                    default_storage.purge(name)
+                removed += 1
+                freed += size
+
+        prefix = "К удалению" if dry_run else "Удалено"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{prefix} файлов: {removed} ({freed / 1024 / 1024:.1f} МБ)"
+            )
+        )
+
+    def orphans(self, known, cutoff):
+        """
+        Файлы с именем по хэшу без строки StoredFile (например, запись в
+        таблицу не удалась) старше границы
+        """
+        root = default_storage.location
+        for directory, _, files in os.walk(root):
+            for filename in files:
+                path = os.path.join(directory, filename)
+                name = os.path.relpath(path, root).replace(os.sep, "/")
+                if not is_content_addressed(name) or name in known:
+                    continue
+                stat = os.stat(path)
+                if stat.st_mtime < cutoff.timestamp():
+                    yield name, stat.st_size
@@ -0,0 +1,63 @@
+# Generated by Django 5.1.1 on 2026-10-19 12:33
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="StoredFile",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "sha256",
+                    models.CharField(
+                        max_length=64, unique=True, verbose_name="SHA-256"
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(
+                        max_length=255, unique=True, verbose_name="Имя в хранилище"
+                    ),
+                ),
+                ("size", models.PositiveBigIntegerField(verbose_name="Размер")),
+                (
+                    "refcount",
+                    models.PositiveIntegerField(default=0, verbose_name="Ссылок"),
+                ),
+                (
+                    "uploaded",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now,
+                        verbose_name="Последняя загрузка",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Файл",
+                "verbose_name_plural": "Файлы",
+                "ordering": ("-uploaded",),
+                "indexes": [
+                    models.Index(
+                        fields=["refcount", "uploaded"],
+                        name="files_store_refcoun_c4daec_idx",
+                    )
+                ],
+            },
+        ),
+    ]
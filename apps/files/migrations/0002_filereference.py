@@ -0,0 +1,72 @@
+# Generated by Django 5.1.1 on 2026-10-19 14:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from apps.files.references import file_references
+
+BATCH_SIZE = 500
+
+
+def fill_file_references(apps, schema_editor):
+    """
+    Ссылки существующих записей на файлы (то же, что gc_media --rebuild)
+    """
+    Post = apps.get_model("blog", "Post")
+    FileReference = apps.get_model("files", "FileReference")
+    references = []
+    posts = Post.objects.values_list("pk", "thumbnail", "description", "text")
+    for pk, thumbnail, description, text in posts.iterator(chunk_size=BATCH_SIZE):
+        references += [
+            FileReference(post_id=pk, name=name)
+            for name in file_references(thumbnail, description, text)
+        ]
+    FileReference.objects.bulk_create(references, batch_size=BATCH_SIZE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0015_archivedrating"),
+        ("files", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FileReference",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(max_length=255, verbose_name="Имя в хранилище"),
+                ),
+                (
+                    "post",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="file_references",
+                        to="blog.post",
+                        verbose_name="Запись",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Ссылка на файл",
+                "verbose_name_plural": "Ссылки на файлы",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("name", "post"), name="files_filereference_name_post"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(fill_file_references, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,54 @@
+from django.db import models
+from django.utils import timezone
+
+
+class StoredFile(models.Model):
+    """
+    Загруженный файл, сохранённый по хэшу содержимого: одинаковые загрузки
+    хранятся один раз, refcount - число записей, ссылающихся на файл
+    """
+
+    sha256 = models.CharField(verbose_name="SHA-256", max_length=64, unique=True)
+    name = models.CharField(verbose_name="Имя в хранилище", max_length=255, unique=True)
+    size = models.PositiveBigIntegerField(verbose_name="Размер")
+    refcount = models.PositiveIntegerField(verbose_name="Ссылок", default=0)
+    uploaded = models.DateTimeField(
+        verbose_name="Последняя загрузка", default=timezone.now
+    )
+
+    class Meta:
+        ordering = ("-uploaded",)
+        indexes = [models.Index(fields=["refcount", "uploaded"])]
+        verbose_name = "Файл"
+        verbose_name_plural = "Файлы"
+
+    def __str__(self):
+        return self.name
+
+
+class FileReference(models.Model):
+    """
+    Ссылка записи на файл хранилища (изображение записи или картинка в
+    тексте): обновляется при сохранении записи, счётчик ссылок файла -
+    число строк с его именем
+    """
+
+    post = models.ForeignKey(
+        "blog.Post",
+        verbose_name="Запись",
+        on_delete=models.CASCADE,
+        related_name="file_references",
+    )
+    name = models.CharField(verbose_name="Имя в хранилище", max_length=255)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["name", "post"], name="files_filereference_name_post"
+            )
+        ]
+        verbose_name = "Ссылка на файл"
+        verbose_name_plural = "Ссылки на файлы"
+
+    def __str__(self):
+        return self.name
@@ -0,0 +1,100 @@
+import re
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+
+from apps.blog.models import Post
+
+from .models import FileReference, StoredFile
+from .storage import is_content_addressed
+
+
+def _media_url_re():
+    return re.compile(re.escape(settings.MEDIA_URL) + r"([\w./-]+)")
+
+
+def file_references(thumbnail="", *html):
+    """
+    Имена файлов хранилища, на которые ссылаются изображение записи и
+    HTML из CKEditor (ссылки вида MEDIA_URL + имя)
+    """
+    names = set()
+    if thumbnail and is_content_addressed(str(thumbnail)):
+        names.add(str(thumbnail))
+    media_url_re = _media_url_re()
+    for source in html:
+        for name in media_url_re.findall(source or ""):
+            if is_content_addressed(name):
+                names.add(name)
+    return names
+
+
+def post_references(post):
+    return file_references(post.thumbnail.name, post.description, post.text)
+
+
+def count_references(name):
+    return FileReference.objects.filter(name=name).count()
+
+
+def update_post_references(post, added, removed):
+    """
+    Изменение таблицы ссылок записи на разницу наборов файлов
+    """
+    if removed:
+        FileReference.objects.filter(post=post, name__in=removed).delete()
+    FileReference.objects.bulk_create(
+        [FileReference(post=post, name=name) for name in added],
+        ignore_conflicts=True,
+    )
+
+
+def refresh_refcounts(names):
+    """
+    Пересчёт ссылок на изменившийся набор файлов (после сохранения или
+    удаления записи) по таблице ссылок
+    """
+    for name in names:
+        StoredFile.objects.filter(name=name).update(refcount=count_references(name))
+
+
+def rebuild_references(batch_size=500):
+    """
+    Заполнение таблицы ссылок заново по текстам и изображениям всех записей
+    (после изменений в обход сигналов, например queryset.update())
+    """
+    references = []
+    posts = Post.objects.values_list("pk", "thumbnail", "description", "text")
+    for pk, thumbnail, description, text in posts.iterator(chunk_size=batch_size):
+        references += [
+            FileReference(post_id=pk, name=name)
+            for name in file_references(thumbnail, description, text)
+        ]
+    with transaction.atomic():
+        FileReference.objects.all().delete()
+        FileReference.objects.bulk_create(references, batch_size=batch_size)
+
+
+def recount_all_references(batch_size=500):
+    """
+    Пересчёт всех счётчиков по таблице ссылок одним агрегирующим запросом;
+    возвращает число изменённых счётчиков
+    """
+    counts = dict(
+        FileReference.objects.order_by()
+        .values("name")
+        .annotate(count=Count("pk"))
+        .values_list("name", "count")
+    )
+
+    changed = []
+    for stored in StoredFile.objects.only("name", "refcount").iterator(
+        chunk_size=batch_size
+    ):
+        refcount = counts.get(stored.name, 0)
+        if stored.refcount != refcount:
+            stored.refcount = refcount
+            changed.append(stored)
+    StoredFile.objects.bulk_update(changed, ["refcount"], batch_size=batch_size)
+    return len(changed)
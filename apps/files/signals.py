@@ -0,0 +1,34 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.blog.models import Post
+
+from .references import (
+    file_references,
+    post_references,
+    refresh_refcounts,
+    update_post_references,
+)
+
+
+@receiver(post_save, sender=Post)
+def update_refcounts_on_save(sender, instance, **kwargs):
+    """
+    Ссылки записи и счётчики меняются только для файлов, ссылки на которые
+    появились или исчезли
+    """
+    loaded = file_references(*getattr(instance, "_loaded_files_sources", ()))
+    current = post_references(instance)
+    update_post_references(instance, current - loaded, loaded - current)
+    refresh_refcounts(loaded ^ current)
+    instance._loaded_files_sources = (
+        instance.thumbnail.name,
+        instance.description,
+        instance.text,
+    )
+
+
+@receiver(post_delete, sender=Post)
+def update_refcounts_on_delete(sender, instance, **kwargs):
+    # Строки ссылок удалены каскадом вместе с записью
+    refresh_refcounts(post_references(instance))
@@ -0,0 +1,98 @@
+import hashlib
+import os
+import re
+
+from django.core.files.storage import FileSystemStorage
+from django.db import IntegrityError
+from django.utils import timezone
+
+# Имя файла в хранилище: <каталог загрузки>/<ab>/<cd>/<sha256><расширение>
+CONTENT_ADDRESSED_NAME_RE = re.compile(
+    r"^(?:[\w.-]+/)?[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}(?:\.[\w]+)?$"
+)
+
+
+def is_content_addressed(name):
+    """
+    Содержимое файла с таким именем никогда не меняется - URL можно
+    кэшировать навсегда
+    """
+    return bool(CONTENT_ADDRESSED_NAME_RE.match(name))
+
+
+def content_hash(content):
+    sha256 = hashlib.sha256()
+    content.seek(0)
+    for chunk in content.chunks():
+        sha256.update(chunk)
+    content.seek(0)
+    return sha256.hexdigest()
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Хранилище загрузок по хэшу содержимого: имя файла не зависит от имени
+    загрузки, категории или записи, повторная загрузка того же файла не
+    создаёт копию. Файлы удаляет только команда gc_media, когда на них
+    не осталось ссылок.
+    """
+
+    def hashed_name(self, name, sha256):
+        directory = name.replace("\\", "/").partition("/")[0] if "/" in name else ""
+        extension = os.path.splitext(name)[1].lower()
+        parts = [directory, sha256[:2], sha256[2:4], sha256 + extension]
+        return "/".join(part for part in parts if part)
+
+    def _save(self, name, content):
+        from .models import StoredFile
+
+        sha256 = content_hash(content)
+        stored = StoredFile.objects.filter(sha256=sha256).first()
+        if stored is not None and super().exists(stored.name):
+            # Повторная загрузка продлевает защиту от сборщика мусора
+            StoredFile.objects.filter(pk=stored.pk).update(uploaded=timezone.now())
+            return stored.name
+
+        hashed_name = self.hashed_name(name, sha256)
+        if not super().exists(hashed_name):
+            try:
+                super()._save(hashed_name, content)
+            except FileExistsError:
+                # Тот же файл успели записать параллельно - содержимое то же
+                if not super().exists(hashed_name):
+                    raise
+        try:
+            StoredFile.objects.update_or_create(
+                sha256=sha256,
+                defaults={
+                    "name": hashed_name,
+                    "size": content.size,
+                    "uploaded": timezone.now(),
+                },
+            )
+        except IntegrityError:
+            pass
+        return hashed_name
+
+    def get_available_name(self, name, max_length=None):
+        # Итоговое имя определяется содержимым в _save(). FileSystemStorage
+        # при гонке запрашивает новое имя для уже занятого имени по хэшу -
+        # другого имени у этого содержимого нет, _save() обрабатывает ошибку
+        if is_content_addressed(name) and super().exists(name):
+            raise FileExistsError(name)
+        return name
+
+    def delete(self, name):
+        """
+        Файл может использоваться другими записями - удаление откладывается
+        до сборки мусора (gc_media); файлы вне адресации по хэшу (например,
+        загруженные до перехода) удаляются как обычно
+        """
+        if not is_content_addressed(name):
+            super().delete(name)
+
+    def purge(self, name):
+        """
+        Физическое удаление файла (только для сборщика мусора)
+        """
+        super().delete(name)
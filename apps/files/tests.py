@@ -0,0 +1,135 @@
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apps.blog.models import Category, Post
+
+from .models import FileReference, StoredFile
+
+
+class ContentAddressedStorageTest(TestCase):
+    """
+    Дедупликация загрузок, счётчики ссылок и сборка мусора gc_media
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user("author")
+        cls.category = Category.objects.create(title="Файлы", slug="files")
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def upload(self, data, name="images/photo.png"):
+        return default_storage.save(name, ContentFile(data))
+
+    def create_post(self, *names):
+        images = "".join(f'<img src="{settings.MEDIA_URL}{name}">' for name in names)
+        return Post.objects.create(
+            title="Запись с изображениями",
+            description="Описание",
+            text=f"<p>Текст</p>{images}",
+            category=self.category,
+            author=self.author,
+        )
+
+    def test_identical_uploads_are_stored_once(self):
+        first = self.upload(b"image", "images/first.png")
+        second = self.upload(b"image", "images/second.png")
+        other = self.upload(b"other image", "images/first.png")
+
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+        self.assertEqual(StoredFile.objects.count(), 2)
+        self.assertTrue(default_storage.exists(first))
+
+    def test_concurrent_write_of_same_content(self):
+        name = self.upload(b"image")
+        StoredFile.objects.all().delete()
+        exists = FileSystemStorage.exists
+        calls = []
+
+        def exists_after_race(storage, path):
+            # Первая проверка не видит файл, записанный «параллельным» запросом
+            calls.append(path)
+            return len(calls) > 1 and exists(storage, path)
+
+        with mock.patch.object(FileSystemStorage, "exists", exists_after_race):
+            self.assertEqual(self.upload(b"image"), name)
+        self.assertEqual(StoredFile.objects.get().name, name)
+        self.assertEqual(
+            os.listdir(os.path.dirname(default_storage.path(name))),
+            [os.path.basename(name)],
+        )
+
+    def test_refcounts_follow_posts(self):
+        name = self.upload(b"image")
+        first = self.create_post(name)
+        second = self.create_post(name)
+        self.assertEqual(StoredFile.objects.get(name=name).refcount, 2)
+
+        second.text = "<p>Без изображений</p>"
+        second.save()
+        self.assertEqual(StoredFile.objects.get(name=name).refcount, 1)
+
+        self.assertEqual(
+            list(FileReference.objects.values_list("post", "name")),
+            [(first.pk, name)],
+        )
+
+        first.delete()
+        self.assertEqual(StoredFile.objects.get(name=name).refcount, 0)
+        self.assertFalse(FileReference.objects.exists())
+        # Удаление записи не удаляет файл - это делает только gc_media
+        self.assertTrue(default_storage.exists(name))
+
+    def test_gc_media_removes_unreferenced_files(self):
+        referenced = self.upload(b"referenced")
+        unreferenced = self.upload(b"unreferenced")
+        recent = self.upload(b"recent")
+        self.create_post(referenced)
+        StoredFile.objects.exclude(name=recent).update(
+            uploaded=timezone.now() - timedelta(days=2)
+        )
+        # Счётчик устарел: gc_media пересчитывает ссылки перед удалением
+        StoredFile.objects.filter(name=referenced).update(refcount=0)
+
+        call_command("gc_media", "--dry-run", stdout=StringIO())
+        self.assertTrue(default_storage.exists(unreferenced))
+
+        call_command("gc_media", stdout=StringIO())
+        self.assertEqual(
+            set(StoredFile.objects.values_list("name", flat=True)),
+            {referenced, recent},
+        )
+        self.assertFalse(default_storage.exists(unreferenced))
+        self.assertTrue(default_storage.exists(referenced))
+        self.assertTrue(default_storage.exists(recent))
+
+    def test_gc_media_rebuilds_references(self):
+        name = self.upload(b"image")
+        post = self.create_post()
+        StoredFile.objects.update(uploaded=timezone.now() - timedelta(days=2))
+        # Текст изменён в обход сигналов: таблица ссылок об этом не знает
+        Post.objects.filter(pk=post.pk).update(
+            text=f'<img src="{settings.MEDIA_URL}{name}">'
+        )
+
+        call_command("gc_media", "--rebuild", stdout=StringIO())
+        self.assertEqual(StoredFile.objects.get(name=name).refcount, 1)
+        self.assertTrue(default_storage.exists(name))
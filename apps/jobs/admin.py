@@ -0,0 +1,24 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    """
+    Админ-панель фоновых задач
+    """
+
+    list_display = ("task", "status", "attempts", "run_at", "finished_at", "create")
+    list_filter = ("status", "task")
+    search_fields = ("task", "idempotency_key")
+    readonly_fields = ("last_error",)
+    actions = ("requeue",)
+
+    @admin.action(description="Повторить выбранные задачи")
+    def requeue(self, request, queryset):
+        updated = queryset.exclude(status__in=Job.ACTIVE_STATUSES).update(
+            status="queued", attempts=0, run_at=timezone.now(), finished_at=None
+        )
+        self.message_user(request, f"Возвращено в очередь: {updated}")
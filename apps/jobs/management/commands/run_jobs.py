@@ -0,0 +1,88 @@
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from apps.jobs.queue import claim_jobs, execute_job, requeue_stale_jobs
+
+
+class Command(BaseCommand):
+    """
+    Обработчик очереди фоновых задач из базы данных (пул потоков или процессов)
+    """
+
+    help = "Выполняет фоновые задачи из очереди в базе данных"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=settings.JOBS_WORKERS,
+            help="Количество параллельно выполняемых задач",
+        )
+        parser.add_argument(
+            "--processes",
+            action="store_true",
+            help="Пул процессов вместо пула потоков (для задач, нагружающих CPU)",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Выполнить готовые задачи и завершить работу",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=settings.JOBS_POLL_INTERVAL,
+            help="Интервал опроса очереди в секундах",
+        )
+
+    def handle(self, *args, **options):
+        workers = options["workers"]
+        if options["processes"]:
+            # Дочерние процессы не должны наследовать открытые соединения
+            connections.close_all()
+            executor = ProcessPoolExecutor(max_workers=workers)
+        else:
+            executor = ThreadPoolExecutor(max_workers=workers)
+
+        stats = {"done": 0, "queued": 0, "failed": 0, "deleted": 0}
+        running = set()
+        try:
+            with executor:
+                while True:
+                    requeue_stale_jobs()
+                    free = workers - len(running)
+                    if free > 0:
+                        for job_id in claim_jobs(free):
+                            running.add(executor.submit(execute_job, job_id))
+
+                    if not running:
+                        if options["once"]:
+                            break
+                        time.sleep(options["interval"])
+                        continue
+
+                    finished, running = wait(
+                        running,
+                        timeout=options["interval"],
+                        return_when=FIRST_COMPLETED,
+                    )
+                    for future in finished:
+                        stats[future.result()] += 1
+        except KeyboardInterrupt:
+            self.stdout.write("Остановка обработчика, ожидание текущих задач")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Выполнено: {stats['done']}, отложено для повтора: {stats['queued']}, "
+                f"с ошибкой: {stats['failed']}, удалено до запуска: {stats['deleted']}"
+            )
+        )
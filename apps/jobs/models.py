@@ -0,0 +1,52 @@
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """
+    Модель фоновой задачи: очередь хранится в базе данных, без брокера
+    """
+
+    STATUS_OPTIONS = (
+        ("queued", "В очереди"),
+        ("running", "Выполняется"),
+        ("done", "Выполнена"),
+        ("failed", "Ошибка"),
+    )
+    ACTIVE_STATUSES = ("queued", "running")
+
+    task = models.CharField(verbose_name="Задача", max_length=255)
+    payload = models.JSONField(verbose_name="Аргументы", default=dict, blank=True)
+    status = models.CharField(
+        verbose_name="Статус", choices=STATUS_OPTIONS, default="queued", max_length=10
+    )
+    idempotency_key = models.CharField(
+        verbose_name="Ключ идемпотентности", max_length=255, blank=True, null=True
+    )
+    attempts = models.PositiveSmallIntegerField(verbose_name="Попыток", default=0)
+    max_attempts = models.PositiveSmallIntegerField(
+        verbose_name="Максимум попыток", default=5
+    )
+    run_at = models.DateTimeField(verbose_name="Запуск не ранее", default=timezone.now)
+    locked_at = models.DateTimeField(verbose_name="Взята в работу", null=True)
+    finished_at = models.DateTimeField(verbose_name="Завершена", null=True)
+    last_error = models.TextField(verbose_name="Последняя ошибка", blank=True)
+    create = models.DateTimeField(verbose_name="Время добавления", auto_now_add=True)
+
+    class Meta:
+        ordering = ("-create",)
+        indexes = [models.Index(fields=["status", "run_at"])]
+        constraints = [
+            # Пока задача с ключом ждёт или выполняется, дубликат не создаётся
+            models.UniqueConstraint(
+                fields=["idempotency_key"],
+                condition=Q(status__in=("queued", "running")),
+                name="jobs_job_active_idempotency_key",
+            )
+        ]
+        verbose_name = "Фоновая задача"
+        verbose_name_plural = "Фоновые задачи"
+
+    def __str__(self):
+        return f"{self.task} #{self.pk}"
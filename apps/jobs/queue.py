@@ -0,0 +1,127 @@
+import random
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+_registry = {}
+
+
+def task(func):
+    """
+    Регистрация функции как фоновой задачи под именем <модуль>.<функция>
+    """
+    func.task_name = f"{func.__module__}.{func.__name__}"
+    _registry[func.task_name] = func
+    return func
+
+
+def get_task(name):
+    try:
+        return _registry[name]
+    except KeyError:
+        raise LookupError(f"Задача не зарегистрирована: {name}")
+
+
+def enqueue(func, *, key=None, delay=0, max_attempts=None, **payload):
+    """
+    Постановка задачи в очередь. Внутри транзакции задача сохраняется вместе
+    с изменениями данных и не появится в очереди при откате. Если задача с
+    тем же ключом идемпотентности ещё не выполнена, новая не создаётся.
+    """
+    job = Job(
+        task=func.task_name,
+        payload=payload,
+        idempotency_key=key,
+        run_at=timezone.now() + timedelta(seconds=delay),
+        max_attempts=max_attempts or settings.JOBS_MAX_ATTEMPTS,
+    )
+    try:
+        with transaction.atomic():
+            job.save()
+    except IntegrityError:
+        return Job.objects.filter(
+            idempotency_key=key, status__in=Job.ACTIVE_STATUSES
+        ).first()
+    return job
+
+
+def requeue_stale_jobs():
+    """
+    Возврат в очередь задач, зависших в работе (например, после падения
+    процесса-обработчика)
+    """
+    stale_before = timezone.now() - timedelta(seconds=settings.JOBS_LOCK_TIMEOUT)
+    return Job.objects.filter(status="running", locked_at__lt=stale_before).update(
+        status="queued", locked_at=None
+    )
+
+
+def claim_jobs(limit):
+    """
+    Захват готовых к запуску задач. Захват - условный UPDATE по статусу,
+    поэтому несколько обработчиков не возьмут одну задачу и без блокировок
+    строк (SELECT FOR UPDATE в SQLite нет)
+    """
+    now = timezone.now()
+    candidates = Job.objects.filter(status="queued", run_at__lte=now).order_by("run_at")
+    claimed = []
+    for job_id in candidates.values_list("pk", flat=True)[:limit]:
+        if Job.objects.filter(pk=job_id, status="queued").update(
+            status="running", locked_at=now, attempts=F("attempts") + 1
+        ):
+            claimed.append(job_id)
+    return claimed
+
+
+def retry_delay(attempt):
+    """
+    Экспоненциальная задержка повтора со случайным разбросом
+    """
+    delay = min(
+        settings.JOBS_RETRY_BACKOFF * 2 ** (attempt - 1),
+        settings.JOBS_RETRY_BACKOFF_MAX,
+    )
+    return delay * random.uniform(0.5, 1.0)
+
+
+def execute_job(job_id):
+    """
+    Выполнение захваченной задачи: успех, повтор с задержкой или ошибка
+    после исчерпания попыток. Возвращает итоговый статус задачи или
+    "deleted", если задачу удалили после захвата (например, из админ-панели).
+    """
+    close_old_connections()
+    try:
+        job = Job.objects.filter(pk=job_id).first()
+        if job is None:
+            return "deleted"
+        try:
+            get_task(job.task)(**job.payload)
+        except Exception:
+            error = traceback.format_exc()
+            if job.attempts >= job.max_attempts:
+                status, run_at = "failed", job.run_at
+            else:
+                status = "queued"
+                run_at = timezone.now() + timedelta(seconds=retry_delay(job.attempts))
+            Job.objects.filter(pk=job_id).update(
+                status=status,
+                run_at=run_at,
+                locked_at=None,
+                last_error=error,
+                finished_at=timezone.now() if status == "failed" else None,
+            )
+            return status
+
+        Job.objects.filter(pk=job_id).update(
+            status="done", locked_at=None, finished_at=timezone.now()
+        )
+        return "done"
+    finally:
+        close_old_connections()
@@ -0,0 +1,113 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core import mail
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apps.accounts.tasks import send_welcome_email
+
+from .models import Job
+from .queue import claim_jobs, enqueue, execute_job, requeue_stale_jobs, task
+
+calls = []
+
+
+@task
+def record_call(value):
+    calls.append(value)
+
+
+@task
+def always_fail():
+    raise RuntimeError("Задача не выполнена")
+
+
+@override_settings(JOBS_RETRY_BACKOFF=10, JOBS_LOCK_TIMEOUT=60)
+class JobQueueTest(TestCase):
+    """
+    Очередь задач в базе данных: постановка без дубликатов, захват, повторы
+    с задержкой и возврат зависших задач
+    """
+
+    def setUp(self):
+        calls.clear()
+
+    def run_job(self, job):
+        self.assertEqual(claim_jobs(10), [job.pk])
+        return execute_job(job.pk)
+
+    def test_enqueue_with_idempotency_key(self):
+        first = enqueue(record_call, key="report", value=1)
+        self.assertEqual(enqueue(record_call, key="report", value=2), first)
+        self.assertEqual(Job.objects.count(), 1)
+
+        self.assertEqual(self.run_job(first), "done")
+        self.assertEqual(calls, [1])
+        # Выполненная задача не мешает поставить новую с тем же ключом
+        self.assertNotEqual(enqueue(record_call, key="report", value=3), first)
+        self.assertEqual(Job.objects.count(), 2)
+
+    def test_enqueue_is_rolled_back_with_transaction(self):
+        try:
+            with transaction.atomic():
+                enqueue(record_call, value=1)
+                raise ValueError
+        except ValueError:
+            pass
+        self.assertFalse(Job.objects.exists())
+
+    def test_claim_ready_jobs_once(self):
+        ready = enqueue(record_call, value=1)
+        enqueue(record_call, delay=60, value=2)
+
+        self.assertEqual(claim_jobs(10), [ready.pk])
+        self.assertEqual(claim_jobs(10), [])
+        ready.refresh_from_db()
+        self.assertEqual((ready.status, ready.attempts), ("running", 1))
+
+    def test_failed_job_is_retried_then_failed(self):
+        job = enqueue(always_fail, max_attempts=2)
+
+        started = timezone.now()
+        self.assertEqual(self.run_job(job), "queued")
+        job.refresh_from_db()
+        self.assertIn("RuntimeError", job.last_error)
+        self.assertGreaterEqual(job.run_at, started + timedelta(seconds=5))
+        self.assertIsNone(job.locked_at)
+
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        self.assertEqual(self.run_job(job), "failed")
+        job.refresh_from_db()
+        self.assertEqual(job.attempts, 2)
+        self.assertIsNotNone(job.finished_at)
+        self.assertEqual(claim_jobs(10), [])
+
+    def test_deleted_job_is_skipped(self):
+        job = enqueue(record_call, value=1)
+        self.assertEqual(claim_jobs(10), [job.pk])
+        job.delete()
+
+        self.assertEqual(execute_job(job.pk), "deleted")
+        self.assertEqual(calls, [])
+
+    def test_stale_running_jobs_are_requeued(self):
+        stale = enqueue(record_call, value=1)
+        claim_jobs(10)
+        fresh = enqueue(record_call, value=2)
+        claim_jobs(10)
+        Job.objects.filter(pk=stale.pk).update(
+            locked_at=timezone.now() - timedelta(seconds=120)
+        )
+
+        self.assertEqual(requeue_stale_jobs(), 1)
+        self.assertEqual(Job.objects.get(pk=stale.pk).status, "queued")
+        self.assertEqual(Job.objects.get(pk=fresh.pk).status, "running")
+
+    def test_welcome_email_task(self):
+        user = User.objects.create_user("reader", email="reader@example.com")
+        job = Job.objects.get(task=send_welcome_email.task_name)
+
+        self.assertEqual(self.run_job(job), "done")
+        self.assertEqual(mail.outbox[0].to, [user.email])
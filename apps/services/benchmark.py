@@ -0,0 +1,188 @@
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from importlib.util import find_spec
+from statistics import quantiles
+
+from django.conf import settings
+from django.core.management.base import CommandError
+
+
+def get_free_port(host="127.0.0.1"):
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+
+def server_command(kind, host, port, workers=1, threads=8):
+    """
+    Команда запуска приложения под WSGI (gunicorn, либо встроенный
+    многопоточный сервер Django) или ASGI (uvicorn) сервером
+    """
+    if kind == "wsgi":
+        if find_spec("gunicorn"):
+            return [
+                sys.executable,
+                "-m",
+                "gunicorn",
+                "django_site_blog_cbv.wsgi:application",
+                f"--bind={host}:{port}",
+                f"--workers={workers}",
+                f"--threads={threads}",
+                "--preload",
+                "--log-level=warning",
+            ]
+        return [
+            sys.executable,
+            "manage.py",
+            "runserver",
+            "--noreload",
+            "--skip-checks",
+            f"{host}:{port}",
+        ]
+    if kind == "asgi":
+        if not find_spec("uvicorn"):
+            raise CommandError("Для запуска под ASGI установите uvicorn")
+        return [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "django_site_blog_cbv.asgi:application",
+            f"--host={host}",
+            f"--port={port}",
+            f"--workers={workers}",
+            "--log-level=warning",
+            "--no-access-log",
+        ]
+    raise CommandError(f"Неизвестный тип сервера: {kind}")
+
+
+@contextmanager
+def run_server(kind, host="127.0.0.1", port=None, workers=1, env=None, timeout=30):
+    """
+    Запуск приложения на localhost в отдельном процессе на время измерений
+    """
+    port = port or get_free_port(host)
+    process_env = {**os.environ, "DJANGO_ASYNC_VIEWS": "1" if kind == "asgi" else "0"}
+    process_env.update(env or {})
+    process = subprocess.Popen(
+        server_command(kind, host, port, workers),
+        cwd=settings.BASE_DIR,
+        env=process_env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            if process.poll() is not None:
+                raise CommandError(f"Сервер {kind} завершился при запуске")
+            try:
+                socket.create_connection((host, port), timeout=1).close()
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise CommandError(f"Сервер {kind} не запустился за {timeout} с")
+                time.sleep(0.2)
+        yield f"http://{host}:{port}"
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+async def slow_request(host, port, path, chunk_delay=0.0, chunks=1, read_size=4096):
+    """
+    HTTP запрос «медленного» клиента: заголовки отправляются частями с
+    паузами, ответ читается небольшими порциями. Возвращает код ответа.
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        payload = (
+            f"GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n"
+        ).encode()
+        step = max(1, -(-len(payload) // chunks))
+        for start in range(0, len(payload), step):
+            writer.write(payload[start : start + step])
+            await writer.drain()
+            if chunk_delay:
+                await asyncio.sleep(chunk_delay)
+
+        status_line = await reader.readline()
+        while await reader.read(read_size):
+            if chunk_delay:
+                await asyncio.sleep(chunk_delay)
+        return int(status_line.split()[1]) if status_line else 0
+    finally:
+        writer.close()
+
+
+class RateLimiter:
+    """
+    Ограничение частоты запросов из нескольких потоков: не более rate
+    запросов в секунду (0 - без ограничения), запросы равномерно разнесены
+    """
+
+    def __init__(self, rate):
+        self.interval = 1 / rate if rate else 0
+        self.next_slot = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def summarize(latencies, errors, elapsed):
+    """
+    Пропускная способность, доля ошибок и перцентили задержек (в мс)
+    """
+    total = len(latencies) + errors
+    summary = {
+        "requests": total,
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "error_rate": errors / total if total else 0.0,
+        "p50": 0.0,
+        "p95": 0.0,
+        "p99": 0.0,
+    }
+    if len(latencies) > 1:
+        cuts = quantiles([latency * 1000 for latency in latencies], n=100)
+        summary.update(p50=cuts[49], p95=cuts[94], p99=cuts[98])
+    elif latencies:
+        summary.update(p50=latencies[0] * 1000, p95=latencies[0] * 1000)
+        summary["p99"] = summary["p95"]
+    return summary
+
+
+# Границы корзин гистограммы задержек, мс
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+def histogram(latencies, bounds=LATENCY_BUCKETS_MS):
+    """
+    Распределение задержек по корзинам: [(подпись, количество), ...]
+    """
+    counts = [0] * (len(bounds) + 1)
+    for latency in latencies:
+        milliseconds = latency * 1000
+        index = next(
+            (i for i, bound in enumerate(bounds) if milliseconds <= bound),
+            len(bounds),
+        )
+        counts[index] += 1
+    labels = [f"<= {bound} мс" for bound in bounds] + [f"> {bounds[-1]} мс"]
+    return list(zip(labels, counts))
@@ -0,0 +1,153 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.utils.module_loading import import_string
+from django_recaptcha.client import RecaptchaResponse
+from django_recaptcha.fields import ReCaptchaField
+
+from apps.services.trust import is_trusted, note_submission, record_throttle_hit
+
+logger = logging.getLogger(__name__)
+
+
+class VerifierPool:
+    """
+    Потоки проверки ответов: ожидание ограничено RECAPTCHA_VERIFY_TIMEOUT
+    целиком, включая DNS и установку соединения. Очереди нет - если все
+    RECAPTCHA_VERIFY_WORKERS потоков заняты зависшими запросами, submit()
+    сразу возвращает None
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _start(self):
+        workers = settings.RECAPTCHA_VERIFY_WORKERS
+        self._slots = threading.BoundedSemaphore(workers)
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="recaptcha"
+        )
+
+    def submit(self, func, **kwargs):
+        with self._lock:
+            if self._executor is None:
+                self._start()
+        if not self._slots.acquire(blocking=False):
+            return None
+
+        def run():
+            try:
+                return func(**kwargs)
+            finally:
+                self._slots.release()
+
+        try:
+            return self._executor.submit(run)
+        except RuntimeError:
+            self._slots.release()
+            raise
+
+
+_verify_pool = VerifierPool()
+
+
+def stub_verify(recaptcha_response, private_key, remoteip):
+    """
+    Локальная проверка без обращения к Google (разработка, тесты):
+    верен любой ответ, кроме "invalid"; RECAPTCHA_STUB_DELAY имитирует
+    медленный сервис
+    """
+    if settings.RECAPTCHA_STUB_DELAY:
+        time.sleep(settings.RECAPTCHA_STUB_DELAY)
+    is_valid = recaptcha_response != "invalid"
+    return RecaptchaResponse(
+        is_valid=is_valid, error_codes=[] if is_valid else ["invalid-input-response"]
+    )
+
+
+class CaptchaField(ReCaptchaField):
+    """
+    ReCaptchaField с проверкой через RECAPTCHA_VERIFIER и жёстким таймаутом:
+    при превышении RECAPTCHA_VERIFY_TIMEOUT или занятых потоках проверки
+    ответ принимается или отклоняется по настройке
+    RECAPTCHA_TIMEOUT_FALLBACK. accept под нагрузкой означает пропуск
+    проверки - им можно обойти капчу, завалив сервис отправками
+    """
+
+    default_error_messages = {
+        "captcha_timeout": "Сервис проверки reCAPTCHA не ответил, попробуйте ещё раз.",
+    }
+
+    def validate(self, value):
+        # Проверка ReCaptchaField ждёт client.submit без общего ограничения
+        # времени - из неё берётся только проверка заполненности поля
+        super(ReCaptchaField, self).validate(value)
+        future = _verify_pool.submit(
+            import_string(settings.RECAPTCHA_VERIFIER),
+            recaptcha_response=value,
+            private_key=self.private_key,
+            remoteip=self.get_remote_ip(),
+        )
+        if future is None:
+            logger.warning(
+                "ReCAPTCHA verification pool is full (%s workers), fallback: %s",
+                settings.RECAPTCHA_VERIFY_WORKERS,
+                settings.RECAPTCHA_TIMEOUT_FALLBACK,
+            )
+            return self.timeout_fallback()
+        try:
+            result = future.result(timeout=settings.RECAPTCHA_VERIFY_TIMEOUT)
+        except TimeoutError:
+            logger.warning(
+                "ReCAPTCHA verification timed out after %ss, fallback: %s",
+                settings.RECAPTCHA_VERIFY_TIMEOUT,
+                settings.RECAPTCHA_TIMEOUT_FALLBACK,
+            )
+            return self.timeout_fallback()
+        except OSError:
+            # Сетевые ошибки и HTTPError
+            raise ValidationError(
+                self.error_messages["captcha_error"], code="captcha_error"
+            )
+        if not result.is_valid:
+            logger.warning("ReCAPTCHA validation failed due to: %s", result.error_codes)
+            raise ValidationError(
+                self.error_messages["captcha_invalid"], code="captcha_invalid"
+            )
+
+    def timeout_fallback(self):
+        if settings.RECAPTCHA_TIMEOUT_FALLBACK != "accept":
+            raise ValidationError(
+                self.error_messages["captcha_timeout"], code="captcha_timeout"
+            )
+
+
+class OptionalCaptchaMixin:
+    """
+    Форма с reCAPTCHA, проверку которой можно отключить настройкой
+    RECAPTCHA_DISABLED (локальные нагрузочные тесты без внешних запросов).
+    Доверенному пользователю (kwarg user, см. apps.services.trust) капча
+    не показывается; неверная капча и частые отправки снижают доверие
+    """
+
+    captcha_field = "recaptcha"
+
+    def __init__(self, *args, user=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.user = user
+        if settings.RECAPTCHA_DISABLED or is_trusted(user):
+            self.fields.pop(self.captcha_field, None)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if self.user is not None and self.user.is_authenticated:
+            if self.has_error(self.captcha_field):
+                record_throttle_hit(self.user)
+            else:
+                note_submission(self.user)
+        return cleaned_data
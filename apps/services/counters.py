@@ -0,0 +1,157 @@
+import time
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, F, Value, When
+
+from apps.blog.models import Post
+from apps.jobs.queue import enqueue
+from apps.services.utils import get_client_ip
+
+FLUSH_LOCK_KEY = "post-views-flush-lock"
+FLUSH_JOB_KEY = "flush-post-views"
+FLUSHING_KEY = "post-views-flushing"
+FLUSHED_BUCKET_KEY = "post-views-flushed-bucket"
+# Записи с новыми просмотрами отмечаются в корзинах по PENDING_BUCKET_SECONDS
+# без общего изменяемого множества: отметка записи в корзине - add, слот
+# корзины - incr счётчика. Сбрасываются только закрытые корзины.
+# add и incr атомарны только в Redis и Memcached (проверка blog.W001): в
+# FileBasedCache incr - чтение и запись файла, и одновременные просмотры
+# могут потеряться, поэтому там счётчик приблизительный
+PENDING_BUCKET_SECONDS = 10
+# Корзины старше (если сброс долго не запускался) не просматриваются
+PENDING_MAX_BUCKETS = 24 * 60 * 60 // PENDING_BUCKET_SECONDS
+# Служебные запросы (прогрев кэша командой warm_cache) просмотрами не считаются
+WARMUP_HEADER = "X-Cache-Warmup"
+
+
+def _counter_key(post_id):
+    return f"post-views-{post_id}"
+
+
+def _visitor_key(request, post_id):
+    """
+    Ключ дедупликации просмотра: сессия + IP адрес посетителя
+    """
+    visitor = f"{request.session.session_key or ''}:{get_client_ip(request)}"
+    return f"post-view-seen-{post_id}-{md5(visitor.encode()).hexdigest()}"
+
+
+def _current_bucket():
+    return int(time.time() // PENDING_BUCKET_SECONDS)
+
+
+def _pending_key(bucket, post_id):
+    return f"post-views-pending-{bucket}-{post_id}"
+
+
+def _bucket_count_key(bucket):
+    return f"post-views-pending-{bucket}-count"
+
+
+def _slot_key(bucket, slot):
+    return f"post-views-pending-{bucket}-slot-{slot}"
+
+
+def _mark_pending(post_id):
+    """
+    Отметка записи с новыми просмотрами в корзине текущего интервала
+    """
+    bucket = _current_bucket()
+    if cache.add(_pending_key(bucket, post_id), True, None):
+        cache.add(_bucket_count_key(bucket), 0, None)
+        slot = cache.incr(_bucket_count_key(bucket))
+        cache.set(_slot_key(bucket, slot), post_id, None)
+
+
+def register_post_view(request, post_id):
+    """
+    Учёт просмотра записи в кэше без записи в базу данных.
+    Повторные просмотры от той же сессии и IP в пределах окна не учитываются.
+    Раз в интервал сброса в очередь ставится задача flush_post_views - сам
+    сброс выполняет обработчик очереди (или cron), а не запрос страницы.
+    """
+    if request.headers.get(WARMUP_HEADER):
+        return False
+    if not cache.add(
+        _visitor_key(request, post_id), True, settings.POST_VIEWS_DEDUP_WINDOW
+    ):
+        return False
+
+    key = _counter_key(post_id)
+    cache.add(key, 0, None)
+    cache.incr(key)
+    _mark_pending(post_id)
+
+    if cache.add(FLUSH_LOCK_KEY, True, settings.POST_VIEWS_FLUSH_INTERVAL):
+        from apps.blog.tasks import flush_post_views as flush_job
+
+        enqueue(flush_job, key=FLUSH_JOB_KEY)
+    return True
+
+
+def _pending_post_ids():
+    """
+    Записи из закрытых корзин, ещё не сброшенных в базу (текущая и
+    предыдущая корзины могут ещё заполняться). Возвращает id записей,
+    ключи корзин и номер последней корзины
+    """
+    last = _current_bucket() - 2
+    first = max(cache.get(FLUSHED_BUCKET_KEY, 0) + 1, last - PENDING_MAX_BUCKETS)
+    count_keys = {
+        _bucket_count_key(bucket): bucket for bucket in range(first, last + 1)
+    }
+    counts = cache.get_many(count_keys)
+    slot_keys = {
+        _slot_key(count_keys[key], slot): count_keys[key]
+        for key, count in counts.items()
+        for slot in range(1, count + 1)
+    }
+    slots = cache.get_many(slot_keys)
+    bucket_keys = [*counts, *slot_keys]
+    bucket_keys += [
+        _pending_key(slot_keys[key], post_id) for key, post_id in slots.items()
+    ]
+    return set(slots.values()), bucket_keys, last
+
+
+def flush_post_views():
+    """
+    Сброс накопленных в кэше просмотров в базу данных одним UPDATE запросом
+    (читает до PENDING_MAX_BUCKETS корзин, поэтому вызывается из задачи
+    очереди или команды flush_post_views). Возвращает количество обновлённых
+    записей.
+    """
+    # Два одновременных сброса вычли бы одни и те же просмотры дважды
+    if not cache.add(FLUSHING_KEY, True, settings.POST_VIEWS_FLUSH_INTERVAL):
+        return 0
+    try:
+        post_ids, bucket_keys, last_bucket = _pending_post_ids()
+        keys = {_counter_key(post_id): post_id for post_id in post_ids}
+        counters = cache.get_many(keys)
+        increments = {keys[key]: value for key, value in counters.items() if value}
+
+        # Вычитаем только прочитанное значение: просмотры, пришедшие во время
+        # сброса, остаются в счётчике, запись отмечена в открытой корзине
+        for key, value in counters.items():
+            if value:
+                cache.decr(key, value)
+
+        updated = 0
+        if increments:
+            updated = Post.objects.filter(pk__in=increments).update(
+                views=F("views")
+                + Case(
+                    *[
+                        When(pk=pk, then=Value(count))
+                        for pk, count in increments.items()
+                    ],
+                    default=Value(0),
+                )
+            )
+        cache.set(FLUSHED_BUCKET_KEY, last_bucket, None)
+        cache.delete_many(bucket_keys)
+        return updated
+    finally:
+        cache.delete(FLUSHING_KEY)
@@ -0,0 +1,104 @@
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import InvalidCacheBackendError, caches
+from django.core.cache.utils import make_template_fragment_key
+from django.template import engines
+from django.templatetags.static import static
+from django.urls import reverse
+from django.utils.formats import localize
+from django.utils.html import conditional_escape, escape
+from django.utils.safestring import mark_safe
+from django.utils.timezone import template_localtime
+from jinja2 import Environment, pass_context
+from markupsafe import Markup
+from mptt.templatetags.mptt_tags import cache_tree_children
+
+
+def template_engine(template_name):
+    """
+    Движок шаблона: из JINJA2_TEMPLATES - Jinja2 (templates/jinja2/),
+    остальные - шаблоны Django
+    """
+    return "jinja2" if template_name in settings.JINJA2_TEMPLATES else "django"
+
+
+def render_fragment(template_name, context):
+    """
+    Вложенный шаблон выбранным для него движком, context - словарь
+    контекста страницы (процессоры контекста уже применены)
+    """
+    engine = engines[template_engine(template_name)]
+    return mark_safe(engine.get_template(template_name).render(context))
+
+
+def render_value(value):
+    """
+    Вывод значения как в шаблонах Django: даты в текущем часовом поясе,
+    локализованные даты и числа, экранирование в стиле django.utils.html
+    (&#x27; и &quot;), чтобы вывод совпадал посимвольно
+    """
+    if type(value) is str:
+        return escape(value)
+    return conditional_escape(localize(template_localtime(value)))
+
+
+def url(name, *args, **kwargs):
+    return reverse(name, args=args or None, kwargs=kwargs or None)
+
+
+def full_tree_for_model(model):
+    """
+    Аналог {% full_tree_for_model app.Model as var %} из mptt_tags
+    """
+    return apps.get_model(*model.split("."))._tree_manager.all()
+
+
+def tree_children(node):
+    """
+    Дочерние узлы дерева, подготовленного cache_tree_children (как
+    {{ children }} в {% recursetree %}), без построения QuerySet на каждый
+    узел, как в MPTTModel.get_children()
+    """
+    if hasattr(node, "_cached_children"):
+        return node._cached_children
+    return node.get_children()
+
+
+def cache_fragment(fragment_name, vary_on, timeout, caller):
+    """
+    Аналог {% cache %}: {% call cache_fragment("name", [var], timeout) %}...
+    {% endcall %}, с тем же ключом и кэшем, что и у тега Django
+    """
+    try:
+        fragment_cache = caches["template_fragments"]
+    except InvalidCacheBackendError:
+        fragment_cache = caches["default"]
+    key = make_template_fragment_key(fragment_name, vary_on)
+    value = fragment_cache.get(key)
+    if value is None:
+        value = caller()
+        fragment_cache.set(key, value, timeout)
+    return Markup(value)
+
+
+@pass_context
+def hot_include(context, template_name):
+    """
+    {{ hot_include("sidebar.html") }}: вложенный шаблон движком из
+    JINJA2_TEMPLATES, с контекстом текущей страницы
+    """
+    return Markup(render_fragment(template_name, context.get_all()))
+
+
+def environment(**options):
+    env = Environment(**{"finalize": render_value, **options})
+    env.globals.update(
+        static=static,
+        url=url,
+        full_tree_for_model=full_tree_for_model,
+        cache_tree_children=cache_tree_children,
+        tree_children=tree_children,
+        cache_fragment=cache_fragment,
+        hot_include=hot_include,
+    )
+    return env
@@ -1,6 +1,13 @@
+from asgiref.sync import sync_to_async
 from django.contrib import messages
 from django.contrib.auth.mixins import AccessMixin
+from django.contrib.messages import get_messages
 from django.shortcuts import redirect
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from apps.services.jinja2 import template_engine
+from apps.services.routers import is_pinned_to_primary, use_replica
 
 
 class AuthorRequiredMixin(AccessMixin):
@@ -13,3 +20,152 @@ class AuthorRequiredMixin(AccessMixin):
                 messages.info(request, "Изменение статьи доступно только автору!")
                 return redirect("home")
         return super().dispatch(request, *args, **kwargs)
+
+
+class FormUserMixin:
+    """
+    Передача текущего пользователя в форму: от него зависит, показывается
+    ли reCAPTCHA (apps.services.captcha.OptionalCaptchaMixin)
+    """
+
+    def get_form_kwargs(self):
+        return {**super().get_form_kwargs(), "user": self.request.user}
+
+
+class TemplateEngineMixin:
+    """
+    Движок шаблона представления по настройке JINJA2_TEMPLATES: шаблон из
+    списка рендерится Jinja2, остальные - Django
+    """
+
+    @property
+    def template_engine(self):
+        return template_engine(self.template_name)
+
+
+class ReplicaReadMixin:
+    """
+    Представление только на чтение: запросы к моделям блога (включая
+    рендеринг шаблона) уходят в реплику, если сессия не закреплена
+    за основной базой после недавней записи
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if self.view_is_async:
+            return self._replica_adispatch(request, *args, **kwargs)
+        with use_replica(not is_pinned_to_primary(request)):
+            response = super().dispatch(request, *args, **kwargs)
+            if callable(getattr(response, "render", None)):
+                response.render()
+            return response
+
+    async def _replica_adispatch(self, request, *args, **kwargs):
+        pinned = await sync_to_async(is_pinned_to_primary)(request)
+        with use_replica(not pinned):
+            response = await super().dispatch(request, *args, **kwargs)
+            if callable(getattr(response, "render", None)):
+                await sync_to_async(response.render)()
+            return response
+
+
+class ConditionalGetMixin:
+    """
+    Условные GET запросы: если клиент прислал If-None-Match или
+    If-Modified-Since, валидаторы (ETag, Last-Modified) считаются дешёвым
+    запросом в get_validators(), и при совпадении клиент получает 304 до
+    выборки объекта и рендеринга шаблона. Без этих заголовков валидаторы
+    считаются только для ответа 200 после рендеринга -
+    get_response_validators() может взять их из уже выбранных данных
+    """
+
+    def get_validators(self):
+        """
+        Возвращает пару (etag, last_modified: datetime | None)
+        """
+        raise NotImplementedError
+
+    def get_response_validators(self, response):
+        """
+        Валидаторы готового ответа, по умолчанию - get_validators()
+        """
+        return self.get_validators()
+
+    def dispatch(self, request, *args, **kwargs):
+        if self.view_is_async:
+            return self._conditional_adispatch(request, *args, **kwargs)
+        if not self._is_conditional(request):
+            return super().dispatch(request, *args, **kwargs)
+        if not self._has_preconditions(request):
+            response = super().dispatch(request, *args, **kwargs)
+            return self._set_response_validators(response)
+        etag, last_modified = self.get_validators()
+        response = self._not_modified(request, etag, last_modified)
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+        return self._set_validators(response, etag, last_modified)
+
+    async def _conditional_adispatch(self, request, *args, **kwargs):
+        if not self._is_conditional(request):
+            return await super().dispatch(request, *args, **kwargs)
+        if not self._has_preconditions(request):
+            response = await super().dispatch(request, *args, **kwargs)
+            if getattr(response, "is_rendered", True):
+                if response.status_code == 200:
+                    etag, last_modified = await sync_to_async(
+                        self.get_response_validators
+                    )(response)
+                    self._set_validators(response, etag, last_modified)
+                return response
+            # Шаблон рендерится обработчиком в потоке, там же и валидаторы
+            return self._set_response_validators(response)
+        etag, last_modified = await sync_to_async(self.get_validators)()
+        response = self._not_modified(request, etag, last_modified)
+        if response is None:
+            response = await super().dispatch(request, *args, **kwargs)
+        return self._set_validators(response, etag, last_modified)
+
+    def _set_response_validators(self, response):
+        if response.status_code != 200:
+            return response
+
+        def set_validators(response):
+            etag, last_modified = self.get_response_validators(response)
+            return self._set_validators(response, etag, last_modified)
+
+        if getattr(response, "is_rendered", True):
+            return set_validators(response)
+        response.add_post_render_callback(set_validators)
+        return response
+
+    @staticmethod
+    def _has_preconditions(request):
+        return (
+            "If-None-Match" in request.headers or "If-Modified-Since" in request.headers
+        )
+
+    @staticmethod
+    def _is_conditional(request):
+        # Страница с непоказанными сообщениями не может считаться неизменной
+        return request.method in ("GET", "HEAD") and not get_messages(request)
+
+    @staticmethod
+    def _not_modified(request, etag, last_modified):
+        return get_conditional_response(
+            request,
+            etag=etag,
+            last_modified=int(last_modified.timestamp()) if last_modified else None,
+        )
+
+    @staticmethod
+    def _set_validators(response, etag, last_modified):
+        if response.status_code in (200, 304):
+            if etag:
+                response.headers.setdefault("ETag", etag)
+            if last_modified:
+                response.headers.setdefault(
+                    "Last-Modified", http_date(last_modified.timestamp())
+                )
+            # Страница может измениться в любой момент: браузер обязан
+            # перепроверять её, но может использовать валидаторы
+            response.headers.setdefault("Cache-Control", "private, no-cache")
+        return response
@@ -0,0 +1,161 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from dataclasses import dataclass
+from datetime import datetime
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import DateTimeField, IntegerField, Max, Q, QuerySet
+from django.db.models.fields import AutoFieldMixin
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+
+@dataclass
+class KeysetPage:
+    """
+    Страница keyset пагинации: элементы и курсор следующей страницы
+    """
+
+    items: list
+    next_cursor: str | None
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+
+def encode_cursor(values):
+    payload = json.dumps(
+        [
+            value.isoformat() if isinstance(value, datetime) else value
+            for value in values
+        ]
+    ).encode()
+    return urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor, model, names):
+    """
+    Разбор курсора в значения полей сортировки; ValueError для повреждённого
+    или не подходящего к сортировке курсора
+    """
+    try:
+        payload = urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(payload)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Неверный курсор: {cursor}") from e
+    if not isinstance(values, list) or len(values) != len(names):
+        raise ValueError(f"Неверный курсор: {cursor}")
+
+    decoded = []
+    for name, value in zip(names, values):
+        field = model._meta.pk if name == "pk" else model._meta.get_field(name)
+        if isinstance(field, DateTimeField):
+            value = parse_datetime(value) if isinstance(value, str) else None
+        elif isinstance(field, IntegerField) and not isinstance(value, int):
+            value = None
+        if value is None:
+            raise ValueError(f"Неверный курсор: {cursor}")
+        decoded.append(value)
+    return decoded
+
+
+def _get(item, name):
+    return item[name] if isinstance(item, dict) else getattr(item, name)
+
+
+def keyset_paginate(queryset, cursor=None, page_size=10, ordering=("-create", "-pk")):
+    """
+    Пагинация по ключу сортировки (последнее поле должно быть уникальным)
+    без OFFSET и COUNT: стоимость выборки не зависит от номера страницы при
+    наличии индекса по этим полям. Элементы - объекты или строки values(),
+    содержащие поля сортировки.
+    """
+    names = [name.lstrip("-") for name in ordering]
+    queryset = queryset.order_by(*ordering)
+    if cursor:
+        values = decode_cursor(cursor, queryset.model, names)
+        after = Q()
+        for index, name in enumerate(names):
+            lookup = "lt" if ordering[index].startswith("-") else "gt"
+            after |= Q(
+                **dict(zip(names[:index], values[:index])),
+                **{f"{name}__{lookup}": values[index]},
+            )
+        queryset = queryset.filter(after)
+    items = list(queryset[: page_size + 1])
+    next_cursor = None
+    if len(items) > page_size:
+        items = items[:page_size]
+        next_cursor = encode_cursor([_get(items[-1], name) for name in names])
+    return KeysetPage(items=items, next_cursor=next_cursor)
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Пагинатор админ-панели для больших таблиц: для выборки без фильтров
+    количество строк оценивается (статистика PostgreSQL или максимальный
+    первичный ключ) вместо полного COUNT(*), с фильтрами - точный подсчёт.
+
+    Оценка может быть больше числа строк (после удалений): неполная страница
+    уточняет количество, а для страницы за концом таблицы выполняется
+    точный подсчёт и возвращается последняя страница
+    """
+
+    is_estimate = False
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not isinstance(queryset, QuerySet) or queryset.query.where:
+            return super().count
+        estimate = estimate_table_rows(queryset.model, queryset.db)
+        if estimate is None:
+            return super().count
+        self.is_estimate = True
+        return estimate
+
+    def page(self, number):
+        page = super().page(number)
+        if not self.is_estimate or len(page) >= self.per_page:
+            return page
+        if len(page) or page.number == 1:
+            # Найден конец таблицы - количество известно без COUNT(*)
+            self._set_count((page.number - 1) * self.per_page + len(page))
+            return page
+        self._set_count(super().count)
+        return super().page(min(page.number, self.num_pages))
+
+    def get_elided_page_range(self, number=1, **kwargs):
+        # Запрошенная страница могла оказаться за уточнённым концом таблицы
+        if isinstance(number, int):
+            number = min(number, self.num_pages)
+        return super().get_elided_page_range(number, **kwargs)
+
+    def _set_count(self, count):
+        self.count = count
+        self.is_estimate = False
+        self.__dict__.pop("num_pages", None)
+        self.__dict__.pop("page_range", None)
+
+
+def estimate_table_rows(model, using="default"):
+    connection = connections[using]
+    table = model._meta.db_table
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE relname = %s", [table]
+            )
+            row = cursor.fetchone()
+        if row and row[0] > 0:
+            return row[0]
+        return None
+    if isinstance(model._meta.pk, AutoFieldMixin):
+        # Значение автоинкремента не меньше числа строк и берётся из индекса
+        return (
+            model._default_manager.using(using).aggregate(max_pk=Max("pk"))["max_pk"]
+            or 0
+        )
+    return None
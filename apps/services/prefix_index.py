@@ -0,0 +1,341 @@
+import heapq
+import threading
+import time
+from array import array
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.utils import timezone
+from pytils.translit import slugify
+
+from apps.services.versions import bump_versions, get_versions
+
+# Символ больше любого в нормализованном тексте: верхняя граница диапазона
+PREFIX_END = "\U0010ffff"
+
+
+def normalize(text):
+    """
+    Ключ сравнения: без учёта регистра, ё/е и лишних пробелов
+    """
+    return " ".join(text.casefold().replace("ё", "е").split())
+
+
+class PrefixIndex:
+    """
+    Индекс для подсказок по префиксу в памяти процесса: отсортированный
+    список ключей (поиск диапазона бинарным поиском) и вес каждой записи
+    для ранжирования. С words=True ищется и по началу любого слова.
+    Результаты коротких префиксов запоминаются до следующего изменения.
+    """
+
+    memo_prefix_length = 2
+
+    def __init__(self, items=(), words=False):
+        self.words = words
+        self._keys = []
+        self._entries = {}
+        self._memo = {}
+        self._lock = threading.Lock()
+        for key, text, weight, payload in items:
+            self._entries[key] = (normalize(text), weight, payload)
+        self._keys = sorted(
+            (suffix, key)
+            for key, (text, _, _) in self._entries.items()
+            for suffix in self._suffixes(text)
+        )
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _suffixes(self, text):
+        if not self.words:
+            return [text]
+        return [
+            text[index:]
+            for index, char in enumerate(text)
+            if index == 0 or (text[index - 1] == " " and char != " ")
+        ]
+
+    def set(self, key, text, weight=0, payload=None):
+        """
+        Добавление или изменение записи (инкрементально, без перестроения)
+        """
+        with self._lock:
+            self._remove(key)
+            normalized = normalize(text)
+            self._entries[key] = (normalized, weight, payload)
+            for suffix in self._suffixes(normalized):
+                insort(self._keys, (suffix, key))
+            self._memo = {}
+
+    def remove(self, key):
+        with self._lock:
+            self._remove(key)
+            self._memo = {}
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for suffix in self._suffixes(entry[0]):
+            position = bisect_left(self._keys, (suffix, key))
+            if position < len(self._keys) and self._keys[position] == (suffix, key):
+                del self._keys[position]
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        return entry and (entry[1], entry[2])
+
+    def search(self, prefix, limit=10):
+        """
+        Записи с ключом, начинающимся с prefix, по убыванию веса
+        """
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        memo_key = (prefix, limit)
+        if memo_key in self._memo:
+            return self._memo[memo_key]
+
+        keys, entries = self._keys, self._entries
+        start = bisect_left(keys, (prefix,))
+        end = bisect_left(keys, (prefix + PREFIX_END,), start)
+        matched = {key for _, key in keys[start:end]}
+        best = heapq.nsmallest(
+            limit,
+            (key for key in matched if key in entries),
+            key=lambda key: (-entries[key][1], entries[key][0]),
+        )
+        results = [entries[key][2] for key in best]
+        if len(prefix) <= self.memo_prefix_length:
+            self._memo[memo_key] = results
+        return results
+
+    def exact(self, text):
+        """
+        Запись с тем же нормализованным текстом (для слияния почти
+        одинаковых значений), с наибольшим весом
+        """
+        normalized = normalize(text)
+        start = bisect_left(self._keys, (normalized,))
+        best = None
+        for suffix, key in self._keys[start:]:
+            if suffix != normalized:
+                break
+            entry = self._entries[key]
+            if entry[0] == normalized and (best is None or entry[1] > best[1]):
+                best = entry
+        return best and best[2]
+
+
+def translit_words(text):
+    """
+    Слова текста в транслитерации pytils (как в slug записей): запросы
+    кириллицей и латиницей приводятся к одному виду
+    """
+    return [word for word in slugify(text).split("-") if word]
+
+
+class WordPostings:
+    """
+    Неизменяемая основа WordPrefixIndex: записи в порядке ранга (лучшие
+    первыми) в параллельных списках, словарь слов - в отсортированном
+    списке, номера записей слова - в общем массиве array со смещениями
+    """
+
+    def __init__(self, items=()):
+        self.keys = array("q")
+        self.titles = []
+        self.slugs = []
+        postings = {}
+        for ordinal, (key, title, slug) in enumerate(items):
+            self.keys.append(key)
+            self.titles.append(title)
+            self.slugs.append(slug)
+            for word in set(slug.split("-")):
+                postings.setdefault(word, array("I")).append(ordinal)
+        self.vocabulary = sorted(postings)
+        self.offsets = array("I", [0])
+        self.postings = array("I")
+        for word in self.vocabulary:
+            self.postings.extend(postings[word])
+            self.offsets.append(len(self.postings))
+        self.scan_threshold = max(1000, len(self.keys) // 50)
+        self.sorted_keys = array("q", sorted(self.keys))
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, key):
+        position = bisect_left(self.sorted_keys, key)
+        return position < len(self.sorted_keys) and self.sorted_keys[position] == key
+
+    def candidates(self, tokens):
+        """
+        Номера записей в порядке ранга: по словам самого редкого префикса,
+        а для частых префиксов - последовательный просмотр (совпадения
+        плотные, первые limit находятся быстро)
+        """
+        ranges = []
+        for token, _ in tokens:
+            start = bisect_left(self.vocabulary, token)
+            end = bisect_left(self.vocabulary, token + PREFIX_END, start)
+            ranges.append(self.offsets[end] - self.offsets[start])
+            if not ranges[-1]:
+                return []
+            ranges[-1] = (ranges[-1], start, end)
+        size, start, end = min(ranges)
+        if size > self.scan_threshold:
+            return range(len(self.keys))
+        return sorted(set(self.postings[self.offsets[start] : self.offsets[end]]))
+
+
+class WordPrefixIndex:
+    """
+    Компактный индекс подсказок по началу слов: неизменяемая основа
+    (WordPostings) и небольшая дельта изменений поверх неё. Слова записи
+    берутся из её slug (уже транслитерирован).
+
+    Изменения не правят дельту на месте, а заменяют её копией под
+    блокировкой, поэтому чтение берёт под той же блокировкой только
+    ссылки на основу, дельту и удалённые и дальше идёт без неё.
+    """
+
+    max_delta = 1000
+
+    def __init__(self, items=()):
+        self.base = WordPostings(items)
+        self.delta = {}
+        self.removed = frozenset()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        base, delta, removed = self._snapshot()
+        return len(base) - len(removed) + len(delta)
+
+    def _snapshot(self):
+        with self._lock:
+            return self.base, self.delta, self.removed
+
+    def put(self, key, title, slug):
+        """
+        Новая или изменённая запись (в подсказках - первой)
+        """
+        with self._lock:
+            delta = {k: v for k, v in self.delta.items() if k != key}
+            delta[key] = (title, slug)
+            self._replace(key, delta)
+
+    def discard(self, key):
+        with self._lock:
+            delta = {k: v for k, v in self.delta.items() if k != key}
+            self._replace(key, delta)
+
+    def _replace(self, key, delta):
+        # В removed - только скрытые записи основы
+        removed = self.removed | {key} if key in self.base else self.removed
+        if len(delta) + len(removed) > self.max_delta:
+            self.base = WordPostings(self._items(self.base, delta, removed))
+            delta, removed = {}, frozenset()
+        self.delta, self.removed = delta, removed
+
+    def items(self):
+        return self._items(*self._snapshot())
+
+    @staticmethod
+    def _items(base, delta, removed):
+        for key, (title, slug) in reversed(delta.items()):
+            yield key, title, slug
+        for key, title, slug in zip(base.keys, base.titles, base.slugs):
+            if key not in removed:
+                yield key, title, slug
+
+    @staticmethod
+    def _matches(slug, tokens):
+        """
+        Каждый токен - начало какого-либо слова slug
+        """
+        for token, inner in tokens:
+            if not slug.startswith(token) and inner not in slug:
+                return False
+        return True
+
+    def search(self, query, limit=10):
+        tokens = [(token, "-" + token) for token in translit_words(query)]
+        if not tokens:
+            return []
+        base, delta, removed = self._snapshot()
+        results = []
+        for key, (title, slug) in reversed(delta.items()):
+            if self._matches(slug, tokens):
+                results.append({"id": key, "title": title, "slug": slug})
+                if len(results) >= limit:
+                    return results
+        keys, slugs = base.keys, base.slugs
+        for ordinal in base.candidates(tokens):
+            key = keys[ordinal]
+            if key in removed or not self._matches(slugs[ordinal], tokens):
+                continue
+            results.append(
+                {"id": key, "title": base.titles[ordinal], "slug": slugs[ordinal]}
+            )
+            if len(results) >= limit:
+                break
+        return results
+
+
+class VersionedIndex:
+    """
+    Индекс процесса с версией в кэше: изменения в этом процессе вносятся
+    в индекс инкрементально, изменения других процессов (новая версия)
+    приводят к перестроению или, если задан sync(index, since), к догрузке
+    изменений с момента прошлой синхронизации. Версия проверяется не чаще
+    раза в SUGGEST_INDEX_CHECK_INTERVAL секунд, индекс не старше
+    SUGGEST_INDEX_MAX_AGE.
+    """
+
+    def __init__(self, version_key, loader, sync=None):
+        self.version_key = version_key
+        self.loader = loader
+        self.sync = sync
+        self.index = None
+        self.version = None
+        self.synced_at = None
+        self.checked_at = self.built_at = 0
+        self._lock = threading.Lock()
+
+    def get(self):
+        now = time.monotonic()
+        if self.index is not None and (
+            now - self.checked_at < settings.SUGGEST_INDEX_CHECK_INTERVAL
+        ):
+            return self.index
+        with self._lock:
+            self.checked_at = now
+            version = get_versions([self.version_key])[self.version_key]
+            started_at = timezone.now()
+            if (
+                self.index is None
+                or now - self.built_at > settings.SUGGEST_INDEX_MAX_AGE
+                or (version != self.version and self.sync is None)
+            ):
+                self.index = self.loader()
+                self.built_at = now
+            elif version != self.version:
+                self.sync(self.index, self.synced_at)
+            self.version, self.synced_at = version, started_at
+        return self.index
+
+    def apply(self, change, bump=True):
+        """
+        Изменение индекса этого процесса и отметка новой версии для остальных
+        (bump=False, если версию уже меняет другой обработчик)
+        """
+        if self.index is not None:
+            change(self.index)
+        if bump:
+            self.version = bump_versions([self.version_key])
+
+    def reset(self):
+        self.index = None
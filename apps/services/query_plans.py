@@ -0,0 +1,168 @@
+import json
+import re
+from dataclasses import dataclass
+
+from django.apps import apps
+from django.db import connections
+
+from apps.services.pagination import estimate_table_rows
+
+# Таблица и её псевдоним в SQL Django: "blog_post" U0, "blog_post" AS T3
+TABLE_ALIAS_RE = re.compile(r'"(\w+)"\s+(?:AS\s+)?"?([A-Z]\d+)"?')
+SQLITE_SCAN_RE = re.compile(r"^SCAN (\w+)$")
+SQLITE_TABLE_RE = re.compile(r"^(?:SCAN|SEARCH) (\w+)")
+
+
+@dataclass
+class PlanProblem:
+    """
+    Найденная проблема плана: полный просмотр таблицы или сортировка во
+    временном B-дереве, rows - оценка числа строк таблицы
+    """
+
+    kind: str
+    table: str
+    rows: int
+    detail: str
+
+
+def table_rows(table, using="default", cache=None):
+    """
+    Оценка размера таблицы по модели (без COUNT(*) для больших таблиц)
+    """
+    cache = {} if cache is None else cache
+    if table not in cache:
+        models = {model._meta.db_table: model for model in apps.get_models()}
+        model = models.get(table)
+        rows = estimate_table_rows(model, using) if model else None
+        if rows is None and model is not None:
+            rows = model._default_manager.using(using).count()
+        cache[table] = rows or 0
+    return cache[table]
+
+
+def explain(queryset):
+    """
+    План запроса: строки (id, parent, detail) для SQLite или JSON план
+    для PostgreSQL
+    """
+    connection = connections[queryset.db]
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+            return sql, [(row[0], row[1], row[3]) for row in cursor.fetchall()]
+        if connection.vendor == "postgresql":
+            cursor.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+            plan = cursor.fetchone()[0]
+            return sql, json.loads(plan) if isinstance(plan, str) else plan
+    raise NotImplementedError(f"EXPLAIN для {connection.vendor} не поддерживается")
+
+
+def sqlite_problems(sql, plan, min_rows, using="default"):
+    aliases = {alias: table for table, alias in TABLE_ALIAS_RE.findall(sql)}
+    sizes = {}
+    tables_by_parent = {}
+    for _, parent, detail in plan:
+        match = SQLITE_TABLE_RE.match(detail)
+        if match:
+            table = aliases.get(match.group(1), match.group(1))
+            tables_by_parent.setdefault(parent, []).append(table)
+
+    problems = []
+    for _, parent, detail in plan:
+        match = SQLITE_SCAN_RE.match(detail)
+        if match:
+            table = aliases.get(match.group(1), match.group(1))
+            rows = table_rows(table, using, sizes)
+            if rows >= min_rows:
+                problems.append(PlanProblem("full_scan", table, rows, detail))
+        elif detail.startswith("USE TEMP B-TREE"):
+            # Сортировка относится к таблицам того же уровня плана
+            tables = tables_by_parent.get(parent, [])
+            table = max(
+                tables, key=lambda name: table_rows(name, using, sizes), default=""
+            )
+            rows = table_rows(table, using, sizes) if table else 0
+            if rows >= min_rows:
+                problems.append(PlanProblem("temp_sort", table, rows, detail))
+    return problems
+
+
+def postgresql_problems(plan, min_rows):
+    problems = []
+
+    def visit(node):
+        if node["Node Type"] == "Seq Scan" and node.get("Plan Rows", 0) >= min_rows:
+            problems.append(
+                PlanProblem(
+                    "full_scan",
+                    node["Relation Name"],
+                    node["Plan Rows"],
+                    f"Seq Scan on {node['Relation Name']}",
+                )
+            )
+        if node["Node Type"] == "Sort" and node.get("Plan Rows", 0) >= min_rows:
+            problems.append(
+                PlanProblem(
+                    "temp_sort",
+                    "",
+                    node["Plan Rows"],
+                    f"Sort by {', '.join(node.get('Sort Key', []))}",
+                )
+            )
+        for child in node.get("Plans", []):
+            visit(child)
+
+    visit(plan[0]["Plan"])
+    return problems
+
+
+def plan_problems(queryset, min_rows=0):
+    """
+    Проблемы плана запроса на таблицах не меньше min_rows строк;
+    возвращает (sql, план, проблемы)
+    """
+    sql, plan = explain(queryset)
+    if connections[queryset.db].vendor == "sqlite":
+        problems = sqlite_problems(sql, plan, min_rows, queryset.db)
+    else:
+        problems = postgresql_problems(plan, min_rows)
+    return sql, plan, problems
+
+
+def _where_columns(node, alias):
+    for child in getattr(node, "children", ()):
+        if hasattr(child, "children"):
+            yield from _where_columns(child, alias)
+            continue
+        target = getattr(getattr(child, "lhs", None), "target", None)
+        if target is not None and getattr(child.lhs, "alias", None) == alias:
+            yield target.name
+
+
+def suggest_index(queryset):
+    """
+    Индекс основной таблицы запроса: сначала поля условий, затем поля
+    сортировки (с направлением) - так условие и ORDER BY ... LIMIT
+    обслуживаются одним индексом
+    """
+    query = queryset.query
+    alias = query.get_initial_alias()
+    fields = list(dict.fromkeys(_where_columns(query.where, alias)))
+    ordering = query.order_by or (
+        query.get_meta().ordering if query.default_ordering else ()
+    )
+    for name in ordering:
+        if not isinstance(name, str) or "__" in name.lstrip("-"):
+            continue
+        name = (
+            name.replace("pk", query.get_meta().pk.name)
+            if name.lstrip("-") == "pk"
+            else name
+        )
+        if name.lstrip("-") not in fields:
+            fields.append(name)
+    if not fields:
+        return None
+    return f"models.Index(fields={fields!r}) в {query.model.__name__}.Meta.indexes"
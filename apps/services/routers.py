@@ -0,0 +1,72 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+REPLICA_ALIAS = "replica"
+PRIMARY_PIN_SESSION_KEY = "primary-db-until"
+
+_read_from_replica = ContextVar("read_from_replica", default=False)
+
+
+def replica_enabled():
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+@contextmanager
+def use_replica(enabled=True):
+    """
+    Чтение моделей блога из реплики в пределах блока (только для запросов
+    на чтение, запись всегда уходит в основную базу)
+    """
+    token = _read_from_replica.set(enabled and replica_enabled())
+    try:
+        yield
+    finally:
+        _read_from_replica.reset(token)
+
+
+def pin_to_primary(request):
+    """
+    Закрепление сессии за основной базой после записи, чтобы автор
+    комментария или оценки сразу видел свои изменения (read-your-writes)
+    """
+    if replica_enabled():
+        request.session[PRIMARY_PIN_SESSION_KEY] = (
+            time.time() + settings.REPLICA_STICKY_SECONDS
+        )
+
+
+def is_pinned_to_primary(request):
+    session = getattr(request, "session", None)
+    if session is None or not replica_enabled():
+        return False
+    return session.get(PRIMARY_PIN_SESSION_KEY, 0) > time.time()
+
+
+class PrimaryReplicaRouter:
+    """
+    Маршрутизатор баз данных: чтение моделей блога из реплики внутри
+    use_replica(), всё остальное и любая запись - в основную базу
+    """
+
+    replica_app_labels = {"blog", "taggit"}
+
+    def db_for_read(self, model, **hints):
+        if (
+            _read_from_replica.get()
+            and model._meta.app_label in self.replica_app_labels
+        ):
+            return REPLICA_ALIAS
+        return "default"
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Реплика - копия основной базы, её наполняет команда sync_replica
+        return db != REPLICA_ALIAS
@@ -0,0 +1,224 @@
+import io
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+
+from apps.files.storage import is_content_addressed
+
+# Заранее сжатые копии в порядке предпочтения
+PRECOMPRESSED_VARIANTS = (("br", ".br"), ("gzip", ".gz"))
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "public, max-age=0, must-revalidate"
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def accepted_encodings(request):
+    """
+    Кодировки из Accept-Encoding, разрешённые клиентом (q > 0)
+    """
+    encodings = set()
+    for item in request.headers.get("Accept-Encoding", "").split(","):
+        encoding, _, params = item.strip().partition(";")
+        quality = params.strip().removeprefix("q=")
+        try:
+            if params and float(quality) <= 0:
+                continue
+        except ValueError:
+            continue
+        if encoding:
+            encodings.add(encoding.strip().lower())
+    return encodings
+
+
+def resolve_path(root, path):
+    try:
+        full_path = safe_join(root, path)
+    except SuspiciousFileOperation:
+        raise Http404("Файл не найден")
+    if not os.path.isfile(full_path):
+        raise Http404("Файл не найден")
+    return full_path
+
+
+def serve_static(request, path):
+    """
+    Раздача собранной статики без DEBUG: выбор заранее сжатой копии по
+    Accept-Encoding (сжатие на лету не выполняется), вечное кэширование
+    файлов с хэшем в имени, поддержка условных запросов
+    """
+    full_path = resolve_path(settings.STATIC_ROOT, path)
+
+    encodings = accepted_encodings(request)
+    encoding, served_path = None, full_path
+    for candidate, suffix in PRECOMPRESSED_VARIANTS:
+        if candidate in encodings and os.path.isfile(full_path + suffix):
+            encoding, served_path = candidate, full_path + suffix
+            break
+
+    stat = os.stat(served_path)
+    etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}-{encoding or "identity"}"'
+    response = get_conditional_response(
+        request, etag=etag, last_modified=int(stat.st_mtime)
+    )
+    if response is None:
+        content_type, _ = mimetypes.guess_type(full_path)
+        response = FileResponse(
+            open(served_path, "rb"),
+            content_type=content_type or "application/octet-stream",
+        )
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+
+    immutable = path in getattr(staticfiles_storage, "immutable_names", ())
+    response.headers["ETag"] = etag
+    response.headers["Last-Modified"] = http_date(stat.st_mtime)
+    response.headers["Vary"] = "Accept-Encoding"
+    response.headers["Cache-Control"] = (
+        IMMUTABLE_CACHE_CONTROL if immutable else REVALIDATE_CACHE_CONTROL
+    )
+    return response
+
+
+class FileRange(io.RawIOBase):
+    """
+    Участок открытого файла как самостоятельный файл: FileResponse считает
+    по нему Content-Length, а WSGI сервер с wsgi.file_wrapper (gunicorn)
+    передаёт его через sendfile() с текущей позиции дескриптора
+    """
+
+    def __init__(self, file, start, length):
+        self.file, self.start, self.length = file, start, length
+        self.position = 0
+        file.seek(start)
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def tell(self):
+        return self.position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self.position, io.SEEK_END: self.length}
+        self.position = min(max(base[whence] + offset, 0), self.length)
+        self.file.seek(self.start + self.position)
+        return self.position
+
+    def read(self, size=-1):
+        remaining = self.length - self.position
+        if size is None or size < 0 or size > remaining:
+            size = remaining
+        data = self.file.read(size)
+        self.position += len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+        super().close()
+
+
+def parse_range(header, size):
+    """
+    Единственный диапазон байтов из заголовка Range: (start, end) включительно,
+    None - заголовок не поддерживается (ответ целиком), ValueError - диапазон
+    вне файла. Несколько диапазонов отдаются целым файлом, что допускает RFC 9110.
+    """
+    match = RANGE_RE.match(header.replace(" ", ""))
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if not first:
+        # Суффикс: последние N байт
+        length = int(last)
+        if not length or not size:
+            raise ValueError(header)
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError(header)
+    return start, end
+
+
+def if_range_matches(request, etag, mtime):
+    if_range = request.headers.get("If-Range")
+    if not if_range:
+        return True
+    if if_range.startswith(('"', "W/")):
+        return if_range == etag
+    modified = parse_http_date_safe(if_range)
+    return modified is not None and int(mtime) <= modified
+
+
+def serve_media(request, path):
+    """
+    Раздача MEDIA_ROOT без DEBUG: условные запросы (ETag, If-Modified-Since),
+    диапазоны (Range, If-Range) и передача файла через sendfile() WSGI
+    сервера; с MEDIA_ACCEL_HEADER передачу выполняет прокси (nginx
+    X-Accel-Redirect, Apache/lighttpd X-Sendfile), Django лишь проверяет путь
+    и валидаторы. Файлы с именем по хэшу кэшируются навсегда.
+    """
+    full_path = resolve_path(settings.MEDIA_ROOT, path)
+    stat = os.stat(full_path)
+    etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    response = get_conditional_response(
+        request, etag=etag, last_modified=int(stat.st_mtime)
+    )
+    content_type, _ = mimetypes.guess_type(full_path)
+    content_type = content_type or "application/octet-stream"
+
+    if response is not None:
+        pass
+    elif settings.MEDIA_ACCEL_HEADER:
+        response = HttpResponse(content_type=content_type)
+        if settings.MEDIA_ACCEL_HEADER == "X-Accel-Redirect":
+            accel_path = settings.MEDIA_ACCEL_PREFIX + path
+        else:
+            accel_path = full_path
+        response.headers[settings.MEDIA_ACCEL_HEADER] = accel_path
+    else:
+        byte_range = None
+        if request.headers.get("Range") and if_range_matches(
+            request, etag, stat.st_mtime
+        ):
+            try:
+                byte_range = parse_range(request.headers["Range"], stat.st_size)
+            except ValueError:
+                response = HttpResponse(status=416, content_type=content_type)
+                response.headers["Content-Range"] = f"bytes */{stat.st_size}"
+        if response is None:
+            file = open(full_path, "rb")
+            if byte_range:
+                start, end = byte_range
+                file = FileRange(file, start, end - start + 1)
+            response = FileResponse(file, content_type=content_type)
+            if byte_range:
+                response.status_code = 206
+                response.headers["Content-Range"] = (
+                    f"bytes {start}-{end}/{stat.st_size}"
+                )
+        response.headers["Accept-Ranges"] = "bytes"
+
+    response.headers["ETag"] = etag
+    response.headers["Last-Modified"] = http_date(stat.st_mtime)
+    response.headers["Cache-Control"] = (
+        IMMUTABLE_CACHE_CONTROL
+        if is_content_addressed(path)
+        else REVALIDATE_CACHE_CONTROL
+    )
+    return response
@@ -0,0 +1,44 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.template import engines
+from django.urls import get_resolver
+
+
+def project_templates():
+    """
+    (движок, имя) HTML шаблонов из каталогов DIRS движков; каталог,
+    вложенный в DIRS другого движка (templates/jinja2), - только его
+    """
+    directories = [
+        (Path(directory), engine)
+        for engine in engines.all()
+        for directory in engine.dirs
+    ]
+    for directory, engine in directories:
+        nested = [
+            other
+            for other, _ in directories
+            if other != directory and other.is_relative_to(directory)
+        ]
+        for path in sorted(directory.rglob("*.html")):
+            if not any(path.is_relative_to(other) for other in nested):
+                yield engine, path.relative_to(directory).as_posix()
+
+
+def preload():
+    """
+    Прогрев воркера до первого запроса: импорт представлений и разбор
+    URLconf (включая индексы для reverse), компиляция шаблонов проекта в
+    кэширующий загрузчик. С gunicorn --preload выполняется один раз в
+    мастер-процессе, воркеры получают готовое состояние при fork
+    """
+    resolver = get_resolver()
+    resolver.reverse_dict
+    for engine, name in project_templates():
+        engine.get_template(name)
+
+
+def preload_if_enabled():
+    if settings.STARTUP_PRELOAD:
+        preload()
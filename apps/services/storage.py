@@ -0,0 +1,100 @@
+import gzip
+import re
+
+from django.contrib.staticfiles.finders import FileSystemFinder
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+from django.utils.functional import cached_property
+
+try:
+    import brotli
+except ImportError:  # brotli - необязательная зависимость
+    brotli = None
+
+JS_FULL_LINE_COMMENT_RE = re.compile(r"^\s*//.*$", re.MULTILINE)
+# Блочный комментарий до первого "*/" (может занимать несколько строк), если
+# до и после него в строках нет кода
+JS_BLOCK_COMMENT_RE = re.compile(r"^[ \t]*/\*(?:[^*]|\*(?!/))*\*/[ \t]*$", re.MULTILINE)
+HASHED_NAME_RE = re.compile(r"\.[0-9a-f]{12}(\.[^./]+)$")
+
+
+def minify_js(source):
+    """
+    Консервативная минификация JS: удаляются только комментарии, занимающие
+    всю строку, отступы и пустые строки. Переводы строк сохраняются, чтобы не
+    зависеть от автоматической расстановки точек с запятой.
+    """
+    source = JS_BLOCK_COMMENT_RE.sub("", source)
+    source = JS_FULL_LINE_COMMENT_RE.sub("", source)
+    lines = (line.strip() for line in source.splitlines())
+    return "\n".join(line for line in lines if line) + "\n"
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Хранилище статики для collectstatic: минификация JS проекта, имена файлов
+    с хэшем содержимого (manifest) и заранее сжатые .gz и .br копии
+    """
+
+    compress_extensions = (".js", ".css", ".svg", ".html", ".txt", ".xml", ".json")
+    compress_min_size = 256
+
+    @cached_property
+    def project_files(self):
+        """
+        Файлы из STATICFILES_DIRS - минифицируются только собственные скрипты,
+        сторонние (admin, ckeditor) уже собраны своими авторами
+        """
+        return {path for path, _ in FileSystemFinder().list([])}
+
+    def _save(self, name, content):
+        # Хэшированная копия читается из исходного файла, поэтому минифицируем и её
+        original_name = HASHED_NAME_RE.sub(r"\1", name)
+        if name.endswith(".js") and original_name in self.project_files:
+            content.seek(0)
+            content = ContentFile(minify_js(content.read().decode()).encode())
+        return super()._save(name, content)
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+
+        for name in paths:
+            if not name.endswith(self.compress_extensions):
+                continue
+            for target in {name, self.hashed_files.get(self.hash_key(name), name)}:
+                for compressed_name in self.compress(target):
+                    yield target, compressed_name, True
+
+    def compress(self, name):
+        """
+        Сохранение gzip и brotli версий файла рядом с оригиналом, если
+        сжатие действительно уменьшает размер
+        """
+        with self.open(name) as original:
+            data = original.read()
+        if len(data) < self.compress_min_size:
+            return []
+
+        variants = [(".gz", gzip.compress(data, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            variants.append((".br", brotli.compress(data, quality=11)))
+
+        saved = []
+        for suffix, compressed in variants:
+            if len(compressed) >= len(data):
+                continue
+            compressed_name = name + suffix
+            if self.exists(compressed_name):
+                self.delete(compressed_name)
+            super()._save(compressed_name, ContentFile(compressed))
+            saved.append(compressed_name)
+        return saved
+
+    @cached_property
+    def immutable_names(self):
+        """
+        Имена файлов с хэшем содержимого - их можно кэшировать навсегда
+        """
+        return set(self.hashed_files.values())
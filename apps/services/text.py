@@ -0,0 +1,158 @@
+import re
+from html import escape
+from html.parser import HTMLParser
+from urllib.parse import urlsplit
+
+# Теги и атрибуты, которые может сформировать CKEditor с нашей панелью инструментов
+ALLOWED_TAGS = {
+    "a",
+    "b",
+    "blockquote",
+    "br",
+    "div",
+    "em",
+    "h1",
+    "h2",
+    "h3",
+    "h4",
+    "h5",
+    "h6",
+    "i",
+    "img",
+    "li",
+    "ol",
+    "p",
+    "s",
+    "span",
+    "strong",
+    "u",
+    "ul",
+}
+ALLOWED_ATTRIBUTES = {
+    "a": {"href", "title", "target", "rel"},
+    "img": {"src", "alt", "width", "height"},
+}
+ALLOWED_URL_SCHEMES = {"", "http", "https", "mailto"}
+VOID_TAGS = {"br", "img"}
+DROP_CONTENT_TAGS = {"script", "style", "iframe", "object", "embed"}
+BLOCK_TAGS = {"p", "div", "br", "li", "blockquote", "h1", "h2", "h3", "h4", "h5", "h6"}
+
+TEXT_ALIGN_RE = re.compile(r"^\s*text-align\s*:\s*(left|right|center|justify)\s*;?\s*$")
+WHITESPACE_RE = re.compile(r"\s+")
+
+
+class _HTMLSanitizer(HTMLParser):
+    """
+    Очистка HTML по белому списку тегов и атрибутов с параллельным
+    извлечением простого текста
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.html = []
+        self.text = []
+        self.open_tags = []
+        self.skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in DROP_CONTENT_TAGS:
+            self.skip_depth += 1
+            return
+        if self.skip_depth:
+            return
+        if tag in BLOCK_TAGS:
+            self.text.append(" ")
+        if tag not in ALLOWED_TAGS:
+            return
+
+        cleaned = []
+        for name, value in attrs:
+            value = value or ""
+            if name in ALLOWED_ATTRIBUTES.get(tag, ()):
+                if name in ("href", "src") and not self._is_safe_url(value):
+                    continue
+                cleaned.append(f' {name}="{escape(value)}"')
+            elif name == "style" and TEXT_ALIGN_RE.match(value):
+                cleaned.append(f' style="{escape(value.strip())}"')
+        self.html.append(f"<{tag}{''.join(cleaned)}>")
+        if tag not in VOID_TAGS:
+            self.open_tags.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS and self.open_tags and self.open_tags[-1] == tag:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in DROP_CONTENT_TAGS:
+            self.skip_depth = max(self.skip_depth - 1, 0)
+            return
+        if self.skip_depth:
+            return
+        if tag in BLOCK_TAGS:
+            self.text.append(" ")
+        if tag not in self.open_tags:
+            return
+        # Закрываем все незакрытые вложенные теги, чтобы разметка оставалась валидной
+        while self.open_tags:
+            open_tag = self.open_tags.pop()
+            self.html.append(f"</{open_tag}>")
+            if open_tag == tag:
+                break
+
+    def handle_data(self, data):
+        if self.skip_depth:
+            return
+        self.html.append(escape(data, quote=False))
+        self.text.append(data)
+
+    def close(self):
+        super().close()
+        while self.open_tags:
+            self.html.append(f"</{self.open_tags.pop()}>")
+
+    @staticmethod
+    def _is_safe_url(url):
+        return urlsplit(url.strip()).scheme.lower() in ALLOWED_URL_SCHEMES
+
+
+def sanitize_html(html):
+    """
+    Очищенный по белому списку HTML из содержимого CKEditor
+    """
+    parser = _HTMLSanitizer()
+    parser.feed(html or "")
+    parser.close()
+    return "".join(parser.html)
+
+
+def strip_html(html):
+    """
+    Простой текст без тегов и лишних пробелов
+    """
+    parser = _HTMLSanitizer()
+    parser.feed(html or "")
+    parser.close()
+    return WHITESPACE_RE.sub(" ", "".join(parser.text)).strip()
+
+
+def make_excerpt(text, length=200):
+    """
+    Превью текста заданной длины с обрезкой по границе слова
+    """
+    if len(text) <= length:
+        return text
+    return text[:length].rsplit(" ", 1)[0].rstrip(" .,;:-") + "…"
+
+
+def count_words(text):
+    return len(text.split())
+
+
+def reading_time(word_count, words_per_minute=200):
+    """
+    Время чтения в минутах (не менее одной минуты для непустого текста)
+    """
+    if not word_count:
+        return 0
+    return max(1, round(word_count / words_per_minute))
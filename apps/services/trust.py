@@ -0,0 +1,111 @@
+import time
+from datetime import datetime
+from datetime import timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+# Баллы доверия: день с регистрации, опубликованная запись, комментарий
+# (с ограничением вклада каждого признака) и штраф за срабатывание лимита
+AGE_POINTS_MAX = 60
+POST_POINTS, POST_POINTS_MAX = 10, 50
+COMMENT_POINTS, COMMENT_POINTS_MAX = 2, 50
+THROTTLE_PENALTY = 50
+# Сколько хранится замеченное состояние доверия пользователя, с
+TRUST_STATE_TIMEOUT = 60 * 60 * 24 * 30
+
+
+def _throttle_key(user_id):
+    return f"trust-throttle-{user_id}"
+
+
+def _submissions_key(user_id):
+    return f"trust-submissions-{user_id}"
+
+
+def _increment(key, timeout):
+    cache.add(key, 0, timeout)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Ключ истёк между add и incr
+        cache.set(key, 1, timeout)
+        return 1
+
+
+def throttle_hits(user):
+    """
+    Срабатывания лимитов пользователя за окно CAPTCHA_THROTTLE_WINDOW
+    """
+    return cache.get(_throttle_key(user.pk), 0)
+
+
+def record_throttle_hit(user):
+    """
+    Срабатывание лимита (неверная капча, слишком частые отправки форм):
+    снижает доверие до конца окна
+    """
+    _increment(_throttle_key(user.pk), settings.CAPTCHA_THROTTLE_WINDOW)
+    user.__dict__.pop("_trust_score", None)
+
+
+def note_submission(user):
+    """
+    Учёт отправки формы; каждая отправка сверх CAPTCHA_SUBMISSION_LIMIT за
+    окно - срабатывание лимита, после которого капча возвращается
+    """
+    count = _increment(_submissions_key(user.pk), settings.CAPTCHA_THROTTLE_WINDOW)
+    if count > settings.CAPTCHA_SUBMISSION_LIMIT:
+        record_throttle_hit(user)
+
+
+def trust_score(user):
+    """
+    Оценка доверия пользователю по возрасту аккаунта, опубликованным
+    записям и комментариям (счётчики профиля) и недавним срабатываниям
+    лимитов; вычисляется один раз за запрос
+    """
+    if not user.is_authenticated:
+        return 0
+    if "_trust_score" not in user.__dict__:
+        age = (timezone.now() - user.date_joined).days
+        profile = getattr(user, "profile", None)
+        posts = profile.post_count if profile else 0
+        comments = profile.comment_count if profile else 0
+        user._trust_score = (
+            min(age, AGE_POINTS_MAX)
+            + min(posts * POST_POINTS, POST_POINTS_MAX)
+            + min(comments * COMMENT_POINTS, COMMENT_POINTS_MAX)
+            - throttle_hits(user) * THROTTLE_PENALTY
+        )
+    return user._trust_score
+
+
+def is_trusted(user):
+    """
+    Доверенному пользователю капча не показывается: аккаунт старше
+    CAPTCHA_TRUST_MIN_AGE_DAYS и оценка не ниже CAPTCHA_TRUST_THRESHOLD
+    """
+    if not user or not user.is_authenticated:
+        return False
+    if (timezone.now() - user.date_joined).days < settings.CAPTCHA_TRUST_MIN_AGE_DAYS:
+        return False
+    return trust_score(user) >= settings.CAPTCHA_TRUST_THRESHOLD
+
+
+def trust_state(user):
+    """
+    (is_trusted(user), время, когда это состояние впервые замечено) - для
+    валидаторов страниц с формами: смена доверия показывает или скрывает
+    капчу без изменения данных страницы; для гостя - (False, None)
+    """
+    if not user or not user.is_authenticated:
+        return False, None
+    trusted = is_trusted(user)
+    key = f"trust-state-{user.pk}"
+    state = cache.get(key)
+    if state is None or state[0] != trusted:
+        state = (trusted, time.time())
+        cache.set(key, state, TRUST_STATE_TIMEOUT)
+    return trusted, datetime.fromtimestamp(state[1], tz=dt_timezone.utc)
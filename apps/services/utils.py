@@ -1,3 +1,4 @@
+from hashlib import md5
 from uuid import uuid4
 
 from pytils.translit import slugify
@@ -12,3 +13,44 @@ def unique_slugify(instance, slug):
     while model.objects.filter(slug=unique_slug).exists():
         unique_slug = f"{unique_slug}-{uuid4().hex[:8]}"
     return unique_slug
+
+
+def unique_slugify_batch(model, values):
+    """
+    unique_slugify для пачки значений: занятые SLUG проверяются одним
+    запросом на пачку, совпадения внутри пачки тоже получают суффикс
+    """
+    slugs = [slugify(value) for value in values]
+    used, pending = set(), range(len(slugs))
+    while pending:
+        taken = set(
+            model.objects.filter(slug__in={slugs[i] for i in pending}).values_list(
+                "slug", flat=True
+            )
+        )
+        retry = []
+        for i in pending:
+            if slugs[i] in taken or slugs[i] in used:
+                slugs[i] = f"{slugs[i]}-{uuid4().hex[:8]}"
+                retry.append(i)
+            else:
+                used.add(slugs[i])
+        pending = retry
+    return slugs
+
+
+def get_client_ip(request):
+    """
+    Получение IP адреса клиента с учётом прокси (X-Forwarded-For)
+    """
+    x_forwarded_for = request.META.get("HTTP_X_FORWARDED_FOR")
+    if x_forwarded_for:
+        return x_forwarded_for.split(",")[0].strip()
+    return request.META.get("REMOTE_ADDR")
+
+
+def make_etag(*parts):
+    """
+    Строгий ETag из произвольного набора значений-валидаторов
+    """
+    return f'"{md5(repr(parts).encode()).hexdigest()}"'
@@ -0,0 +1,59 @@
+import time
+
+from django.core.cache import cache
+
+SITE_VERSION_KEY = "site-version"
+POSTS_VERSION_KEY = "posts-version"
+TAGS_VERSION_KEY = "tags-version"
+
+
+def post_version_key(post_id):
+    return f"post-version-{post_id}"
+
+
+def get_versions(keys):
+    """
+    Версии (время последнего изменения, timestamp) для набора ключей одним
+    запросом к кэшу; отсутствующие версии равны 0
+    """
+    versions = cache.get_many(keys)
+    return {key: versions.get(key, 0) for key in keys}
+
+
+def bump_versions(keys):
+    """
+    Отметка изменения: одна запись в кэш на каждый ключ за вызов;
+    возвращает новую версию
+    """
+    now = time.time()
+    if keys:
+        cache.set_many({key: now for key in keys}, None)
+    return now
+
+
+def bump_post_versions(post_ids):
+    """
+    Инвалидация данных записей (оценки, комментарии), зависящих от post_id
+    """
+    bump_versions([post_version_key(post_id) for post_id in set(post_ids)])
+
+
+def bump_site_version():
+    """
+    Изменение общих для всех страниц данных (например, дерева категорий)
+    """
+    bump_versions([SITE_VERSION_KEY])
+
+
+def bump_posts_version():
+    """
+    Изменение набора или содержимого записей (ленты, списки записей)
+    """
+    bump_versions([POSTS_VERSION_KEY])
+
+
+def bump_tags_version():
+    """
+    Изменение тегов или их использования (индексы подсказок в процессах)
+    """
+    return bump_versions([TAGS_VERSION_KEY])
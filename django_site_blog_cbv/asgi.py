@@ -12,5 +12,11 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "django_site_blog_cbv.settings")
+os.environ.setdefault("DJANGO_ASYNC_VIEWS", "1")
 
 application = get_asgi_application()
+
+# В профиле production - прогрев URLconf и шаблонов до первого запроса
+from apps.services.startup import preload_if_enabled  # noqa: E402
+
+preload_if_enabled()
@@ -0,0 +1,19 @@
+"""
+Профиль настроек выбирается переменной окружения DJANGO_PROFILE:
+development (по умолчанию), production или loadtest (только для команды
+loadtest). Профиль можно указать и
+напрямую: DJANGO_SETTINGS_MODULE=django_site_blog_cbv.settings.production
+"""
+
+import os
+
+PROFILE = os.getenv("DJANGO_PROFILE", "development")
+
+if PROFILE == "production":
+    from .production import *  # noqa: F401,F403
+elif PROFILE == "loadtest":
+    from .loadtest import *  # noqa: F401,F403
+elif PROFILE == "development":
+    from .development import *  # noqa: F401,F403
+else:
+    raise ImportError(f"Неизвестный профиль настроек DJANGO_PROFILE={PROFILE!r}")
@@ -0,0 +1,362 @@
+"""
+Django settings for django_site_blog_cbv project: общие для всех профилей
+(профили - development.py и production.py, выбор - в __init__.py).
+
+Generated by 'django-admin startproject' using Django 5.1.1.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/5.1/topics/settings/
+
+For the full list of settings and their values, see
+https://docs.djangoproject.com/en/5.1/ref/settings/
+"""
+
+import os
+from pathlib import Path
+
+from django.core.exceptions import ImproperlyConfigured
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Build paths inside the project like this: BASE_DIR / 'subdir'.
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+# Quick-start development settings - unsuitable for production
+# See https://docs.djangoproject.com/en/5.1/howto/deployment/checklist/
+
+# SECURITY WARNING: keep the secret key used in production secret!
+SECRET_KEY = str(os.getenv("SECRET_KEY"))
+
+# SECURITY WARNING: don't run with debug turned on in production!
+DEBUG = os.getenv("DJANGO_DEBUG", "1") == "1"
+
+ALLOWED_HOSTS = [
+    "127.0.0.1",
+    "localhost",
+]
+
+INTERNAL_IPS = [
+    "127.0.0.1",
+    "localhost",
+]
+
+# Application definition
+
+INSTALLED_APPS = [
+    "django.contrib.admin",
+    "django.contrib.auth",
+    "django.contrib.contenttypes",
+    "django.contrib.sessions",
+    "django.contrib.messages",
+    "django.contrib.staticfiles",
+    "apps.blog.apps.BlogConfig",
+    "taggit",
+    "apps.accounts.apps.AccountsConfig",
+    "apps.jobs.apps.JobsConfig",
+    "apps.files.apps.FilesConfig",
+    "mptt",
+    "django_mptt_admin",
+    "django_recaptcha",
+    "ckeditor_uploader",
+    "ckeditor",
+]
+
+MIDDLEWARE = [
+    "django.middleware.security.SecurityMiddleware",
+    "django.contrib.sessions.middleware.SessionMiddleware",
+    "django.middleware.common.CommonMiddleware",
+    "django.middleware.csrf.CsrfViewMiddleware",
+    "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "django.contrib.messages.middleware.MessageMiddleware",
+    "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "apps.accounts.middleware.ActiveUserMiddleware",
+]
+
+ROOT_URLCONF = "django_site_blog_cbv.urls"
+
+# Прогрев воркера при старте (wsgi.py/asgi.py): разбор URLconf и компиляция
+# шаблонов проекта до первого запроса, см. apps.services.startup
+STARTUP_PRELOAD = False
+
+# Асинхронные версии представлений блога (включаются при запуске через ASGI)
+ASYNC_VIEWS = os.getenv("DJANGO_ASYNC_VIEWS") == "1"
+
+TEMPLATES = [
+    {
+        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "DIRS": [BASE_DIR / "templates"],
+        "APP_DIRS": True,
+        "OPTIONS": {
+            "context_processors": [
+                "django.template.context_processors.request",
+                "django.contrib.auth.context_processors.auth",
+                "django.contrib.messages.context_processors.messages",
+                "apps.blog.context_processors.fragment_cache",
+            ],
+        },
+    },
+    {
+        "BACKEND": "django.template.backends.jinja2.Jinja2",
+        "NAME": "jinja2",
+        "DIRS": [BASE_DIR / "templates/jinja2"],
+        "APP_DIRS": False,
+        "OPTIONS": {
+            "environment": "apps.services.jinja2.environment",
+            "context_processors": [
+                "django.contrib.auth.context_processors.auth",
+                "django.contrib.messages.context_processors.messages",
+                "apps.blog.context_processors.fragment_cache",
+            ],
+        },
+    },
+]
+
+# Шаблоны, которые рендерит Jinja2 (копии в templates/jinja2/) вместо Django,
+# например DJANGO_JINJA2_TEMPLATES=blog/post_list.html,sidebar.html. Есть для
+# blog/post_list.html, blog/post_detail.html, blog/comments/comments_list.html
+# и sidebar.html; равенство вывода проверяют тесты, скорость - bench_templates
+JINJA2_TEMPLATES = [
+    name for name in os.getenv("DJANGO_JINJA2_TEMPLATES", "").split(",") if name
+]
+
+WSGI_APPLICATION = "django_site_blog_cbv.wsgi.application"
+
+# Database
+# https://docs.djangoproject.com/en/5.1/ref/settings/#databases
+
+DATABASES = {
+    "default": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": BASE_DIR / os.getenv("DATABASE_NAME", "db.sqlite3"),
+    }
+}
+
+# Параметры SQLite из окружения для сравнения конфигураций под нагрузкой
+# (команда loadtest): режим журнала (wal), режим транзакций (IMMEDIATE)
+# и время ожидания блокировки записи в секундах
+SQLITE_OPTIONS = {
+    "init_command": (
+        f"PRAGMA journal_mode={os.getenv('SQLITE_JOURNAL_MODE')};"
+        if os.getenv("SQLITE_JOURNAL_MODE")
+        else None
+    ),
+    "transaction_mode": os.getenv("SQLITE_TRANSACTION_MODE"),
+    "timeout": (
+        float(os.getenv("SQLITE_TIMEOUT")) if os.getenv("SQLITE_TIMEOUT") else None
+    ),
+}
+DATABASES["default"]["OPTIONS"] = {
+    name: value for name, value in SQLITE_OPTIONS.items() if value is not None
+}
+
+# Реплика для чтения списков и записей блога (например, DATABASE_REPLICA=db.replica.sqlite3),
+# локально поддерживается в актуальном состоянии командой sync_replica
+if os.getenv("DATABASE_REPLICA"):
+    DATABASES["replica"] = {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": BASE_DIR / os.getenv("DATABASE_REPLICA"),
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_ROUTERS = ["apps.services.routers.PrimaryReplicaRouter"]
+
+# Время (в секундах), в течение которого сессия после записи читает из основной базы
+REPLICA_STICKY_SECONDS = 30
+
+# Password validation
+# https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
+    },
+    {
+        "NAME": "django.contrib.auth.password_validation.MinimumLengthValidator",
+    },
+    {
+        "NAME": "django.contrib.auth.password_validation.CommonPasswordValidator",
+    },
+    {
+        "NAME": "django.contrib.auth.password_validation.NumericPasswordValidator",
+    },
+]
+
+# Internationalization
+# https://docs.djangoproject.com/en/5.1/topics/i18n/
+
+LANGUAGE_CODE = "ru"
+TIME_ZONE = "Europe/Moscow"
+
+USE_I18N = True
+
+USE_TZ = True
+
+# Static files (CSS, JavaScript, Images)
+# https://docs.djangoproject.com/en/5.1/howto/static-files/
+
+STATIC_URL = "/static/"
+STATIC_ROOT = os.getenv("DJANGO_STATIC_ROOT", BASE_DIR / "staticfiles")
+STATICFILES_DIRS = [BASE_DIR / "templates/js/"]
+
+# collectstatic минифицирует JS, добавляет хэш в имена файлов (manifest)
+# и сохраняет рядом сжатые .gz и .br копии; файлы, которых нет в манифесте,
+# - ошибка (профиль development использует исходные имена)
+STORAGES = {
+    "default": {
+        "BACKEND": "apps.files.storage.ContentAddressedStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "apps.services.storage.CompressedManifestStaticFilesStorage",
+    },
+}
+
+MEDIA_ROOT = BASE_DIR / "media"
+MEDIA_URL = "/media/"
+# Раздача MEDIA_ROOT: "view" - apps.services.serving.serve_media (Range,
+# условные запросы, sendfile), "debug" - django.views.static.serve (только
+# для сравнения в bench_media). MEDIA_ACCEL_HEADER ("X-Accel-Redirect" или
+# "X-Sendfile") передаёт отдачу файла прокси; для nginx MEDIA_ACCEL_PREFIX -
+# internal location, указывающий на MEDIA_ROOT
+MEDIA_SERVING = os.getenv("DJANGO_MEDIA_SERVING", "view")
+MEDIA_ACCEL_HEADER = os.getenv("DJANGO_MEDIA_ACCEL_HEADER") or None
+MEDIA_ACCEL_PREFIX = "/protected-media/"
+
+CKEDITOR_UPLOAD_PATH = "uploads/"
+
+# Загрузки хранятся по хэшу содержимого (apps.files); gc_media не удаляет
+# файлы, загруженные за последние FILES_GC_GRACE_HOURS часов
+FILES_GC_GRACE_HOURS = 24
+CKEDITOR_CONFIGS = {
+    "awesome_ckeditor": {
+        "toolbar": "custom",
+        "toolbar_custom": [
+            ["Bold", "Italic", "Underline"],
+            [
+                "NumberedList",
+                "BulletedList",
+                "-",
+                "Outdent",
+                "Indent",
+                "-",
+                "JustifyLeft",
+                "JustifyCenter",
+                "JustifyRight",
+                "JustifyBlock",
+            ],
+            ["Link", "Unlink"],
+            ["RemoveFormat", "Source"],
+        ],
+        "height": 300,
+    },
+}
+
+# Default primary key field type
+# https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
+
+DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+RECAPTCHA_PUBLIC_KEY = str(os.getenv("RECAPTCHA_KEY"))
+RECAPTCHA_PRIVATE_KEY = str(os.getenv("RECAPTCHA_SECRET"))
+# Отключение reCAPTCHA в формах - только для локальной отладки (нагрузочный
+# тест использует профиль loadtest)
+RECAPTCHA_DISABLED = os.getenv("DJANGO_RECAPTCHA_DISABLED") == "1"
+# Функция проверки ответа: django_recaptcha.client.submit (Google) или
+# apps.services.captcha.stub_verify (локально, без внешних запросов)
+RECAPTCHA_VERIFIER = os.getenv(
+    "DJANGO_RECAPTCHA_VERIFIER", "django_recaptcha.client.submit"
+)
+RECAPTCHA_STUB_VERIFIER = "apps.services.captcha.stub_verify"
+LOCAL_HOSTS = {"127.0.0.1", "localhost", "[::1]"}
+
+
+def check_captcha_settings(debug, disabled, verifier, local_only=False):
+    """
+    Отключение капчи и заглушка проверки (принимает любой ответ) - только
+    для отладки. Проверяются итоговые значения: каждый профиль вызывает
+    проверку после своих настроек. Без DEBUG капчу может отключить только
+    профиль сайта, доступного лишь локально (local_only - loadtest)
+    """
+    if disabled and not (debug or local_only):
+        raise ImproperlyConfigured("RECAPTCHA_DISABLED требует DEBUG")
+    if verifier == RECAPTCHA_STUB_VERIFIER and not debug:
+        raise ImproperlyConfigured("RECAPTCHA_VERIFIER=stub_verify требует DEBUG")
+
+
+check_captcha_settings(DEBUG, RECAPTCHA_DISABLED, RECAPTCHA_VERIFIER)
+# Предельное время проверки, с; по его истечении (или если заняты все
+# RECAPTCHA_VERIFY_WORKERS потоков проверки) ответ принимается (accept) или
+# отклоняется (reject). accept - обход капчи: при медленном сервисе или
+# потоке отправок форм капча фактически не проверяется
+RECAPTCHA_VERIFY_TIMEOUT = float(os.getenv("DJANGO_RECAPTCHA_TIMEOUT", "2"))
+RECAPTCHA_TIMEOUT_FALLBACK = os.getenv("DJANGO_RECAPTCHA_TIMEOUT_FALLBACK", "reject")
+# Потоков проверки на процесс: одновременных проверок не больше, лишние
+# отправки не ждут в очереди
+RECAPTCHA_VERIFY_WORKERS = int(os.getenv("DJANGO_RECAPTCHA_WORKERS", "8"))
+# Таймаут сокета в django_recaptcha (целые секунды): зависший запрос
+# освобождает поток проверки вскоре после истечения общего времени
+RECAPTCHA_VERIFY_REQUEST_TIMEOUT = int(RECAPTCHA_VERIFY_TIMEOUT) + 1
+# Задержка stub_verify, с - имитация медленного сервиса
+RECAPTCHA_STUB_DELAY = 0
+
+# Капча не показывается доверенным пользователям (apps.services.trust):
+# аккаунт не моложе CAPTCHA_TRUST_MIN_AGE_DAYS дней и оценка доверия не ниже
+# порога. Отправки форм сверх CAPTCHA_SUBMISSION_LIMIT за окно и неверная
+# капча - срабатывания лимита, снижающие оценку до конца окна (с)
+CAPTCHA_TRUST_MIN_AGE_DAYS = 7
+CAPTCHA_TRUST_THRESHOLD = 100
+CAPTCHA_SUBMISSION_LIMIT = 20
+CAPTCHA_THROTTLE_WINDOW = 60 * 60
+
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "DJANGO_CACHE_BACKEND",
+            "django.core.cache.backends.filebased.FileBasedCache",
+        ),
+        "LOCATION": os.getenv("DJANGO_CACHE_LOCATION", BASE_DIR / "cache"),
+    }
+}
+
+# Буферизованный счётчик просмотров записей: окно дедупликации по сессии и IP
+# и интервал сброса накопленных в кэше просмотров в базу данных (в секундах)
+POST_VIEWS_DEDUP_WINDOW = 60 * 30
+POST_VIEWS_FLUSH_INTERVAL = 60
+
+# Кэш фрагментов шаблонов (боковая панель) и готовой RSS ленты в секундах;
+# при изменении данных ключи меняются вместе с версиями, поэтому время жизни
+# ограничивает лишь размер кэша
+FRAGMENT_CACHE_TIMEOUT = 60 * 60 * 24
+FEED_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Время хранения сумм оценок в кэше сервера (ключи по версиям записей), с,
+# и наибольшее число записей в одном запросе /rating/sums/
+RATING_SUMS_CACHE_TIMEOUT = 30
+RATING_SUMS_MAX_IDS = 100
+
+# Индексы подсказок в памяти процесса (теги, заголовки записей): проверка
+# версии в кэше не чаще раза в N секунд и полное перестроение не реже раза
+# в M секунд
+SUGGEST_INDEX_CHECK_INTERVAL = 1
+SUGGEST_INDEX_MAX_AGE = 60 * 5
+SUGGEST_LIMIT = 10
+
+# check_query_plans: таблицы меньше этого числа строк не проверяются
+QUERY_PLAN_MIN_ROWS = int(os.getenv("QUERY_PLAN_MIN_ROWS", 1000))
+
+# Фоновые задачи (apps.jobs): число параллельных задач обработчика, попытки
+# с экспоненциальной задержкой (в секундах) и время, после которого задача
+# в работе считается зависшей и возвращается в очередь
+JOBS_WORKERS = 4
+JOBS_POLL_INTERVAL = 1
+JOBS_MAX_ATTEMPTS = 5
+JOBS_RETRY_BACKOFF = 10
+JOBS_RETRY_BACKOFF_MAX = 60 * 60
+JOBS_LOCK_TIMEOUT = 60 * 10
+
+# Обработка изображений записей в фоне: наибольший размер стороны в пикселях
+POST_THUMBNAIL_MAX_SIZE = (1200, 1200)
+
+EMAIL_BACKEND = os.getenv(
+    "EMAIL_BACKEND", "django.core.mail.backends.console.EmailBackend"
+)
+DEFAULT_FROM_EMAIL = os.getenv("DEFAULT_FROM_EMAIL", "noreply@localhost")
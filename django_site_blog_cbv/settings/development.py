@@ -0,0 +1,38 @@
+"""
+Профиль разработки: Django Debug Toolbar и отладочный контекст шаблонов
+"""
+
+from .base import *  # noqa: F401,F403
+from .base import INSTALLED_APPS, MIDDLEWARE, STORAGES, TEMPLATES
+
+INSTALLED_APPS = [*INSTALLED_APPS, "debug_toolbar"]
+
+# Панель - до ActiveUserMiddleware, как и прежде
+MIDDLEWARE = [*MIDDLEWARE]
+MIDDLEWARE.insert(
+    MIDDLEWARE.index("apps.accounts.middleware.ActiveUserMiddleware"),
+    "debug_toolbar.middleware.DebugToolbarMiddleware",
+)
+
+TEMPLATES = [
+    {
+        **TEMPLATES[0],
+        "OPTIONS": {
+            **TEMPLATES[0]["OPTIONS"],
+            "context_processors": [
+                "django.template.context_processors.debug",
+                *TEMPLATES[0]["OPTIONS"]["context_processors"],
+            ],
+        },
+    },
+    *TEMPLATES[1:],
+]
+
+# Исходные имена статики без манифеста: хранилище продакшена требует
+# collectstatic и не отдаёт файлы, которых нет в манифесте
+STORAGES = {
+    **STORAGES,
+    "staticfiles": {
+        "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
+    },
+}
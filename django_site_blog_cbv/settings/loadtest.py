@@ -0,0 +1,19 @@
+"""
+Профиль нагрузочного теста (команда loadtest): продакшен без reCAPTCHA в
+формах, только для локального сервера на копии базы
+"""
+
+from .production import *  # noqa: F401,F403
+from .production import DEBUG, LOCAL_HOSTS, RECAPTCHA_VERIFIER, check_captcha_settings
+
+ALLOWED_HOSTS = ["127.0.0.1", "localhost"]
+
+RECAPTCHA_DISABLED = True
+
+# Без DEBUG капчу можно отключить только для сайта, доступного лишь локально
+check_captcha_settings(
+    DEBUG,
+    RECAPTCHA_DISABLED,
+    RECAPTCHA_VERIFIER,
+    local_only=set(ALLOWED_HOSTS) <= LOCAL_HOSTS,
+)
@@ -0,0 +1,43 @@
+"""
+Профиль продакшена: без отладочных приложений, с кэширующим загрузчиком
+шаблонов и прогревом URLconf и шаблонов при старте воркера
+"""
+
+import os
+
+from .base import *  # noqa: F401,F403
+from .base import (
+    RECAPTCHA_DISABLED,
+    RECAPTCHA_VERIFIER,
+    TEMPLATES,
+    check_captcha_settings,
+)
+
+DEBUG = False
+
+check_captcha_settings(DEBUG, RECAPTCHA_DISABLED, RECAPTCHA_VERIFIER)
+
+ALLOWED_HOSTS = os.getenv("DJANGO_ALLOWED_HOSTS", "127.0.0.1,localhost").split(",")
+
+# Шаблоны компилируются один раз на процесс (при прогреве - до первого запроса)
+TEMPLATES = [
+    {
+        **TEMPLATES[0],
+        "APP_DIRS": False,
+        "OPTIONS": {
+            **TEMPLATES[0]["OPTIONS"],
+            "loaders": [
+                (
+                    "django.template.loaders.cached.Loader",
+                    [
+                        "django.template.loaders.filesystem.Loader",
+                        "django.template.loaders.app_directories.Loader",
+                    ],
+                ),
+            ],
+        },
+    },
+    *TEMPLATES[1:],
+]
+
+STARTUP_PRELOAD = os.getenv("DJANGO_STARTUP_PRELOAD", "1") == "1"
@@ -15,12 +15,14 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 
+from django.apps import apps
 from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
-from django.urls import include, path
+from django.urls import include, path, re_path
+from django.views.static import serve
 
-from apps.blog.feeds import LatestPostFeed
+from apps.blog.feeds import AsyncLatestPostFeed, LatestPostFeed
+from apps.services.serving import serve_media, serve_static
 
 handler403 = "apps.blog.views.tr_handler403"
 handler404 = "apps.blog.views.tr_handler404"
@@ -29,12 +31,39 @@ handler500 = "apps.blog.views.tr_handler500"
 
 urlpatterns = [
     path("admin/", admin.site.urls),
-    path("feeds/latest/", LatestPostFeed(), name="latest_post_feed"),
+    path(
+        "feeds/latest/",
+        AsyncLatestPostFeed() if settings.ASYNC_VIEWS else LatestPostFeed(),
+        name="latest_post_feed",
+    ),
     path("", include("apps.blog.urls")),
     path("", include("apps.accounts.urls")),
     path("ckeditor/", include("ckeditor_uploader.urls")),
 ]
 
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+# Медиафайлы: serve_media (Range, sendfile) или прежняя отладочная раздача
+if settings.MEDIA_SERVING == "debug":
+    media_view, media_kwargs = serve, {"document_root": settings.MEDIA_ROOT}
+else:
+    media_view, media_kwargs = serve_media, {}
+urlpatterns += [
+    re_path(
+        rf"^{settings.MEDIA_URL.strip('/')}/(?P<path>.*)$",
+        media_view,
+        media_kwargs,
+        name="media",
+    ),
+]
+
+# Debug Toolbar подключён только в профиле development
+if apps.is_installed("debug_toolbar"):
     urlpatterns += [path("__debug__/", include("debug_toolbar.urls"))]
+
+if not settings.DEBUG:
+    urlpatterns += [
+        re_path(
+            rf"^{settings.STATIC_URL.strip('/')}/(?P<path>.*)$",
+            serve_static,
+            name="static",
+        ),
+    ]
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "django_site_blog_cbv.settings")
 
 application = get_wsgi_application()
+
+# В профиле production - прогрев URLconf и шаблонов до первого запроса
+from apps.services.startup import preload_if_enabled  # noqa: E402
+
+preload_if_enabled()
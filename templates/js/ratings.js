@@ -1,11 +1,50 @@
 const ratingButtons = document.querySelectorAll('.rating-buttons');
+// Период пакетного обновления оценок видимой страницы (мс)
+const RATING_REFRESH_INTERVAL = 60000;
+
+// Отмечаем голос посетителя и обновляем сумму в карточке записи
+function renderRating(button, ratingSum, vote) {
+    button.querySelector('.rating-sum').textContent = ratingSum;
+    button.querySelectorAll('[data-value]').forEach(voteButton => {
+        voteButton.classList.toggle('active', parseInt(voteButton.dataset.value) === vote);
+    });
+}
+
+// Обновление всех карточек страницы одним запросом
+function refreshRatings() {
+    const cards = new Map();
+    ratingButtons.forEach(button => {
+        const voteButton = button.querySelector('[data-post]');
+        if (voteButton) {
+            cards.set(voteButton.dataset.post, button);
+        }
+    });
+    if (!cards.size) {
+        return;
+    }
+    // Ответ перепроверяется по ETag: без изменений сервер отвечает 304
+    fetch("/rating/sums/?ids=" + Array.from(cards.keys()).join(","), {
+        headers: {"X-Requested-With": "XMLHttpRequest"},
+    }).then(response => response.json())
+    .then(data => {
+        for (const [postId, rating] of Object.entries(data.ratings)) {
+            const button = cards.get(postId);
+            if (button) {
+                renderRating(button, rating.rating_sum, rating.vote);
+            }
+        }
+    })
+    .catch(error => console.error(error));
+}
 
 ratingButtons.forEach(button => {
     button.addEventListener('click', event => {
         // Получаем значение рейтинга из data-атрибута кнопки
         const value = parseInt(event.target.dataset.value)
         const postId = parseInt(event.target.dataset.post)
-        const ratingSum = button.querySelector('.rating-sum');
+        if (!postId) {
+            return;
+        }
         // Создаем объект FormData для отправки данных на сервер
         const formData = new FormData();
         // Добавляем id статьи, значение кнопки
@@ -21,9 +60,23 @@ ratingButtons.forEach(button => {
             body: formData
         }).then(response => response.json())
         .then(data => {
-            // Обновляем значение на кнопке
-            ratingSum.textContent = data.rating_sum;
+            // Обновляем значение на кнопке и отметку голоса (голос из архива
+            // не меняется - отмечаем его)
+            const vote = data.status === "archived" ? data.vote : value;
+            renderRating(button, data.rating_sum, data.status === "deleted" ? null : vote);
         })
         .catch(error => console.error(error));
     });
-});
\ No newline at end of file
+});
+
+refreshRatings();
+setInterval(() => {
+    if (document.visibilityState === 'visible') {
+        refreshRatings();
+    }
+}, RATING_REFRESH_INTERVAL);
+document.addEventListener('visibilitychange', () => {
+    if (document.visibilityState === 'visible') {
+        refreshRatings();
+    }
+});
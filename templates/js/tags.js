@@ -0,0 +1,56 @@
+// Подсказки тегов для поля «теги через запятую»: дополняется последний тег
+document.querySelectorAll('input[data-suggest-url]').forEach(input => {
+    const list = document.createElement('div');
+    list.className = 'list-group position-absolute shadow-sm';
+    list.style.zIndex = 1000;
+    input.parentNode.style.position = 'relative';
+    input.after(list);
+    let timer = null;
+
+    function tokens() {
+        return input.value.split(',').map(token => token.trim());
+    }
+
+    function hide() {
+        list.replaceChildren();
+    }
+
+    function choose(name) {
+        const parts = tokens();
+        parts[parts.length - 1] = name.includes(' ') ? `"${name}"` : name;
+        input.value = parts.filter(Boolean).join(', ') + ', ';
+        hide();
+        input.focus();
+    }
+
+    function render(results) {
+        hide();
+        results.forEach(tag => {
+            const item = document.createElement('button');
+            item.type = 'button';
+            item.className = 'list-group-item list-group-item-action py-1';
+            item.textContent = `${tag.name} (${tag.posts})`;
+            item.addEventListener('mousedown', event => {
+                event.preventDefault();
+                choose(tag.name);
+            });
+            list.append(item);
+        });
+    }
+
+    input.addEventListener('input', () => {
+        clearTimeout(timer);
+        const query = tokens().pop().replace(/"/g, '');
+        if (!query) {
+            hide();
+            return;
+        }
+        timer = setTimeout(() => {
+            fetch(`${input.dataset.suggestUrl}?q=${encodeURIComponent(query)}`)
+                .then(response => response.json())
+                .then(data => render(data.results))
+                .catch(error => console.error(error));
+        }, 100);
+    });
+    input.addEventListener('blur', hide);
+});
@@ -0,0 +1,51 @@
+// Подсказки заголовков записей в шапке: переход к записи по выбору
+document.querySelectorAll('input[data-title-suggest-url]').forEach(input => {
+    const list = document.createElement('div');
+    list.className = 'list-group position-absolute shadow-sm w-100';
+    list.style.zIndex = 1000;
+    input.after(list);
+    let timer = null;
+    let controller = null;
+
+    function hide() {
+        list.replaceChildren();
+    }
+
+    function render(results) {
+        hide();
+        results.forEach(post => {
+            const item = document.createElement('a');
+            item.href = post.url;
+            item.className = 'list-group-item list-group-item-action py-1';
+            item.textContent = post.title;
+            item.addEventListener('mousedown', event => event.preventDefault());
+            list.append(item);
+        });
+    }
+
+    input.addEventListener('input', () => {
+        clearTimeout(timer);
+        const query = input.value.trim();
+        if (!query) {
+            hide();
+            return;
+        }
+        timer = setTimeout(() => {
+            // Ответ на устаревший запрос не должен перезаписать свежий
+            if (controller) controller.abort();
+            controller = new AbortController();
+            fetch(`${input.dataset.titleSuggestUrl}?q=${encodeURIComponent(query)}`,
+                {signal: controller.signal})
+                .then(response => response.json())
+                .then(data => render(data.results))
+                .catch(error => error.name !== 'AbortError' && console.error(error));
+        }, 100);
+    });
+    input.addEventListener('keydown', event => {
+        if (event.key === 'Enter' && list.firstChild) {
+            event.preventDefault();
+            window.location = list.firstChild.href;
+        }
+    });
+    input.addEventListener('blur', hide);
+});